@@ -1,3 +1,6 @@
+import time
+
+from functools import partial
 from src.infrastructure.utils.logger import Logger
 
 
@@ -7,9 +10,17 @@ class CalibrateImageUseCase:
         self.astrometry_service = astrometry_service
         self.logger = Logger()
 
-    def execute(self, image_path):
+    def execute(self, image_path, deadline=None, detections=None):
         try:
-            result = self.astrometry_service.calibrate_image(image_path)
+            if detections is not None and hasattr(self.astrometry_service, "calibrate_with_detections"):
+                calibrate = partial(self.astrometry_service.calibrate_with_detections, image_path, detections)
+            else:
+                calibrate = partial(self.astrometry_service.calibrate_image, image_path)
+
+            if deadline is None:
+                result = calibrate()
+            else:
+                result = calibrate(max(0.0, deadline - time.monotonic()))
 
             if result is None:
                 self.logger.error(self.service_name,"Image calibration failed")
@@ -24,4 +35,5 @@ class CalibrateImageUseCase:
     def process(self, data):
         if "image_path" not in data:
             return {"error": "path to image missing"}
-        return self.execute(data["image_path"])
\ No newline at end of file
+        detections = data.get("pending", {}).get("detection")
+        return self.execute(data["image_path"], deadline=data.get("deadline"), detections=detections)
\ No newline at end of file
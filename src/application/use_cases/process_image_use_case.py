@@ -4,15 +4,27 @@ from src.infrastructure.utils.image_highlighter import ImageHighlighter
 
 
 class ProcessImageUseCase:
-    def __init__(self, parallel_processing_service, verify_unknown_objects_use_case):
+    def __init__(self, parallel_processing_service, verify_unknown_objects_use_case, prefetch_service=None):
         self.service_name = "ProcessImageUseCase"
         self.parallel_service = parallel_processing_service
         self.verify_objects_use_case = verify_unknown_objects_use_case
+        self.prefetch_service = prefetch_service
+        self.last_wcs = None
         self.logger = Logger()
 
-    def execute(self, image_path, status_callback=None):
+    def prefetch(self, footprints):
+        if self.prefetch_service is None:
+            return None
+        return self.prefetch_service.submit(footprints)
+
+    def execute(self, image_path, status_callback=None, deadline=None):
         try:
             initial_data = {"image_path": image_path}
+            if deadline is not None:
+                initial_data["deadline"] = deadline
+
+            if self.prefetch_service is not None and self.last_wcs is not None:
+                self.prefetch([self.prefetch_service.footprint(self.last_wcs)])
 
             results = self.parallel_service.execute_parallel_tasks(initial_data)
 
@@ -27,20 +39,33 @@ class ProcessImageUseCase:
                 if status_callback:
                     status_callback("Поиск данных в каталогах...", "blue")
 
+                self.last_wcs = wcs
+
                 verify_result = self.verify_objects_use_case.execute(
-                    image_path, sep_coords, astro_coords, wcs
+                    image_path, sep_coords, astro_coords, wcs,
+                    corr_coords=astrometry_result.get("corr_coords"),
+                    corr_residuals=astrometry_result.get("corr_residuals"),
+                    deadline=deadline
                 )
 
                 unknown = verify_result.get("unknown_objects", [])
+                unverified = verify_result.get("unverified_objects", [])
                 points = [(o.get("x"), o.get("y")) for o in unknown]
 
                 highlighter = ImageHighlighter(image_path)
                 highlighter.highlight_points(points, radius=8, color="yellow")
+                if unverified:
+                    highlighter.highlight_points([(o.get("x"), o.get("y")) for o in unverified], radius=8,
+                                                 color="gray")
                 base, ext = os.path.splitext(image_path)
                 vis_path = f"{base}_highlighted{ext}"
                 highlighter.save(vis_path)
 
                 results["unknown_objects"] = unknown
+                results["unverified_objects"] = unverified
+                results["queries_avoided"] = verify_result.get("queries_avoided", 0)
+                results["extra_queries"] = verify_result.get("extra_queries", 0)
+                results["budget_exhausted"] = verify_result.get("budget_exhausted", False)
                 results["visualization_path"] = vis_path
 
             return results
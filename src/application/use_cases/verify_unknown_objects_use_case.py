@@ -1,19 +1,92 @@
 from src.infrastructure.utils.logger import Logger
 from src.infrastructure.utils.image_highlighter import ImageHighlighter
+from src.infrastructure.utils.wcs_transform import WcsTransformEngine
+from src.infrastructure.utils.sky_geometry import (
+    compute_footprint, match_nearest, observation_epoch, angular_separation_deg
+)
+from src.infrastructure.utils.photometry import estimate_limiting_magnitude
+from src.infrastructure.utils.match_radius import adaptive_match_radius, nearest_residuals, pixel_scale_arcsec
+from src.infrastructure.utils.sky_clustering import friends_of_friends, cluster_representatives
 import os
+import math
+import time
+import numpy as np
 
 
 class VerifyUnknownObjectsUseCase:
-    def __init__(self, catalog_service, object_comparison_service):
+    DEPTH_CATALOG = "gaia"
+
+    def __init__(self, catalog_service, object_comparison_service, verification_mode="object",
+                 mag_limit_margin=None, calibration_stars=50, reference_match_arcsec=None, reference_index=None,
+                 adaptive_radius=False, radius_sigma=3.0, max_radius_px=30.0, min_radius_arcsec=1.0,
+                 max_radius_arcsec=10.0, cluster_arcsec=None, query_budget=None, time_budget=None):
         self.service_name = "VerifyUnknownObjectsUseCase"
         self.catalog = catalog_service
         self.comparison_service = object_comparison_service
+        self.verification_mode = verification_mode
+        self.mag_limit_margin = mag_limit_margin
+        self.calibration_stars = calibration_stars
+        self.reference_match_arcsec = reference_match_arcsec
+        self.reference_index = reference_index
+        self.adaptive_radius = adaptive_radius
+        self.radius_sigma = radius_sigma
+        self.max_radius_px = max_radius_px
+        self.min_radius_arcsec = min_radius_arcsec
+        self.max_radius_arcsec = max_radius_arcsec
+        self.cluster_arcsec = cluster_arcsec
+        self.query_budget = query_budget
+        self.time_budget = time_budget
         self.logger = Logger()
 
-    def execute(self, image_path, sep_coords, astro_coords, wcs, match_radius_arcsec=5):
-        unique_coords = self.comparison_service.find_unique_objects(
-            sep_coords, astro_coords, match_threshold=10
-        )
+    def execute(self, image_path, sep_coords, astro_coords, wcs, match_radius_arcsec=5,
+                corr_coords=None, corr_match_threshold=3, corr_residuals=None, deadline=None):
+        if self.time_budget is not None:
+            budget_deadline = time.monotonic() + self.time_budget
+            deadline = budget_deadline if deadline is None else min(deadline, budget_deadline)
+        if deadline is None or not hasattr(self.catalog, "set_deadline"):
+            return self._execute(image_path, sep_coords, astro_coords, wcs, match_radius_arcsec, corr_coords,
+                                 corr_match_threshold, corr_residuals, deadline)
+
+        self.catalog.set_deadline(deadline)
+        try:
+            return self._execute(image_path, sep_coords, astro_coords, wcs, match_radius_arcsec, corr_coords,
+                                 corr_match_threshold, corr_residuals, deadline)
+        finally:
+            self.catalog.set_deadline(None)
+
+    def _execute(self, image_path, sep_coords, astro_coords, wcs, match_radius_arcsec, corr_coords,
+                 corr_match_threshold, corr_residuals, deadline):
+        detections = sep_coords
+        solver_matched_count = 0
+        if corr_coords:
+            candidates = self.comparison_service.find_unique_objects(
+                sep_coords, corr_coords, match_threshold=corr_match_threshold
+            )
+            solver_matched_count = len(sep_coords) - len(candidates)
+            sep_coords = candidates
+
+        match_threshold = 10
+        fixed_radius_arcsec = match_radius_arcsec
+        queries_avoided = 0
+        extra_queries = 0
+        if self.adaptive_radius:
+            match_threshold, match_radius_arcsec = self._adaptive_radius(sep_coords, astro_coords, wcs,
+                                                                         corr_residuals, match_threshold,
+                                                                         match_radius_arcsec)
+
+        field_key = self._reference_field(sep_coords, wcs)
+        unique_coords = self._unique_against_reference(sep_coords, astro_coords, wcs, field_key,
+                                                       self._reference_radius(match_threshold, wcs,
+                                                                              match_radius_arcsec),
+                                                       match_threshold)
+        if self.adaptive_radius:
+            difference = self._count_fixed_candidates(sep_coords, astro_coords, wcs, field_key,
+                                                      fixed_radius_arcsec) - len(unique_coords)
+            queries_avoided = max(difference, 0)
+            extra_queries = max(-difference, 0)
+            self.logger.info(self.service_name, f"Adaptive radius: {len(unique_coords)} candidates, "
+                                                 f"{queries_avoided} catalog queries avoided, "
+                                                 f"{extra_queries} extra queries")
 
         pixel_xy = [(obj.get("x"), obj.get("y")) for obj in unique_coords]
         highlighter = ImageHighlighter(image_path)
@@ -22,20 +95,312 @@ class VerifyUnknownObjectsUseCase:
         filtered_vis_path = f"{base}_filtered{ext}"
         highlighter.save(filtered_vis_path)
 
-        world = wcs.all_pix2world(pixel_xy, 0)
+        if hasattr(self.catalog, "set_epoch"):
+            epoch = observation_epoch(wcs)
+            if epoch is not None:
+                self.catalog.set_epoch(epoch)
 
-        unknown = []
+        depth = None
+        if self.mag_limit_margin is not None and hasattr(self.catalog, "set_mag_limit"):
+            unique_ids = {id(obj) for obj in unique_coords}
+            known = [obj for obj in detections if id(obj) not in unique_ids]
+            depth = self._estimate_depth(known, detections, wcs, match_radius_arcsec)
+            self.catalog.set_mag_limit(depth["limiting_mag"] if depth else None)
 
-        for i, obj in enumerate(unique_coords):
-            ra, dec = world[i]
+        xs = [x for x, _ in pixel_xy]
+        ys = [y for _, y in pixel_xy]
+        ra_all, dec_all = WcsTransformEngine.for_wcs(wcs).pix2world(xs, ys)
 
-            results = self.catalog.find_object_match(ra, dec, radius_arcsec=match_radius_arcsec)
+        verified = None
+        budget_exhausted = False
+        if self.verification_mode == "field" and unique_coords:
+            verified = self._verify_field(unique_coords, ra_all, dec_all, wcs, xs, ys, match_radius_arcsec)
+        elif self.verification_mode == "cross_match" and unique_coords:
+            verified = self._verify_cross_match(unique_coords, ra_all, dec_all, match_radius_arcsec)
 
-            if not results:
-                unknown.append(obj)
+        if verified is not None:
+            unknown, unverified, moving = verified
+        else:
+            mags = None
+            if depth:
+                mags = [depth["zeropoint"] - 2.5 * math.log10(obj["flux"]) if obj.get("flux", 0) > 0 else None
+                        for obj in unique_coords]
+            matches, clustered, budget_exhausted = self._match_objects(unique_coords, ra_all, dec_all,
+                                                                       match_radius_arcsec, mags, deadline)
+            queries_avoided += clustered
+            unknown = [obj for obj, results in zip(unique_coords, matches) if results is not None and not results]
+            unverified = [obj for obj, results in zip(unique_coords, matches) if results is None]
+            moving = [obj for obj, results in zip(unique_coords, matches)
+                      if results and all(name == "mpc" for name, _ in results)]
+            if unverified:
+                self.logger.warning(self.service_name, f"{len(unverified)} objects could not be verified "
+                                                        f"against the catalogs")
+
+        if field_key is not None:
+            self._remember_confirmed(field_key, unique_coords, ra_all, dec_all, unknown + unverified + moving)
 
         return {
             "unknown_objects": unknown,
             "unknown_count": len(unknown),
+            "unverified_objects": unverified,
+            "unverified_count": len(unverified),
+            "solver_matched_count": solver_matched_count,
+            "limiting_magnitude": depth["limiting_mag"] if depth else None,
+            "match_radius_px": float(np.median(match_threshold)),
+            "match_radius_arcsec": match_radius_arcsec,
+            "queries_avoided": queries_avoided,
+            "extra_queries": extra_queries,
+            "budget_exhausted": budget_exhausted,
             "filtered_image_path": filtered_vis_path
-        }
\ No newline at end of file
+        }
+
+    def _match_objects(self, objects, ra_all, dec_all, match_radius_arcsec, mags, deadline=None):
+        if self.cluster_arcsec is None or len(objects) < 2:
+            matches, exhausted = self._query_by_priority(objects, list(zip(ra_all, dec_all)), match_radius_arcsec,
+                                                         mags, deadline, self.query_budget)
+            return matches, 0, exhausted
+
+        labels = friends_of_friends(ra_all, dec_all, self.cluster_arcsec)
+        representatives = cluster_representatives(labels, [obj.get("flux", 0) for obj in objects])
+        rep_mags = None if mags is None else [mags[i] for i in representatives]
+        rep_matches, exhausted = self._query_by_priority(
+            [objects[i] for i in representatives], [(ra_all[i], dec_all[i]) for i in representatives],
+            match_radius_arcsec, rep_mags, deadline, self.query_budget
+        )
+
+        matches = []
+        for i, label in enumerate(labels):
+            rep = representatives[label]
+            rows = rep_matches[label]
+            if rows and i != rep:
+                rows = self._member_rows(rows, ra_all[i], dec_all[i], ra_all[rep], dec_all[rep], match_radius_arcsec)
+            matches.append(rows)
+
+        far = [i for i, (rows, label) in enumerate(zip(matches, labels)) if rows == [] and rep_matches[label]]
+        if far:
+            remaining = None if self.query_budget is None else \
+                self.query_budget - min(len(representatives), self.query_budget)
+            far_matches, far_exhausted = self._query_by_priority(
+                [objects[i] for i in far], [(ra_all[i], dec_all[i]) for i in far], match_radius_arcsec,
+                None if mags is None else [mags[i] for i in far], deadline, remaining
+            )
+            for i, rows in zip(far, far_matches):
+                matches[i] = rows
+            exhausted = exhausted or far_exhausted
+
+        clustered = len(objects) - len(representatives) - len(far)
+        if clustered:
+            self.logger.info(self.service_name, f"{len(objects)} candidates grouped into {len(representatives)} "
+                                                 f"sources, {clustered} catalog queries avoided")
+        return matches, clustered, exhausted
+
+    def _member_rows(self, rows, ra, dec, rep_ra, rep_dec, match_radius_arcsec):
+        near = []
+        for name, row in rows:
+            row_ra, row_dec = self._row_position(row) or (rep_ra, rep_dec)
+            if angular_separation_deg(ra, dec, row_ra, row_dec) * 3600 <= match_radius_arcsec:
+                near.append((name, row))
+        return near
+
+    @staticmethod
+    def _row_position(row):
+        try:
+            return float(row["_RAJ2000"]), float(row["_DEJ2000"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def _query_by_priority(self, objects, coords, match_radius_arcsec, mags, deadline=None, query_budget=None):
+        if query_budget is None and deadline is None:
+            return self.catalog.find_object_matches(coords, radius_arcsec=match_radius_arcsec, mags=mags), False
+
+        order = sorted(range(len(objects)), key=lambda i: -self._priority(objects[i]))
+        if query_budget is not None:
+            order = order[:query_budget]
+
+        matches = [None] * len(objects)
+        cut_off = deadline is not None and time.monotonic() >= deadline
+        if order and not cut_off:
+            results = self.catalog.find_object_matches(
+                [coords[i] for i in order], radius_arcsec=match_radius_arcsec,
+                mags=None if mags is None else [mags[i] for i in order]
+            )
+            for i, result in zip(order, results):
+                matches[i] = result
+            cut_off = deadline is not None and time.monotonic() >= deadline and \
+                any(result is None for result in results)
+
+        exhausted = cut_off or len(order) < len(objects)
+        if exhausted:
+            self.logger.warning(self.service_name, f"Verification budget exhausted before all {len(objects)} "
+                                                    f"candidates were verified, the rest left unverified")
+        return matches, exhausted
+
+    @staticmethod
+    def _priority(obj):
+        flux = obj.get("flux", 0) or 0
+        if flux <= 0:
+            return 0.0
+        snr = flux / math.sqrt(max(obj.get("npix", 1) or 1, 1))
+        a, b = obj.get("a"), obj.get("b")
+        roundness = b / a if a and b else 1.0
+        return snr * roundness * (0.5 if obj.get("flag") else 1.0)
+
+    def _reference_field(self, sep_coords, wcs):
+        if self.reference_index is None or not sep_coords:
+            return None
+        ra, dec = WcsTransformEngine.for_wcs(wcs).pix2world(
+            [sum(obj["x"] for obj in sep_coords) / len(sep_coords)],
+            [sum(obj["y"] for obj in sep_coords) / len(sep_coords)]
+        )
+        return self.reference_index.field_key(float(ra[0]), float(dec[0]))
+
+    def _adaptive_radius(self, sep_coords, astro_coords, wcs, corr_residuals, match_threshold, match_radius_arcsec):
+        residuals = corr_residuals
+        if residuals is None or len(residuals) == 0:
+            residuals = nearest_residuals([(obj["x"], obj["y"]) for obj in sep_coords], astro_coords,
+                                          self.max_radius_px)
+
+        a = b = None
+        if sep_coords and all("a" in obj and "b" in obj for obj in sep_coords):
+            a = [obj["a"] for obj in sep_coords]
+            b = [obj["b"] for obj in sep_coords]
+        radius = adaptive_match_radius(residuals, a, b, k=self.radius_sigma, max_radius=self.max_radius_px)
+        if radius is None:
+            self.logger.warning(self.service_name, "Too few residuals for an adaptive radius, using defaults")
+            return match_threshold, match_radius_arcsec
+
+        scale = pixel_scale_arcsec(wcs)
+        if scale is not None:
+            match_radius_arcsec = float(np.clip(np.median(radius) * scale, self.min_radius_arcsec,
+                                                self.max_radius_arcsec))
+        self.logger.info(self.service_name, f"Adaptive match radius {np.median(radius):.2f} px, "
+                                             f"{match_radius_arcsec:.2f} arcsec from {len(residuals)} residuals")
+        return radius, match_radius_arcsec
+
+    def _reference_radius(self, match_threshold, wcs, match_radius_arcsec):
+        if self.reference_match_arcsec is not None:
+            return self.reference_match_arcsec
+        scale = pixel_scale_arcsec(wcs) if np.ndim(match_threshold) else None
+        if scale is None:
+            return match_radius_arcsec
+        return np.clip(np.asarray(match_threshold, dtype=float) * scale, self.min_radius_arcsec,
+                       self.max_radius_arcsec)
+
+    def _count_fixed_candidates(self, sep_coords, astro_coords, wcs, field_key, match_radius_arcsec):
+        if field_key is None or not sep_coords:
+            return len(self.comparison_service.find_unique_objects(sep_coords, astro_coords, match_threshold=10))
+        ra, dec = WcsTransformEngine.for_wcs(wcs).pix2world([obj["x"] for obj in sep_coords],
+                                                            [obj["y"] for obj in sep_coords])
+        return int(self.reference_index.unique_mask(field_key, ra, dec,
+                                                    self.reference_match_arcsec or match_radius_arcsec,
+                                                    assignment=self._assignment()).sum())
+
+    def _unique_against_reference(self, sep_coords, astro_coords, wcs, field_key=None, reference_radius_arcsec=5,
+                                  match_threshold=10):
+        if field_key is not None:
+            engine = WcsTransformEngine.for_wcs(wcs)
+            if astro_coords:
+                ref_ra, ref_dec = engine.pix2world([coord[0] for coord in astro_coords],
+                                                   [coord[1] for coord in astro_coords])
+                self.reference_index.insert(field_key, ref_ra, ref_dec)
+            ra, dec = engine.pix2world(*self._detection_xy(sep_coords, astro_coords))
+            unique = self.reference_index.unique_mask(field_key, ra, dec, reference_radius_arcsec,
+                                                      assignment=self._assignment())
+            return [obj for obj, keep in zip(sep_coords, unique) if keep]
+
+        if self.reference_match_arcsec is None or not sep_coords or not astro_coords or \
+                not hasattr(self.comparison_service, "unique_sky_indices"):
+            return self.comparison_service.find_unique_objects(sep_coords, astro_coords,
+                                                               match_threshold=match_threshold)
+
+        engine = WcsTransformEngine.for_wcs(wcs)
+        ra, dec = engine.pix2world(*self._detection_xy(sep_coords, astro_coords))
+        ref_ra, ref_dec = engine.pix2world([coord[0] for coord in astro_coords], [coord[1] for coord in astro_coords])
+        indices = self.comparison_service.unique_sky_indices(ra, dec, ref_ra, ref_dec, self.reference_match_arcsec)
+        return [sep_coords[i] for i in indices]
+
+    def _assignment(self):
+        return getattr(self.comparison_service, "assignment", None)
+
+    def _detection_xy(self, sep_coords, astro_coords):
+        xy = [(obj["x"], obj["y"]) for obj in sep_coords]
+        if getattr(self.comparison_service, "pre_align", False) and astro_coords and sep_coords:
+            aligned = self.comparison_service.align(xy, astro_coords)
+            return aligned[:, 0], aligned[:, 1]
+        return [x for x, _ in xy], [y for _, y in xy]
+
+    def _remember_confirmed(self, field_key, unique_coords, ra_all, dec_all, unconfirmed):
+        unconfirmed = {id(obj) for obj in unconfirmed}
+        confirmed = [i for i, obj in enumerate(unique_coords) if id(obj) not in unconfirmed]
+        if confirmed:
+            inserted = self.reference_index.insert(field_key, [ra_all[i] for i in confirmed],
+                                                   [dec_all[i] for i in confirmed])
+            self.logger.info(self.service_name, f"Added {inserted} confirmed stars to reference index {field_key}")
+
+    def _estimate_depth(self, known, detections, wcs, match_radius_arcsec):
+        stars = sorted((obj for obj in known if obj.get("flux", 0) > 0), key=lambda obj: -obj["flux"])
+        stars = stars[:self.calibration_stars]
+        if not stars:
+            return None
+
+        self.catalog.set_mag_limit(None)
+        ra, dec = WcsTransformEngine.for_wcs(wcs).pix2world([obj["x"] for obj in stars],
+                                                             [obj["y"] for obj in stars])
+        matches = self.catalog.cross_match(ra, dec, radius_arcsec=match_radius_arcsec,
+                                           catalogs=(self.DEPTH_CATALOG,))
+        reference = (matches or {}).get(self.DEPTH_CATALOG)
+        if reference is None:
+            return None
+
+        fluxes = [obj["flux"] for obj, hit in zip(stars, reference["matched"]) if hit]
+        mags = [mag for mag, hit in zip(reference["mag"], reference["matched"]) if hit]
+        depth = estimate_limiting_magnitude(
+            fluxes, mags, [obj.get("flux", 0) for obj in detections], margin=self.mag_limit_margin
+        )
+        if depth:
+            self.logger.info(self.service_name, f"Limiting magnitude {depth['limiting_mag']:.2f} "
+                                                 f"(zeropoint {depth['zeropoint']:.2f}, {depth['calibration_stars']} stars)")
+        return depth
+
+    def _verify_field(self, unique_coords, ra_all, dec_all, wcs, xs, ys, match_radius_arcsec):
+        footprint = compute_footprint(wcs, xs, ys, margin_arcsec=match_radius_arcsec)
+        if footprint is None:
+            return None
+
+        field = self.catalog.query_field(*footprint)
+        if not field or all(sources is None for sources in field.values()):
+            self.logger.warning(self.service_name, "Field query returned no catalogs, falling back to per-object")
+            return None
+
+        hits = {
+            name: match_nearest(ra_all, dec_all, sources["ra"], sources["dec"], match_radius_arcsec)[0] >= 0
+            for name, sources in field.items() if sources is not None
+        }
+        return self._split_unmatched(unique_coords, hits, [name for name, sources in field.items()
+                                                           if sources is None])
+
+    def _verify_cross_match(self, unique_coords, ra_all, dec_all, match_radius_arcsec):
+        matches = self.catalog.cross_match(ra_all, dec_all, radius_arcsec=match_radius_arcsec)
+        if not matches or all(match is None for match in matches.values()):
+            self.logger.warning(self.service_name, "Cross-match returned no catalogs, falling back to per-object")
+            return None
+
+        hits = {name: np.asarray(match["matched"], dtype=bool) for name, match in matches.items() if match is not None}
+        return self._split_unmatched(unique_coords, hits, [name for name, match in matches.items()
+                                                           if match is None])
+
+    def _split_unmatched(self, unique_coords, hits, failed):
+        matched = np.zeros(len(unique_coords), dtype=bool)
+        stars = np.zeros(len(unique_coords), dtype=bool)
+        for name, hit in hits.items():
+            matched |= hit
+            if name != "mpc":
+                stars |= hit
+
+        unmatched = [obj for obj, m in zip(unique_coords, matched) if not m]
+        moving = [obj for obj, m, star in zip(unique_coords, matched, stars) if m and not star]
+        if not failed:
+            return unmatched, [], moving
+        self.logger.warning(self.service_name, f"Catalogs {', '.join(failed)} failed, {len(unmatched)} unmatched "
+                                                f"objects left unverified")
+        return [], unmatched, moving
@@ -3,5 +3,5 @@ from abc import ABC, abstractmethod
 
 class IAstrometryService(ABC):
     @abstractmethod
-    def calibrate_image(self, image_path, timeout):
+    def calibrate_image(self, image_path, timeout, cancelled=None):
         pass
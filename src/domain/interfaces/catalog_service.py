@@ -4,4 +4,16 @@ from abc import ABC, abstractmethod
 class ICatalogService(ABC):
     @abstractmethod
     def find_object_match(self, ra, dec, radius_arcsec, early_exit):
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def query_field(self, ra, dec, radius_deg):
+        pass
+
+    @abstractmethod
+    def cross_match(self, ra, dec, radius_arcsec, catalogs=None):
+        pass
+
+    def find_object_matches(self, coords, radius_arcsec=5, early_exit=True, mags=None):
+        return [self.find_object_match(ra, dec, radius_arcsec=radius_arcsec, early_exit=early_exit)
+                for ra, dec in coords]
@@ -1,16 +1,20 @@
 import os
+import time
+import numpy as np
 
 from astropy.wcs import WCS
 from src.infrastructure.utils.logger import Logger
 from astrometry_net_client import Client as AstrometryNetClient
 from src.domain.interfaces.astrometry_service import IAstrometryService
 from src.infrastructure.utils.image_highlighter import ImageHighlighter
+from src.infrastructure.utils.wcs_transform import WcsTransformEngine
 
 
 class AstrometryNetAdapter(IAstrometryService):
-    def __init__(self, api_key):
+    def __init__(self, api_key, poll_interval=5.0):
         self.service_name = "AstrometryNetAdapter"
         self.api_key = api_key
+        self.poll_interval = poll_interval
         self.session = None
         self.logger = Logger()
         try:
@@ -19,10 +23,13 @@ class AstrometryNetAdapter(IAstrometryService):
             self.logger.error(self.service_name, f"Client init failed: {e}")
             raise
 
-    def calibrate_image(self, image_path: str, timeout: int = 600):
+    def calibrate_image(self, image_path: str, timeout: int = 600, cancelled=None):
         try:
+            if cancelled is not None and cancelled.is_set():
+                return None
             job = self.client.upload_file(image_path)
-            job.until_done()
+            if not self._wait_for_job(job, timeout, cancelled):
+                return None
             job_id = getattr(job, "id", None)
             if not job_id or not job.success():
                 self.logger.error(self.service_name, "Calibration failed")
@@ -40,7 +47,9 @@ class AstrometryNetAdapter(IAstrometryService):
 
             wcs_header = job.wcs_file()
             wcs = WCS(wcs_header, relax=True)
-            x_pix, y_pix = wcs.all_world2pix(ra_known, dec_known, 0)
+            if wcs.pixel_shape is None and "IMAGEW" in wcs_header and "IMAGEH" in wcs_header:
+                wcs.pixel_shape = (int(wcs_header["IMAGEW"]), int(wcs_header["IMAGEH"]))
+            x_pix, y_pix = WcsTransformEngine.for_wcs(wcs).world2pix(ra_known, dec_known)
             pixel_coords = list(zip(x_pix, y_pix))
 
             pixel_xy = [(x, y) for (x, y) in pixel_coords]
@@ -53,11 +62,48 @@ class AstrometryNetAdapter(IAstrometryService):
             print(filtered_vis_path)
             highlighter.save(filtered_vis_path)
 
+            corr_coords, corr_residuals = self._load_correspondences(job, wcs)
             return {
                 "pixel_coords": pixel_coords,
+                "world_coords": list(zip(ra_known, dec_known)),
+                "corr_coords": corr_coords,
+                "corr_residuals": corr_residuals,
                 "wcs": wcs
             }
 
         except Exception as e:
             self.logger.error(self.service_name, f"Calibration error: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def _wait_for_job(self, job, timeout, cancelled=None):
+        deadline = time.monotonic() + timeout
+        while True:
+            if cancelled is not None and cancelled.is_set():
+                self.logger.info(self.service_name, "Calibration abandoned by caller")
+                return False
+            if job.done():
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.logger.error(self.service_name, f"Calibration timed out after {timeout}s")
+                return False
+            if cancelled is not None:
+                cancelled.wait(min(self.poll_interval, remaining))
+            else:
+                time.sleep(min(self.poll_interval, remaining))
+
+    def _load_correspondences(self, job, wcs=None):
+        try:
+            corr_hdul = job.corr_file()
+            data = corr_hdul[1].data
+            field_x = data['field_x'] - 1
+            field_y = data['field_y'] - 1
+        except Exception as e:
+            self.logger.warning(self.service_name, f"Correspondence file unavailable: {e}")
+            return None, None
+
+        residuals = None
+        if wcs is not None and 'index_ra' in data.names and 'index_dec' in data.names:
+            index_x, index_y = WcsTransformEngine.for_wcs(wcs).world2pix(data['index_ra'], data['index_dec'])
+            residuals = list(np.hypot(np.asarray(index_x) - field_x, np.asarray(index_y) - field_y))
+        return list(zip(field_x, field_y)), residuals
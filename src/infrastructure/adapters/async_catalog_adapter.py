@@ -0,0 +1,231 @@
+import time
+import asyncio
+import requests
+import threading
+
+from requests.adapters import HTTPAdapter
+from functools import partial
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from src.infrastructure.utils.circuit_breaker import CircuitBreaker
+from src.infrastructure.utils.rate_limiter import TokenBucket
+from src.infrastructure.adapters.celestial_catalog_adapter import CelestialCatalogAdapter
+
+
+class AsyncCatalogAdapter(CelestialCatalogAdapter):
+    SERVICE_LIMITS = {
+        "vizier": {"concurrency": 8, "rate": 10.0, "burst": 10},
+        "prefetch": {"concurrency": 4, "rate": 4.0, "burst": 4},
+        "mpc": {"concurrency": 2, "rate": 1.0, "burst": 2}
+    }
+    SLOT_POLL = 0.05
+
+    def __init__(self, vizier_server=None, field_page_radius_deg=0.25, tile_cache=None, service_limits=None,
+                 memo=None, scheduler=None, request_timeout=30.0, retry_policy=None, failure_threshold=3,
+                 cooldown=60.0, frame_deadline=None, hedge_delay=None, minor_planets=None):
+        super().__init__(vizier_server=vizier_server, field_page_radius_deg=field_page_radius_deg,
+                         tile_cache=tile_cache, memo=memo, scheduler=scheduler, request_timeout=request_timeout,
+                         retry_policy=retry_policy, failure_threshold=failure_threshold, cooldown=cooldown,
+                         frame_deadline=frame_deadline, hedge_delay=hedge_delay, minor_planets=minor_planets)
+        self.service_name = "AsyncCatalogAdapter"
+
+        self.limits = {service: dict(limits) for service, limits in self.SERVICE_LIMITS.items()}
+        for service, limits in (service_limits or {}).items():
+            self.limits.setdefault(service, {}).update(limits)
+
+        self.buckets = {
+            service: TokenBucket(limits["rate"], limits["burst"])
+            for service, limits in self.limits.items()
+        }
+        self.slots = {
+            service: threading.BoundedSemaphore(limits["concurrency"])
+            for service, limits in self.limits.items()
+        }
+        self.sessions = {"vizier": self._create_session(self.limits["vizier"]["concurrency"])}
+        for vizier in self.catalog_vizier.values():
+            self._install_session(vizier, self.sessions["vizier"])
+
+        workers = sum(limits["concurrency"] for limits in self.limits.values())
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="catalog")
+
+    def find_object_matches(self, coords, radius_arcsec=5, early_exit=True, mags=None):
+        coroutine = self.find_object_matches_async(coords, radius_arcsec=radius_arcsec, early_exit=early_exit,
+                                                   mags=mags)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+        with ThreadPoolExecutor(max_workers=1) as runner:
+            return runner.submit(asyncio.run, coroutine).result()
+
+    async def find_object_matches_async(self, coords, radius_arcsec=5, early_exit=True, mags=None):
+        semaphores = {
+            service: asyncio.Semaphore(limits["concurrency"])
+            for service, limits in self.limits.items()
+        }
+        mags = [None] * len(coords) if mags is None else mags
+        deadline = self._frame_deadline()
+        tasks = [
+            asyncio.ensure_future(self._match_async(ra, dec, radius_arcsec, early_exit, semaphores, mag, deadline))
+            for (ra, dec), mag in zip(coords, mags)
+        ]
+        if not tasks:
+            return []
+
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        matches = [task.result() if task in done else None for task in tasks]
+        skipped = sum(match is None for match in matches)
+        if skipped:
+            self.logger.warning(self.service_name, f"{skipped} of {len(coords)} objects left unverified")
+        return matches
+
+    def close(self):
+        if self.memo is not None:
+            self.memo.save()
+        self._executor.shutdown(wait=False)
+        for session in self.sessions.values():
+            session.close()
+
+    async def _match_async(self, ra, dec, radius_arcsec, early_exit, semaphores, mag=None, deadline=None):
+        key = self._memo_key(ra, dec, radius_arcsec, early_exit)
+        if key is not None:
+            cached = self.memo.get(key)
+            if cached is not None:
+                return cached
+
+        if early_exit and self.hedge_delay is not None:
+            responses = await self._hedged_async(self._catalog_order(ra, dec, mag), ra, dec, radius_arcsec,
+                                                 semaphores, mag, deadline)
+        elif early_exit:
+            responses = []
+            for name in self._catalog_order(ra, dec, mag):
+                responses.append(await self._catalog_async(name, ra, dec, radius_arcsec, semaphores, mag, deadline))
+                if responses[-1]:
+                    break
+            self._record_fanout(len(responses), len(responses), 0)
+        else:
+            responses = await asyncio.gather(*[
+                self._catalog_async(name, ra, dec, radius_arcsec, semaphores, mag, deadline)
+                for name in self.CATALOGS
+            ])
+
+        results = [row for rows in responses if rows for row in rows]
+        if not (early_exit and results) and self._mpc_available():
+            query = partial(self._guarded_query, "mpc", self._query_mpc, ra, dec, radius_arcsec, deadline=deadline)
+            responses.append(await self._local(query) if self._local_mpc() else
+                             await self._call("mpc", semaphores, query))
+            results.extend(responses[-1] or [])
+
+        unverified = any(rows is None for rows in responses)
+        if unverified and not results:
+            return None
+        if key is not None:
+            self.memo.put(key, results, partial=unverified and not early_exit)
+        return results
+
+    async def _hedged_async(self, names, ra, dec, radius_arcsec, semaphores, mag=None, deadline=None):
+        loop = asyncio.get_running_loop()
+        running = {}
+        responses = []
+        launched = 0
+        winner = None
+        next_start = loop.time()
+
+        try:
+            while winner is None and (running or launched < len(names)):
+                now = loop.time()
+                if launched < len(names) and (not running or now >= next_start):
+                    task = asyncio.ensure_future(self._catalog_async(names[launched], ra, dec, radius_arcsec,
+                                                                     semaphores, mag, deadline))
+                    running[task] = names[launched]
+                    launched += 1
+                    next_start = now + self.hedge_delay
+                    continue
+
+                timeout = max(0.0, next_start - now) if launched < len(names) else None
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    responses.append(task.result())
+                    if responses[-1] and winner is None:
+                        winner = name
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        needed = names.index(winner) + 1 if winner is not None else launched
+        self._record_fanout(launched, needed, len(running))
+        if winner is not None:
+            return [rows for rows in responses if rows][:1]
+        return responses
+
+    async def _catalog_async(self, name, ra, dec, radius_arcsec, semaphores, mag=None, deadline=None):
+        query = partial(self._guarded_query, name, self._scheduled_query, name, ra, dec, radius_arcsec, mag,
+                        deadline=deadline)
+        if await self._local(self._is_cached, name, ra, dec, radius_arcsec):
+            return await self._local(query)
+        if self.breakers[name].state == CircuitBreaker.OPEN:
+            return None
+        return await self._call("vizier", semaphores, query)
+
+    async def _local(self, func, *args):
+        return await self._run_abandonable(func, *args)
+
+    async def _call(self, service, semaphores, func, *args):
+        async with semaphores[service]:
+            try:
+                return await self._run_abandonable(func, *args)
+            except Exception as e:
+                self.logger.warning(self.service_name, f"{service} query failed: {e}")
+                return None
+
+    async def _run_abandonable(self, func, *args):
+        cancelled = threading.Event()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, partial(self._abandonable, cancelled, func, *args))
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    @contextmanager
+    def _request_slot(self, service):
+        cancelled = self._cancel_event()
+        slot = self.slots[service]
+        while not slot.acquire(timeout=self.SLOT_POLL):
+            self._check_abandoned()
+        try:
+            self._check_abandoned()
+            if not self.buckets[service].acquire(cancelled=cancelled):
+                self._check_abandoned()
+            yield
+        finally:
+            slot.release()
+
+    def _is_cached(self, name, ra, dec, radius_arcsec):
+        if self.tile_cache is None:
+            return False
+        tiles = self.tile_cache.tiles_for_cone(ra, dec, radius_arcsec / 3600)
+        return not self.tile_cache.missing_tiles(self.tile_catalog(name), tiles)
+
+    def _create_session(self, pool_size):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _install_session(self, query, session):
+        previous = query._session
+        session.headers.update(previous.headers)
+        if not session.hooks["response"]:
+            session.hooks["response"].extend(previous.hooks.get("response", []))
+        query._session = session
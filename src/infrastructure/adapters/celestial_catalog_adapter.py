@@ -1,9 +1,12 @@
+import time
+import threading
 import warnings
+import numpy as np
 import astropy.units as u
 
+from contextlib import contextmanager
 from astropy.time import Time
 from astroquery.mpc import MPC
-from functools import lru_cache
 from astroquery.vizier import Vizier
 from astroquery.simbad import Simbad
 from astroquery.exceptions import NoResultsWarning
@@ -11,53 +14,459 @@ from src.infrastructure.utils.logger import Logger
 from typing import Dict, List, Tuple, Any, Optional
 from src.domain.interfaces.catalog_service import ICatalogService
 from astropy.coordinates import SkyCoord
+from src.infrastructure.utils.sky_geometry import gnomonic_project, gnomonic_deproject, angular_separation_deg
+from src.infrastructure.utils.circuit_breaker import CircuitBreaker
+from src.infrastructure.utils.retry_policy import RetryPolicy, QueryAbandoned
+from src.infrastructure.utils.hedged_runner import HedgedRunner
 
 
 class CelestialCatalogAdapter(ICatalogService):
-    def __init__(self):
+    CATALOGS = {
+        "gaia": ("I/355/gaiadr3", "Gmag"),
+        "usno": ("I/284/out", "R1mag"),
+        "ps1": ("II/349/ps1", "rmag")
+    }
+    MAG_LIMIT_OFFSETS = {"gaia": 0.0, "usno": 0.5, "ps1": 0.5}
+
+    def __init__(self, vizier_server=None, field_page_radius_deg=0.25, tile_cache=None, max_upload_size=5000,
+                 memo=None, scheduler=None, request_timeout=30.0, retry_policy=None, failure_threshold=3,
+                 cooldown=60.0, frame_deadline=None, hedge_delay=None, minor_planets=None):
         self.service_name = "CelestialCatalogAdapter"
         self.logger = Logger()
+        self.field_page_radius_deg = field_page_radius_deg
+        self.tile_cache = tile_cache
+        self.memo = memo
+        self.scheduler = scheduler
+        self.max_upload_size = max_upload_size
+        self.mag_limit = None
+        self.epoch = None
+        self.minor_planets = minor_planets
+        self.frame_deadline = frame_deadline
+        self.deadline = None
+        self.hedge_delay = hedge_delay
+        self.hedge_runner = HedgedRunner(is_valid=bool)
+        self._fanout_lock = threading.Lock()
+        self._fanout = {"lookups": 0, "launched": 0, "needed": 0, "abandoned": 0}
+        self._abandon = threading.local()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breakers = {
+            name: CircuitBreaker(failure_threshold, cooldown) for name in list(self.CATALOGS) + ["mpc"]
+        }
+        self.prefetch_breakers = {
+            name: CircuitBreaker(failure_threshold, cooldown) for name in self.CATALOGS
+        }
 
-        self.vizier = Vizier(
-            columns=["_RAJ2000", "_DEJ2000", "Bmag", "Vmag", "rmag", "imag"],
-            row_limit=-1
-        )
+        self.catalog_vizier = {
+            name: Vizier(columns=["_RAJ2000", "_DEJ2000", mag_column], row_limit=-1)
+            for name, (_, mag_column) in self.CATALOGS.items()
+        }
+        for vizier in self.catalog_vizier.values():
+            vizier.TIMEOUT = request_timeout
+            if vizier_server:
+                vizier.VIZIER_SERVER = vizier_server
 
         self.simbad = Simbad
-        self.simbad.add_votable_fields('flux(V)', 'flux(B)', 'flux(R)', 'otype', 'ids')
+        try:
+            self.simbad.add_votable_fields('flux(V)', 'flux(B)', 'flux(R)', 'otype', 'ids')
+        except Exception as e:
+            self.logger.warning(self.service_name, f"Simbad fields setup failed: {e}")
 
-    def find_object_match(self, ra, dec, radius_arcsec=5, early_exit=True):
-        coord = SkyCoord(ra=ra * u.deg, dec=dec * u.deg, frame="icrs")
-        radius = radius_arcsec * u.arcsec
-        results = []
+    def find_object_match(self, ra, dec, radius_arcsec=5, early_exit=True, mag=None, deadline=None):
+        key = self._memo_key(ra, dec, radius_arcsec, early_exit)
+        if key is not None:
+            cached = self.memo.get(key)
+            if cached is not None:
+                return cached
+
+        names = self._catalog_order(ra, dec, mag)
+        if early_exit and self.hedge_delay is not None:
+            results, unverified = self._hedged_catalogs(names, ra, dec, radius_arcsec, mag, deadline)
+        else:
+            results = []
+            unverified = False
+            queried = 0
+            for name in names:
+                queried += 1
+                rows = self._guarded_query(name, self._scheduled_query, name, ra, dec, radius_arcsec, mag,
+                                           deadline=deadline)
+                if rows is None:
+                    unverified = True
+                    continue
+                results.extend(rows)
+                if early_exit and results:
+                    break
+            if early_exit:
+                self._record_fanout(queried, queried, 0)
+
+        if not (early_exit and results) and self._mpc_available():
+            rows = self._guarded_query("mpc", self._query_mpc, ra, dec, radius_arcsec, deadline=deadline)
+            unverified = unverified or rows is None
+            results.extend(rows or [])
+
+        if unverified and not results:
+            return None
+        if key is not None:
+            self.memo.put(key, results, partial=unverified and not early_exit)
+        return results
+
+    def find_object_matches(self, coords, radius_arcsec=5, early_exit=True, mags=None):
+        mags = [None] * len(coords) if mags is None else mags
+        deadline = self._frame_deadline()
+        matches = []
+        for (ra, dec), mag in zip(coords, mags):
+            if deadline is not None and time.monotonic() >= deadline:
+                matches.append(None)
+                continue
+            matches.append(self.find_object_match(ra, dec, radius_arcsec=radius_arcsec, early_exit=early_exit,
+                                                  mag=mag, deadline=deadline))
+        skipped = sum(match is None for match in matches)
+        if skipped:
+            self.logger.warning(self.service_name, f"{skipped} of {len(coords)} objects left unverified")
+        return matches
+
+    def get_fanout_statistics(self):
+        with self._fanout_lock:
+            statistics = dict(self._fanout)
+        statistics["extra_queries"] = statistics["launched"] - statistics["needed"]
+        statistics["extra_load"] = statistics["extra_queries"] / statistics["needed"] if statistics["needed"] else 0.0
+        return statistics
 
-        catalogs = [
-            ("gaia", "I/355/gaiadr3"),
-            ("usno", "I/284/out"),
-            ("ps1", "II/349/ps1")
+    def _hedged_catalogs(self, names, ra, dec, radius_arcsec, mag, deadline):
+        completed = {}
+        cancelled = threading.Event()
+        tasks = [
+            (name, lambda name=name: self._abandonable(cancelled, self._guarded_query, name, self._scheduled_query,
+                                                       name, ra, dec, radius_arcsec, mag, deadline=deadline))
+            for name in names
         ]
+        delays = [index * self.hedge_delay for index in range(len(tasks))]
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+
+        outcome = self.hedge_runner.run(tasks, delays, timeout=timeout,
+                                        on_complete=lambda name, rows, error, latency: completed.update({name: rows}))
+        cancelled.set()
+
+        winner = outcome["winner"]
+        needed = names.index(winner) + 1 if winner is not None else len(outcome["launched"])
+        self._record_fanout(len(outcome["launched"]), needed, len(outcome["abandoned"]))
+        if winner is not None:
+            return list(outcome["result"]), False
+        unverified = bool(outcome["abandoned"] or outcome["skipped"]) or \
+            any(completed.get(name) is None for name in outcome["launched"])
+        return [], unverified
+
+    def _record_fanout(self, launched, needed, abandoned):
+        with self._fanout_lock:
+            self._fanout["lookups"] += 1
+            self._fanout["launched"] += launched
+            self._fanout["needed"] += needed
+            self._fanout["abandoned"] += abandoned
+
+    def _frame_deadline(self):
+        deadlines = [self.deadline] if self.deadline is not None else []
+        if self.frame_deadline is not None:
+            deadlines.append(time.monotonic() + self.frame_deadline)
+        return min(deadlines) if deadlines else None
+
+    def _guarded_query(self, name, func, *args, deadline=None, breakers=None):
+        breaker = (breakers or self.breakers)[name]
+        if not breaker.allow():
+            return None
+        try:
+            rows = self.retry_policy.call(func, *args, deadline=deadline)
+        except QueryAbandoned:
+            breaker.release_probe()
+            return None
+        except Exception as e:
+            breaker.record_failure()
+            self.logger.warning(self.service_name, f"{name} query failed: {e}")
+            return None
+        breaker.record_success()
+        return rows
+
+    def _catalog_order(self, ra, dec, mag):
+        if self.scheduler is None:
+            return list(self.CATALOGS)
+        return self.scheduler.order(list(self.CATALOGS), ra, dec, mag)
+
+    def _scheduled_query(self, name, ra, dec, radius_arcsec, mag=None):
+        started = time.monotonic()
+        rows = self._query_catalog(name, ra, dec, radius_arcsec)
+        if self.scheduler is not None:
+            self.scheduler.record(name, ra, dec, bool(rows), time.monotonic() - started, mag=mag)
+        return rows
+
+    def set_mag_limit(self, mag_limit):
+        self.mag_limit = None if mag_limit is None else float(np.ceil(mag_limit * 4) / 4)
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def set_deadline(self, deadline):
+        self.deadline = deadline
+
+    def _memo_key(self, ra, dec, radius_arcsec, early_exit):
+        if self.memo is None:
+            return None
+        services = tuple(self.CATALOGS)
+        if self._local_mpc():
+            services += (f"mpc@{self.minor_planets.bucket_of(self.epoch)}",)
+        elif self._mpc_available():
+            services += ("mpc",)
+        if self.mag_limit is not None:
+            services += (f"mag<{self.mag_limit}",)
+        return self.memo.key(ra, dec, radius_arcsec, services, early_exit)
+
+    def _query_catalog(self, name, ra, dec, radius_arcsec):
+        _, mag_column = self.CATALOGS[name]
+        cached = self._cached_cone(name, ra, dec, radius_arcsec / 3600, fetch_missing=False)
+        if cached is not None:
+            return [
+                (name, {"_RAJ2000": src_ra, "_DEJ2000": src_dec, mag_column: src_mag})
+                for src_ra, src_dec, src_mag in zip(cached["ra"], cached["dec"], cached["mag"])
+            ]
+
+        coord = SkyCoord(ra=ra * u.deg, dec=dec * u.deg, frame="icrs")
+        tbl = self._vizier_query(name, coord, radius_arcsec * u.arcsec, self.catalog_mag_limit(name))
+        if tbl and len(tbl) > 0 and len(tbl[0]) > 0:
+            return [(name, row) for row in tbl[0]]
+        return []
+
+    def _vizier_query(self, name, coords, radius, mag_limit=None, service="vizier"):
+        catalog, mag_column = self.CATALOGS[name]
+        column_filters = {}
+        if mag_limit is not None:
+            column_filters[mag_column] = f"<{mag_limit}"
+        with self._request_slot(service), warnings.catch_warnings():
+            warnings.filterwarnings("ignore", category=NoResultsWarning)
+            return self.catalog_vizier[name].query_region(coords, radius=radius, catalog=catalog,
+                                                          column_filters=column_filters, cache=False)
+
+    @contextmanager
+    def _request_slot(self, service):
+        self._check_abandoned()
+        yield
+
+    def _abandonable(self, cancelled, func, *args, **kwargs):
+        self._abandon.cancelled = cancelled
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._abandon.cancelled = None
+
+    def _cancel_event(self):
+        return getattr(self._abandon, "cancelled", None)
+
+    def _check_abandoned(self):
+        cancelled = self._cancel_event()
+        if cancelled is not None and cancelled.is_set():
+            raise QueryAbandoned("query abandoned by caller")
 
-        for name, catalog in catalogs:
+    def catalog_mag_limit(self, name):
+        offset = self.MAG_LIMIT_OFFSETS.get(name)
+        if self.mag_limit is None or offset is None:
+            return None
+        return self.mag_limit + offset
+
+    def _mag_mask(self, name, mags):
+        mag_limit = self.catalog_mag_limit(name)
+        if mag_limit is None:
+            return np.ones(len(mags), dtype=bool)
+        return np.asarray(mags, dtype=float) < mag_limit
+
+    def _local_mpc(self):
+        return self.minor_planets is not None and self.epoch is not None
+
+    def _mpc_available(self):
+        return self._local_mpc() or hasattr(MPC, "query_objects_in_sky")
+
+    def _query_mpc(self, ra, dec, radius_arcsec):
+        if self._local_mpc():
+            found = self.minor_planets.query_cone(ra, dec, radius_arcsec / 3600, self.epoch, mag_limit=self.mag_limit)
+            return [
+                ("mpc", {"designation": str(name), "_RAJ2000": float(src_ra), "_DEJ2000": float(src_dec),
+                         "V": float(src_mag)})
+                for name, src_ra, src_dec, src_mag in zip(found["designation"], found["ra"], found["dec"],
+                                                          found["mag"])
+            ]
+        if not self._mpc_available():
+            return []
+        with self._request_slot("mpc"):
+            mpc = MPC.query_objects_in_sky(ra, dec, radius=radius_arcsec, limit=20)
+        if mpc and len(mpc) > 0:
+            return [("mpc", row) for row in mpc]
+        return []
+
+    def cross_match(self, ra, dec, radius_arcsec=5, catalogs=None):
+        ra = np.atleast_1d(np.asarray(ra, dtype=float))
+        dec = np.atleast_1d(np.asarray(dec, dtype=float))
+        matches = {}
+        deadline = self._frame_deadline()
+        for name, (catalog, mag_column) in self.CATALOGS.items():
+            if catalogs is not None and name not in catalogs:
+                continue
+            matches[name] = self._guarded_query(name, self._cross_match_catalog, name, catalog, mag_column, ra, dec,
+                                                radius_arcsec, deadline=deadline)
+        if self._local_mpc() and (catalogs is None or "mpc" in catalogs):
+            matches["mpc"] = self.minor_planets.cross_match(ra, dec, radius_arcsec, self.epoch,
+                                                            mag_limit=self.mag_limit)
+        return matches
+
+    def _cross_match_catalog(self, name, catalog, mag_column, ra, dec, radius_arcsec):
+        match = {
+            "matched": np.zeros(len(ra), dtype=bool),
+            "separation_arcsec": np.full(len(ra), np.inf),
+            "ra": np.full(len(ra), np.nan),
+            "dec": np.full(len(ra), np.nan),
+            "mag": np.full(len(ra), np.nan)
+        }
+
+        for start in range(0, len(ra), self.max_upload_size):
+            stop = min(start + self.max_upload_size, len(ra))
+            coords = SkyCoord(ra=ra[start:stop] * u.deg, dec=dec[start:stop] * u.deg, frame="icrs")
+            tbl = self._vizier_query(name, coords if stop - start > 1 else coords[0], radius_arcsec * u.arcsec,
+                                     self.catalog_mag_limit(name))
+            if not tbl or len(tbl) == 0 or len(tbl[0]) == 0:
+                continue
+
+            table = tbl[0]
+            if "_q" in table.colnames:
+                owner = np.asarray(table["_q"], dtype=int) - 1 + start
+            else:
+                owner = np.full(len(table), start)
+            src_ra = np.asarray(table["_RAJ2000"], dtype=float)
+            src_dec = np.asarray(table["_DEJ2000"], dtype=float)
+            if mag_column in table.colnames:
+                src_mag = np.ma.filled(np.ma.asarray(table[mag_column], dtype=float), np.nan)
+            else:
+                src_mag = np.full(len(table), np.nan)
+            separation = angular_separation_deg(ra[owner], dec[owner], src_ra, src_dec) * 3600
+
+            order = np.lexsort((separation, owner))
+            nearest = order[np.concatenate([[True], owner[order][1:] != owner[order][:-1]])]
+            nearest = nearest[separation[nearest] <= radius_arcsec]
+            positions = owner[nearest]
+            match["matched"][positions] = True
+            match["separation_arcsec"][positions] = separation[nearest]
+            match["ra"][positions] = src_ra[nearest]
+            match["dec"][positions] = src_dec[nearest]
+            match["mag"][positions] = src_mag[nearest]
+
+        return match
+
+    def query_field(self, ra, dec, radius_deg):
+        field = {}
+        deadline = self._frame_deadline()
+        for name, (catalog, mag_column) in self.CATALOGS.items():
+            field[name] = self._guarded_query(name, self._field_sources, name, catalog, mag_column, ra, dec,
+                                              radius_deg, deadline=deadline)
+        if self._local_mpc():
+            found = self.minor_planets.query_cone(ra, dec, radius_deg, self.epoch, mag_limit=self.mag_limit)
+            field["mpc"] = {column: found[column] for column in ("ra", "dec", "mag")}
+        return field
+
+    def _field_sources(self, name, catalog, mag_column, ra, dec, radius_deg):
+        cached = self._cached_cone(name, ra, dec, radius_deg)
+        if cached is not None:
+            return cached
+        return self._query_field_catalog(name, catalog, mag_column, ra, dec, radius_deg)
+
+    def _query_field_catalog(self, name, catalog, mag_column, ra, dec, radius_deg):
+        columns = {"ra": [], "dec": [], "mag": []}
+        pages = self._field_pages(ra, dec, radius_deg)
+
+        for page_ra, page_dec, page_radius, cell in pages:
+            src_ra, src_dec, src_mag = self._query_cone_columns(name, catalog, mag_column,
+                                                                page_ra, page_dec, page_radius,
+                                                                self.catalog_mag_limit(name))
+            if cell is not None:
+                xi, eta = gnomonic_project(src_ra, src_dec, ra, dec)
+                keep = ((xi >= cell[0]) & (xi < cell[1]) & (eta >= cell[2]) & (eta < cell[3]))
+                src_ra, src_dec, src_mag = src_ra[keep], src_dec[keep], src_mag[keep]
+
+            columns["ra"].append(src_ra)
+            columns["dec"].append(src_dec)
+            columns["mag"].append(src_mag)
+
+        return {key: np.concatenate(values) if values else np.empty(0) for key, values in columns.items()}
+
+    def _query_cone_columns(self, name, catalog, mag_column, ra, dec, radius_deg, mag_limit=None, service="vizier"):
+        coord = SkyCoord(ra=ra * u.deg, dec=dec * u.deg, frame="icrs")
+        tbl = self._vizier_query(name, coord, radius_deg * u.deg, mag_limit, service)
+        if not tbl or len(tbl) == 0 or len(tbl[0]) == 0:
+            return np.empty(0), np.empty(0), np.empty(0)
+
+        table = tbl[0]
+        src_ra = np.asarray(table["_RAJ2000"], dtype=float)
+        src_dec = np.asarray(table["_DEJ2000"], dtype=float)
+        if mag_column in table.colnames:
+            src_mag = np.ma.filled(np.ma.asarray(table[mag_column], dtype=float), np.nan)
+        else:
+            src_mag = np.full(len(table), np.nan)
+        return src_ra, src_dec, src_mag
+
+    def _cached_cone(self, name, ra, dec, radius_deg, fetch_missing=True):
+        if self.tile_cache is None:
+            return None
+
+        tile_catalog = self.tile_catalog(name)
+        tiles = self.tile_cache.tiles_for_cone(ra, dec, radius_deg)
+        missing = self.tile_cache.missing_tiles(tile_catalog, tiles)
+        if missing and not fetch_missing:
+            return None
+        for tile in missing:
             try:
-                with warnings.catch_warnings():
-                    warnings.filterwarnings("ignore", category=NoResultsWarning)
-                    tbl = self.vizier.query_region(coord, radius=radius, catalog=catalog)
-                    if tbl and len(tbl) > 0 and len(tbl[0]) > 0:
-                        results.extend([(name, row) for row in tbl[0]])
-                        if early_exit and results:
-                            return results
+                self._fetch_tile(name, tile)
             except Exception as e:
-                pass
+                self.logger.warning(self.service_name, f"Tile {tile} fetch from {name} failed: {e}")
+                return None
 
-        try:
-            if hasattr(MPC, "query_objects_in_sky"):
-                mpc = MPC.query_objects_in_sky(coord.ra.deg, coord.dec.deg,
-                                               radius=radius.value, limit=20)
-                if mpc and len(mpc) > 0:
-                    results.extend([("mpc", row) for row in mpc])
-                    if early_exit and results:
-                        return results
-        except Exception:
-            pass
-
-        return results
\ No newline at end of file
+        cached = self.tile_cache.query_cone(tile_catalog, ra, dec, radius_deg)
+        if cached is None or self.catalog_mag_limit(name) is None:
+            return cached
+        keep = self._mag_mask(name, cached["mag"])
+        return {column: values[keep] for column, values in cached.items()}
+
+    def _fetch_tile(self, name, tile, service="vizier"):
+        catalog, mag_column = self.CATALOGS[name]
+        depth = self._tile_depth(name)
+        tile_ra, tile_dec, tile_radius = self.tile_cache.tile_cone(tile)
+        src_ra, src_dec, src_mag = self._query_cone_columns(name, catalog, mag_column,
+                                                            tile_ra, tile_dec, tile_radius * 1.01, depth, service)
+        inside = self.tile_cache.tile_of(src_ra, src_dec) == tile
+        self.tile_cache.put_tile(self.tile_catalog(name, depth), tile,
+                                 src_ra[inside], src_dec[inside], src_mag[inside])
+        return int(np.count_nonzero(inside))
+
+    def tile_catalog(self, name, depth=None):
+        catalog, _ = self.CATALOGS[name]
+        if depth is None:
+            depth = self._tile_depth(name)
+        return catalog if depth is None else f"{catalog}/mag{depth}"
+
+    def _tile_depth(self, name):
+        mag_limit = self.catalog_mag_limit(name)
+        return None if mag_limit is None else int(np.ceil(mag_limit))
+
+    def fetch_tile(self, name, tile, deadline=None):
+        return self._guarded_query(name, self._fetch_tile, name, tile, "prefetch", deadline=deadline,
+                                   breakers=self.prefetch_breakers)
+
+    def _field_pages(self, ra, dec, radius_deg):
+        if radius_deg <= self.field_page_radius_deg:
+            return [(ra, dec, radius_deg, None)]
+
+        side = self.field_page_radius_deg * np.sqrt(2)
+        count = int(np.ceil(2 * radius_deg / side))
+        edges = -count * side / 2 + side * np.arange(count + 1)
+        pages = []
+        for i in range(count):
+            for j in range(count):
+                cell = (edges[i], edges[i + 1], edges[j], edges[j + 1])
+                nearest_xi = np.clip(0.0, cell[0], cell[1])
+                nearest_eta = np.clip(0.0, cell[2], cell[3])
+                if np.hypot(nearest_xi, nearest_eta) > radius_deg:
+                    continue
+                page_ra, page_dec = gnomonic_deproject((cell[0] + cell[1]) / 2, (cell[2] + cell[3]) / 2, ra, dec)
+                pages.append((float(page_ra), float(page_dec), self.field_page_radius_deg * 1.01, cell))
+        return pages
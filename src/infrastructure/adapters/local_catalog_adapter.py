@@ -0,0 +1,110 @@
+import numpy as np
+
+from src.infrastructure.utils.logger import Logger
+from src.domain.interfaces.catalog_service import ICatalogService
+from src.infrastructure.utils.local_catalog_store import LocalCatalogStore
+
+
+class LocalCatalogAdapter(ICatalogService):
+    MAG_LIMIT_OFFSETS = {"gaia": 0.0, "usno": 0.5, "ps1": 0.5}
+
+    def __init__(self, store_dirs, epoch=None, minor_planets=None, cross_matcher=None):
+        self.service_name = "LocalCatalogAdapter"
+        self.logger = Logger()
+        self.epoch = epoch
+        self.minor_planets = minor_planets
+        self.cross_matcher = cross_matcher
+        self.mag_limit = None
+        self.stores = {}
+        for name, store_dir in store_dirs.items():
+            try:
+                self.stores[name] = LocalCatalogStore(store_dir)
+            except (OSError, ValueError, KeyError) as e:
+                self.logger.error(self.service_name, f"Local catalog {name} at {store_dir} unavailable: {e}")
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def set_mag_limit(self, mag_limit):
+        self.mag_limit = mag_limit
+
+    def find_object_match(self, ra, dec, radius_arcsec=5, early_exit=True):
+        results = []
+        for name, store in self.stores.items():
+            indices = store.cone(ra, dec, radius_arcsec / 3600, epoch=self.epoch, mag_limit=self._mag_limit(name))
+            if len(indices) == 0:
+                continue
+            results.extend([(name, self._row(store, index)) for index in indices])
+            if early_exit:
+                return results
+
+        if self._local_mpc():
+            found = self.minor_planets.query_cone(ra, dec, radius_arcsec / 3600, self.epoch, mag_limit=self.mag_limit)
+            results.extend(
+                ("mpc", {"designation": str(name), "_RAJ2000": float(src_ra), "_DEJ2000": float(src_dec),
+                         "V": float(src_mag)})
+                for name, src_ra, src_dec, src_mag in zip(found["designation"], found["ra"], found["dec"],
+                                                          found["mag"])
+            )
+        return results
+
+    def cross_match(self, ra, dec, radius_arcsec=5, catalogs=None):
+        matches = {}
+        for name, store in self.stores.items():
+            if catalogs is not None and name not in catalogs:
+                continue
+            if self.cross_matcher is not None:
+                indices, separations = self.cross_matcher.match(ra, dec, store, radius_arcsec, epoch=self.epoch,
+                                                                mag_limit=self._mag_limit(name))
+            else:
+                indices, separations = store.match_nearest(ra, dec, radius_arcsec, epoch=self.epoch,
+                                                           mag_limit=self._mag_limit(name))
+            matched = indices >= 0
+            src_ra, src_dec = store.positions(indices[matched], epoch=self.epoch)
+            match = {
+                "matched": matched,
+                "separation_arcsec": separations,
+                "ra": np.full(len(indices), np.nan),
+                "dec": np.full(len(indices), np.nan),
+                "mag": np.full(len(indices), np.nan)
+            }
+            match["ra"][matched] = src_ra
+            match["dec"][matched] = src_dec
+            match["mag"][matched] = store.columns["mag"][indices[matched]]
+            matches[name] = match
+        if self._local_mpc() and (catalogs is None or "mpc" in catalogs):
+            matches["mpc"] = self.minor_planets.cross_match(ra, dec, radius_arcsec, self.epoch,
+                                                            mag_limit=self.mag_limit)
+        return matches
+
+    def query_field(self, ra, dec, radius_deg):
+        field = {}
+        for name, store in self.stores.items():
+            indices = store.cone(ra, dec, radius_deg, epoch=self.epoch, mag_limit=self._mag_limit(name))
+            src_ra, src_dec = store.positions(indices, epoch=self.epoch)
+            field[name] = {
+                "ra": src_ra,
+                "dec": src_dec,
+                "mag": np.asarray(store.columns["mag"][indices], dtype=float)
+            }
+        if self._local_mpc():
+            found = self.minor_planets.query_cone(ra, dec, radius_deg, self.epoch, mag_limit=self.mag_limit)
+            field["mpc"] = {column: found[column] for column in ("ra", "dec", "mag")}
+        return field
+
+    def _mag_limit(self, name):
+        offset = self.MAG_LIMIT_OFFSETS.get(name)
+        if self.mag_limit is None or offset is None:
+            return None
+        return self.mag_limit + offset
+
+    def _local_mpc(self):
+        return self.minor_planets is not None and self.epoch is not None
+
+    def _row(self, store, index):
+        ra, dec = store.positions([index], epoch=self.epoch)
+        return {
+            "_RAJ2000": float(ra[0]),
+            "_DEJ2000": float(dec[0]),
+            store.mag_name: float(store.columns["mag"][index])
+        }
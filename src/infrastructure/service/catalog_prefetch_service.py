@@ -0,0 +1,127 @@
+import time
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from src.infrastructure.utils.logger import Logger
+from src.infrastructure.utils.sky_geometry import compute_footprint
+
+
+class CatalogPrefetchService:
+    def __init__(self, catalog_service, max_workers=4, margin_arcsec=30.0):
+        self.service_name = "CatalogPrefetchService"
+        self.catalog = catalog_service
+        self.margin_arcsec = margin_arcsec
+        self.logger = Logger()
+
+        self._planner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch-plan")
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._planning = set()
+        self._in_flight = {}
+        self.stats = {"frames": 0, "planned": 0, "in_flight": 0, "fetched": 0, "failed": 0, "sources": 0}
+
+    def footprint(self, wcs, xs=None, ys=None):
+        return compute_footprint(wcs, xs, ys, margin_arcsec=self.margin_arcsec)
+
+    def plan(self, footprints):
+        tile_cache = self.catalog.tile_cache
+        tiles = []
+        seen = set()
+        for ra, dec, radius_deg in footprints:
+            for tile in tile_cache.tiles_for_cone(ra, dec, radius_deg):
+                if int(tile) not in seen:
+                    seen.add(int(tile))
+                    tiles.append(int(tile))
+
+        plan = []
+        for name in self.catalog.CATALOGS:
+            plan.extend((name, tile) for tile in tile_cache.missing_tiles(self.catalog.tile_catalog(name), tiles))
+        return plan
+
+    def submit(self, footprints):
+        footprints = [footprint for footprint in footprints if footprint is not None]
+        if self.catalog.tile_cache is None or not footprints:
+            return None
+
+        with self._lock:
+            planning = self._planner.submit(self._schedule, footprints)
+            self._planning.add(planning)
+        planning.add_done_callback(self._planned)
+        return planning
+
+    def submit_wcs(self, wcs_list):
+        return self.submit([self.footprint(wcs) for wcs in wcs_list if wcs is not None])
+
+    def wait(self, planning=None, timeout=None):
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        if planning is None:
+            with self._lock:
+                plans = list(self._planning)
+        else:
+            plans = [planning]
+        if not self._wait(plans, deadline):
+            return False
+
+        if planning is None:
+            with self._lock:
+                futures = list(self._in_flight.values())
+        else:
+            futures = planning.result()
+        return self._wait(futures, deadline)
+
+    def close(self):
+        self._planner.shutdown(wait=False, cancel_futures=True)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _wait(futures, deadline):
+        if not futures:
+            return True
+        timeout = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+        _, pending = wait(futures, timeout=timeout)
+        return not pending
+
+    def _planned(self, planning):
+        with self._lock:
+            self._planning.discard(planning)
+
+    def _schedule(self, footprints):
+        try:
+            plan = self.plan(footprints)
+        except Exception as e:
+            self.logger.warning(self.service_name, f"Prefetch planning failed: {e}")
+            return []
+
+        futures = []
+        with self._lock:
+            self.stats["frames"] += len(footprints)
+            self.stats["planned"] += len(plan)
+            for key in plan:
+                if key in self._in_flight:
+                    self.stats["in_flight"] += 1
+                    futures.append(self._in_flight[key])
+                    continue
+                future = self._executor.submit(self._fetch, *key)
+                self._in_flight[key] = future
+                futures.append(future)
+
+        if plan:
+            self.logger.info(self.service_name, f"Prefetching {len(plan)} catalog tiles "
+                                                 f"for {len(footprints)} frames")
+        return futures
+
+    def _fetch(self, name, tile):
+        try:
+            sources = self.catalog.fetch_tile(name, tile)
+        except Exception as e:
+            sources = None
+            self.logger.warning(self.service_name, f"Prefetch of {name} tile {tile} failed: {e}")
+
+        with self._lock:
+            self._in_flight.pop((name, tile), None)
+            if sources is None:
+                self.stats["failed"] += 1
+            else:
+                self.stats["fetched"] += 1
+                self.stats["sources"] += sources
+        return sources
@@ -0,0 +1,103 @@
+import threading
+import numpy as np
+
+from collections import deque
+from src.infrastructure.utils.logger import Logger
+from src.infrastructure.utils.hedged_runner import HedgedRunner
+from src.domain.interfaces.astrometry_service import IAstrometryService
+
+
+class HedgedCalibrationService(IAstrometryService):
+    def __init__(self, backends, stagger_delays=None, initial_delay=30.0,
+                 delay_percentile=50, history_size=200):
+        self.service_name = "HedgedCalibrationService"
+        self.backends = list(backends)
+        self.stagger_delays = stagger_delays
+        self.initial_delay = initial_delay
+        self.delay_percentile = delay_percentile
+        self.logger = Logger()
+        self.runner = HedgedRunner(is_valid=lambda result: bool(result) and bool(result.get("wcs")))
+
+        self._lock = threading.Lock()
+        self._stats = {
+            name: {
+                "launched": 0,
+                "wins": 0,
+                "failures": 0,
+                "abandoned": 0,
+                "latencies": deque(maxlen=history_size)
+            }
+            for name, _ in self.backends
+        }
+
+    def calibrate_image(self, image_path, timeout=600, cancelled=None):
+        if cancelled is not None and cancelled.is_set():
+            return None
+        abandoned = threading.Event()
+        tasks = [
+            (name, lambda service=service: service.calibrate_image(image_path, timeout, cancelled=abandoned))
+            for name, service in self.backends
+        ]
+        delays = self._start_delays()
+
+        outcome = self.runner.run(tasks, delays, timeout=timeout, on_complete=self._record_completion,
+                                  cancelled=cancelled)
+        abandoned.set()
+
+        with self._lock:
+            for name in outcome["launched"]:
+                self._stats[name]["launched"] += 1
+            for name in outcome["abandoned"]:
+                self._stats[name]["abandoned"] += 1
+            if outcome["winner"] is not None:
+                self._stats[outcome["winner"]]["wins"] += 1
+
+        if outcome["winner"] is None and cancelled is not None and cancelled.is_set():
+            self.logger.info(self.service_name, "Calibration cancelled")
+            return None
+        if outcome["winner"] is None:
+            self.logger.error(self.service_name, "No backend produced a valid WCS")
+            return None
+
+        self.logger.info(self.service_name,
+                         f"Calibrated by {outcome['winner']} in {outcome['latency']:.1f}s, "
+                         f"launched {len(outcome['launched'])}/{len(tasks)} backends")
+        result = outcome["result"]
+        result["backend"] = outcome["winner"]
+        return result
+
+    def get_statistics(self):
+        with self._lock:
+            statistics = {}
+            for name, stats in self._stats.items():
+                latencies = np.array(stats["latencies"], dtype=float)
+                statistics[name] = {
+                    "launched": stats["launched"],
+                    "wins": stats["wins"],
+                    "failures": stats["failures"],
+                    "abandoned": stats["abandoned"],
+                    "win_rate": stats["wins"] / stats["launched"] if stats["launched"] else 0.0,
+                    "latency_p50": float(np.percentile(latencies, 50)) if latencies.size else None,
+                    "latency_p90": float(np.percentile(latencies, 90)) if latencies.size else None
+                }
+            return statistics
+
+    def _start_delays(self):
+        if self.stagger_delays is not None:
+            return [0.0] + list(self.stagger_delays)[:len(self.backends) - 1]
+
+        delays = [0.0]
+        with self._lock:
+            for name, _ in self.backends[:-1]:
+                latencies = self._stats[name]["latencies"]
+                step = np.percentile(latencies, self.delay_percentile) if latencies else self.initial_delay
+                delays.append(delays[-1] + float(step))
+        return delays
+
+    def _record_completion(self, name, result, error, latency):
+        with self._lock:
+            stats = self._stats[name]
+            if error is None and self.runner.is_valid(result):
+                stats["latencies"].append(latency)
+            else:
+                stats["failures"] += 1
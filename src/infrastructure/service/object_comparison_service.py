@@ -1,14 +1,22 @@
 import numpy as np
 
-from scipy.spatial import KDTree
+from itertools import chain
+from scipy.spatial import cKDTree
 from src.infrastructure.utils.logger import Logger
+from src.infrastructure.utils.sky_geometry import match_nearest
+from src.infrastructure.utils.assignment_matching import assign_one_to_one, assign_sky
+from src.infrastructure.utils.pre_alignment import estimate_alignment, apply_alignment
 from src.domain.interfaces.object_comparison_service import IObjectComparisonService
 
 
 class ObjectComparisonService(IObjectComparisonService):
-    def __init__(self):
+    def __init__(self, workers=1, assignment=None, pre_align=False, max_offset=20.0):
         self.service_name = "ObjectComparisonService"
         self.logger = Logger()
+        self.workers = workers
+        self.assignment = assignment
+        self.pre_align = pre_align
+        self.max_offset = max_offset
 
     def find_unique_objects(self, detected_objects, reference_objects, match_threshold=10):
         if not detected_objects:
@@ -17,17 +25,54 @@ class ObjectComparisonService(IObjectComparisonService):
         if not reference_objects:
             return detected_objects
 
-        ref_coords = np.array([[coord[0], coord[1]] for coord in reference_objects])
-        kdtree = KDTree(ref_coords)
+        indices = self.unique_indices(self.object_coords(detected_objects), reference_objects, match_threshold)
+        return [detected_objects[i] for i in indices]
 
-        unique_objects = []
+    def unique_mask(self, detected_xy, reference_xy, match_threshold=10):
+        detected = np.asarray(detected_xy, dtype=float).reshape(-1, 2)
+        reference = np.asarray(reference_xy, dtype=float).reshape(-1, 2)
+        if len(detected) == 0 or len(reference) == 0:
+            return np.ones(len(detected), dtype=bool)
 
-        detected_coords = np.array([[obj["x"], obj["y"]] for obj in detected_objects])
+        if self.pre_align:
+            detected = self.align(detected, reference)
+        threshold = np.asarray(match_threshold, dtype=float)
+        if self.assignment is not None:
+            _, distances = assign_one_to_one(detected, reference, float(threshold.max()), method=self.assignment)
+            return ~(distances <= threshold)
 
-        distances, _ = kdtree.query(detected_coords, k=1)
+        bound = np.nextafter(float(threshold.max()), np.inf)
+        distances, _ = cKDTree(reference).query(detected, k=1, distance_upper_bound=bound, workers=self.workers)
+        return ~(distances <= threshold)
 
-        for i, distance in enumerate(distances):
-            if distance > match_threshold:
-                unique_objects.append(detected_objects[i])
+    def align(self, detected_xy, reference_xy):
+        detected = np.asarray(detected_xy, dtype=float).reshape(-1, 2)
+        transform = estimate_alignment(detected, reference_xy, max_offset=self.max_offset)
+        if transform is None:
+            return detected
 
-        return unique_objects
\ No newline at end of file
+        self.logger.info(self.service_name, f"Pre-alignment: shift ({transform['shift'][0]:.2f}, "
+                                             f"{transform['shift'][1]:.2f}) px, rotation "
+                                             f"{np.degrees(transform['angle']):.3f} deg, {transform['pairs']} pairs")
+        return apply_alignment(detected, transform)
+
+    def unique_indices(self, detected_xy, reference_xy, match_threshold=10):
+        return np.flatnonzero(self.unique_mask(detected_xy, reference_xy, match_threshold))
+
+    def match_sky(self, ra, dec, ref_ra, ref_dec, threshold_arcsec=2.0):
+        if self.assignment is not None:
+            return assign_sky(ra, dec, ref_ra, ref_dec, threshold_arcsec, method=self.assignment)
+        return match_nearest(ra, dec, ref_ra, ref_dec, threshold_arcsec, workers=self.workers)
+
+    def unique_sky_mask(self, ra, dec, ref_ra, ref_dec, threshold_arcsec=2.0):
+        indices, _ = self.match_sky(ra, dec, ref_ra, ref_dec, threshold_arcsec)
+        return indices < 0
+
+    def unique_sky_indices(self, ra, dec, ref_ra, ref_dec, threshold_arcsec=2.0):
+        return np.flatnonzero(self.unique_sky_mask(ra, dec, ref_ra, ref_dec, threshold_arcsec))
+
+    @staticmethod
+    def object_coords(objects):
+        coords = np.fromiter(chain.from_iterable((obj["x"], obj["y"]) for obj in objects), dtype=float,
+                             count=2 * len(objects))
+        return coords.reshape(-1, 2)
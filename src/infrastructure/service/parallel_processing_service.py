@@ -1,5 +1,6 @@
 import threading
 
+from concurrent.futures import Future
 from src.infrastructure.utils.logger import Logger
 
 
@@ -18,11 +19,14 @@ class ParallelProcessingService:
             "astrometry": self.calibrate_image_use_case,
             "detection": self.detect_objects_use_case
         }
+        pending = {name: Future() for name in processors}
 
         for name, processor in processors.items():
+            processor_data = data.copy()
+            processor_data["pending"] = pending
             thread = threading.Thread(
                 target=self._execute_processor,
-                args=(name, processor, data.copy(), results),
+                args=(name, processor, processor_data, results),
                 daemon=True
             )
             threads.append(thread)
@@ -39,4 +43,6 @@ class ParallelProcessingService:
             results[name] = result
         except Exception as e:
             self.logger.error(self.service_name,f"Error in processor {name}: {str(e)}")
-            results[name] = {"error": str(e)}
\ No newline at end of file
+            results[name] = {"error": str(e)}
+        finally:
+            data["pending"][name].set_result(results.get(name))
\ No newline at end of file
@@ -0,0 +1,137 @@
+import time
+import numpy as np
+import astropy.units as u
+
+from scipy.spatial import cKDTree
+from concurrent.futures import wait
+from astropy.coordinates import SkyCoord
+from astropy.wcs.utils import fit_wcs_from_points
+from src.infrastructure.utils.logger import Logger
+from src.infrastructure.utils.assignment_matching import assign_one_to_one
+from src.domain.interfaces.astrometry_service import IAstrometryService
+
+
+class SequenceCalibrationService(IAstrometryService):
+    def __init__(self, astrometry_service, max_residual_pix=1.0, search_radius_pix=50.0, match_radius_pix=3.0,
+                 min_matches=8, sip_degree=None, poll_interval=0.1):
+        self.service_name = "SequenceCalibrationService"
+        self.astrometry_service = astrometry_service
+        self.max_residual_pix = max_residual_pix
+        self.search_radius_pix = search_radius_pix
+        self.match_radius_pix = match_radius_pix
+        self.min_matches = min_matches
+        self.sip_degree = sip_degree
+        self.poll_interval = poll_interval
+        self.logger = Logger()
+        self.reference = None
+
+    def reset(self):
+        self.reference = None
+
+    def calibrate_image(self, image_path, timeout=600, cancelled=None):
+        return self._solve(image_path, timeout, cancelled)
+
+    def calibrate_with_detections(self, image_path, detections, timeout=600, cancelled=None):
+        deadline = time.monotonic() + timeout
+        if self.reference is not None:
+            detection = self._wait_for_detections(detections, deadline, cancelled)
+            if cancelled is not None and cancelled.is_set():
+                return None
+            if detection is not None:
+                try:
+                    result = self._propagate(detection.get("pixel_coords", []))
+                    if result is not None:
+                        return result
+                except Exception as e:
+                    self.logger.warning(self.service_name, f"WCS propagation error: {e}")
+            self.logger.info(self.service_name, "WCS propagation rejected, running full solve")
+
+        return self._solve(image_path, max(0.0, deadline - time.monotonic()), cancelled)
+
+    def _wait_for_detections(self, detections, deadline, cancelled=None):
+        while not detections.done():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (cancelled is not None and cancelled.is_set()):
+                return None
+            wait([detections], timeout=min(remaining, self.poll_interval))
+
+        detection = detections.result()
+        if not detection or "error" in detection:
+            return None
+        return detection
+
+    def _solve(self, image_path, timeout, cancelled=None):
+        if cancelled is not None and cancelled.is_set():
+            return None
+        result = self.astrometry_service.calibrate_image(image_path, timeout, cancelled=cancelled)
+        if result is None or not result.get("wcs"):
+            self.reference = None
+            return result
+
+        wcs = result["wcs"]
+        world_coords = result.get("world_coords")
+        if world_coords:
+            ra, dec = np.asarray(world_coords, dtype=float).T
+        else:
+            pixel = np.asarray(result.get("pixel_coords", []), dtype=float).reshape(-1, 2)
+            ra, dec = wcs.all_pix2world(pixel[:, 0], pixel[:, 1], 0)
+
+        self.reference = {"wcs": wcs, "ra": np.asarray(ra), "dec": np.asarray(dec)}
+        result["propagated"] = False
+        return result
+
+    def _propagate(self, detected):
+        ref_ra = self.reference["ra"]
+        ref_dec = self.reference["dec"]
+        prev_wcs = self.reference["wcs"]
+        if len(ref_ra) < self.min_matches or len(detected) < self.min_matches:
+            return None
+        det_xy = np.column_stack([
+            np.fromiter((obj["x"] for obj in detected), dtype=float, count=len(detected)),
+            np.fromiter((obj["y"] for obj in detected), dtype=float, count=len(detected))
+        ])
+
+        pred_x, pred_y = prev_wcs.all_world2pix(ref_ra, ref_dec, 0)
+        pred_xy = np.column_stack([pred_x, pred_y])
+        tree = cKDTree(det_xy)
+
+        indices, _ = assign_one_to_one(pred_xy, det_xy, self.search_radius_pix, tree=tree)
+        found = indices >= 0
+        if found.sum() < self.min_matches:
+            return None
+        shift = np.median(det_xy[indices[found]] - pred_xy[found], axis=0)
+
+        indices, _ = assign_one_to_one(pred_xy + shift, det_xy, self.match_radius_pix, tree=tree)
+        found = indices >= 0
+        if found.sum() < self.min_matches:
+            return None
+
+        matched_xy = det_xy[indices[found]]
+        matched_sky = SkyCoord(ra=ref_ra[found] * u.deg, dec=ref_dec[found] * u.deg, frame="icrs")
+        proj_point = SkyCoord(ra=prev_wcs.wcs.crval[0] * u.deg, dec=prev_wcs.wcs.crval[1] * u.deg, frame="icrs")
+
+        wcs = fit_wcs_from_points((matched_xy[:, 0], matched_xy[:, 1]), matched_sky,
+                                  proj_point=proj_point, sip_degree=self.sip_degree)
+        if prev_wcs.pixel_shape is not None:
+            wcs.pixel_shape = prev_wcs.pixel_shape
+
+        fit_x, fit_y = wcs.all_world2pix(ref_ra[found], ref_dec[found], 0)
+        residuals = np.hypot(fit_x - matched_xy[:, 0], fit_y - matched_xy[:, 1])
+        residual = float(np.sqrt(np.mean(residuals ** 2)))
+        if residual > self.max_residual_pix:
+            self.logger.info(self.service_name, f"Fit residual {residual:.2f} px exceeds threshold")
+            return None
+
+        self.reference["wcs"] = wcs
+        x_pix, y_pix = wcs.all_world2pix(ref_ra, ref_dec, 0)
+
+        return {
+            "pixel_coords": list(zip(x_pix, y_pix)),
+            "world_coords": list(zip(ref_ra, ref_dec)),
+            "corr_coords": [tuple(xy) for xy in matched_xy],
+            "corr_residuals": list(residuals),
+            "wcs": wcs,
+            "propagated": True,
+            "matched_count": int(found.sum()),
+            "fit_residual_pix": residual
+        }
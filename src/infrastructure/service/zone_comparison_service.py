@@ -0,0 +1,28 @@
+import numpy as np
+
+from src.infrastructure.utils.logger import Logger
+from src.infrastructure.utils.zone_cross_match import ZoneCrossMatcher
+from src.domain.interfaces.object_comparison_service import IObjectComparisonService
+
+
+class ZoneComparisonService(IObjectComparisonService):
+    def __init__(self, cross_matcher=None):
+        self.service_name = "ZoneComparisonService"
+        self.logger = Logger()
+        self.cross_matcher = cross_matcher or ZoneCrossMatcher()
+
+    def find_unique_objects(self, detected_objects, reference_objects, match_threshold=10):
+        if not detected_objects:
+            return []
+
+        if not reference_objects:
+            return detected_objects
+
+        ref_coords = np.array([[coord[0], coord[1]] for coord in reference_objects], dtype=float)
+        detected_coords = np.array([[obj["x"], obj["y"]] for obj in detected_objects], dtype=float)
+
+        threshold = np.asarray(match_threshold, dtype=float)
+        _, distances = self.cross_matcher.match_planar(detected_coords[:, 0], detected_coords[:, 1],
+                                                       ref_coords[:, 0], ref_coords[:, 1], float(threshold.max()))
+
+        return [obj for obj, unique in zip(detected_objects, ~(distances <= threshold)) if unique]
@@ -0,0 +1,428 @@
+import io
+import os
+import ssl
+import json
+import time
+import random
+import tempfile
+import threading
+import contextlib
+import numpy as np
+
+from astropy.io import fits
+from astropy.table import Table
+from astropy.io.votable import from_table
+from urllib.parse import urlsplit
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from src.infrastructure.utils.logger import Logger
+from src.infrastructure.utils.rate_limiter import TokenBucket
+
+
+class FaultProfile:
+    def __init__(self, latency=0.0, latency_sigma=0.0, error_rate=0.0, rate_limit=None,
+                 burst=None, seed=None):
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.bucket = TokenBucket(rate_limit, burst) if rate_limit else None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        if self.latency <= 0:
+            return 0.0
+        with self._lock:
+            if self.latency_sigma > 0:
+                return self.latency * self._random.lognormvariate(0.0, self.latency_sigma)
+            return self.latency
+
+    def failure_status(self):
+        if self.bucket is not None and not self.bucket.try_acquire():
+            return 429
+        with self._lock:
+            if self.error_rate > 0 and self._random.random() < self.error_rate:
+                return 500
+        return None
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.owner._dispatch(self, "GET")
+
+    def do_POST(self):
+        self.server.owner._dispatch(self, "POST")
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def respond(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StandInServer:
+    def __init__(self, sky, faults=None, host="127.0.0.1", port=0):
+        self.sky = sky
+        self.host = host
+        self.faults = faults or FaultProfile()
+        self.logger = Logger()
+        self.stats = {"requests": 0, "errors": 0, "throttled": 0}
+        self._stats_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _StandInHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.owner = self
+        self._thread = None
+
+    @property
+    def address(self):
+        return f"{self.host}:{self._httpd.server_address[1]}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _dispatch(self, handler, method):
+        body = handler.read_body() if method == "POST" else b""
+        with self._stats_lock:
+            self.stats["requests"] += 1
+
+        time.sleep(self.faults.delay())
+        status = self.faults.failure_status()
+        if status is not None:
+            with self._stats_lock:
+                self.stats["throttled" if status == 429 else "errors"] += 1
+            headers = {"Retry-After": "1"} if status == 429 else None
+            handler.respond(status, b"stand-in fault", "text/html", headers)
+            return
+
+        try:
+            path = urlsplit(handler.path).path
+            status, payload, content_type = self.handle(method, path, body)
+        except Exception as e:
+            self.logger.error(self.__class__.__name__, f"Stand-in handler error: {e}")
+            status, payload, content_type = 500, str(e).encode(), "text/html"
+        handler.respond(status, payload, content_type)
+
+
+class AstrometryStandInServer(StandInServer):
+    def __init__(self, sky, faults=None, solve_time=0.0, host="127.0.0.1", port=0):
+        super().__init__(sky, faults, host, port)
+        self.solve_time = solve_time
+        self._submissions = {}
+        self._next_id = 1
+        self._id_lock = threading.Lock()
+
+    @property
+    def proxy_url(self):
+        return f"http://{self.address}"
+
+    def handle(self, method, path, body):
+        parts = [p for p in path.split("/") if p]
+        if parts[:1] == ["api"]:
+            parts = parts[1:]
+
+        if parts == ["login"]:
+            return self._json({"status": "success", "message": "authenticated user", "session": "stand-in"})
+        if parts == ["upload"] and method == "POST":
+            return self._json({"status": "success", "subid": self._create_submission(), "hash": "stand-in"})
+        if len(parts) == 2 and parts[0] == "submissions":
+            return self._json(self._submission_status(int(parts[1])))
+        if len(parts) == 2 and parts[0] == "jobs":
+            solved = self._is_solved(int(parts[1]))
+            return self._json({"status": "success" if solved else "solving"})
+        if len(parts) == 3 and parts[0] == "jobs" and parts[2] == "info":
+            return self._json(self._job_info(int(parts[1])))
+        if len(parts) == 2 and parts[0] in ("wcs_file", "rdls_file", "corr_file"):
+            if not self._is_solved(int(parts[1])):
+                return 404, b"job not solved", "text/html"
+            return 200, getattr(self, f"_{parts[0]}")(), "application/fits"
+        return 404, b"unknown endpoint", "text/html"
+
+    @staticmethod
+    def _json(payload):
+        return 200, json.dumps(payload).encode(), "text/plain"
+
+    def _create_submission(self):
+        with self._id_lock:
+            sub_id = self._next_id
+            self._next_id += 1
+            self._submissions[sub_id] = time.monotonic()
+        return sub_id
+
+    def _is_solved(self, sub_id):
+        created = self._submissions.get(sub_id)
+        return created is not None and time.monotonic() - created >= self.solve_time
+
+    def _submission_status(self, sub_id):
+        solved = self._is_solved(sub_id)
+        return {
+            "processing_started": "stand-in",
+            "processing_finished": "stand-in" if solved else None,
+            "user": 1,
+            "user_images": [sub_id],
+            "images": [sub_id],
+            "jobs": [sub_id] if solved else [],
+            "job_calibrations": [[sub_id, sub_id]] if solved else []
+        }
+
+    def _job_info(self, sub_id):
+        ra, dec = self.sky.center
+        return {
+            "status": "success" if self._is_solved(sub_id) else "solving",
+            "objects_in_field": [],
+            "machine_tags": [],
+            "tags": [],
+            "original_filename": "stand-in.png",
+            "calibration": {
+                "ra": ra,
+                "dec": dec,
+                "pixscale": self.sky.pixel_scale_arcsec,
+                "orientation": 0.0,
+                "parity": 1.0,
+                "radius": float(np.hypot(*self.sky.image_size) * self.sky.pixel_scale_arcsec / 7200)
+            }
+        }
+
+    def _wcs_file(self):
+        header = self.sky.wcs.to_header(relax=True)
+        header["IMAGEW"] = self.sky.image_size[0]
+        header["IMAGEH"] = self.sky.image_size[1]
+        return header.tostring().encode()
+
+    def _rdls_file(self):
+        indices, _, _ = self.sky.stars_in_image(mag_limit=self.sky.index_mag_limit)
+        table = Table({"RA": self.sky.stars["ra"][indices], "DEC": self.sky.stars["dec"][indices]})
+        return self._fits_bytes(table)
+
+    def _corr_file(self):
+        indices, x, y = self.sky.stars_in_image(mag_limit=self.sky.index_mag_limit)
+        ra = self.sky.stars["ra"][indices]
+        dec = self.sky.stars["dec"][indices]
+        table = Table({
+            "field_x": x + 1,
+            "field_y": y + 1,
+            "field_ra": ra,
+            "field_dec": dec,
+            "index_ra": ra,
+            "index_dec": dec,
+            "index_id": indices,
+            "match_weight": np.ones(len(indices))
+        })
+        return self._fits_bytes(table)
+
+    @staticmethod
+    def _fits_bytes(table):
+        buffer = io.BytesIO()
+        fits.HDUList([fits.PrimaryHDU(), fits.table_to_hdu(table)]).writeto(buffer)
+        return buffer.getvalue()
+
+
+class VizierStandInServer(StandInServer):
+    def __init__(self, sky, faults=None, host="127.0.0.1", port=0, use_tls=True):
+        super().__init__(sky, faults, host, port)
+        self.ca_bundle = None
+        self._cert_dir = None
+        if use_tls:
+            self._enable_tls(host)
+
+    def _enable_tls(self, host):
+        self._cert_dir = tempfile.TemporaryDirectory(prefix="vizier_stand_in_")
+        cert_path, key_path = _create_self_signed_certificate(host, self._cert_dir.name)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_path, key_path)
+        self._httpd.socket = context.wrap_socket(self._httpd.socket, server_side=True)
+        self.ca_bundle = cert_path
+
+    def stop(self):
+        super().stop()
+        if self._cert_dir is not None:
+            self._cert_dir.cleanup()
+
+    def handle(self, method, path, body):
+        if not path.startswith("/viz-bin/"):
+            return 404, b"unknown endpoint", "text/html"
+
+        params, positions = self._parse_script(body.decode("utf-8", errors="replace"))
+        catalogs = [c for c in params.get("-source", "").split(",") if c]
+        radius_deg = self._radius_deg(params)
+        row_limit = params.get("-out.max", "50")
+        row_limit = None if row_limit == "unlimited" else int(row_limit)
+        columns = [c for key in ("-out", "-out.add") for c in params.get(key, "").split(",") if c]
+
+        tables = []
+        for catalog in catalogs:
+            table = self._query_catalog(catalog, positions, radius_deg, params, columns, row_limit)
+            if table is not None:
+                tables.append((catalog, table))
+        return 200, self._votable_bytes(tables), "text/xml"
+
+    @staticmethod
+    def _parse_script(script):
+        params = {}
+        positions = []
+        list_key = None
+        for line in script.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if list_key is not None:
+                if line == "====AstroqueryList":
+                    list_key = None
+                else:
+                    positions.append(line)
+                continue
+            key, _, value = line.partition("=")
+            if value == "<<====AstroqueryList":
+                list_key = key
+            elif key == "-c":
+                positions.append(value)
+            else:
+                params[key] = value
+        return params, [VizierStandInServer._parse_position(p) for p in positions]
+
+    @staticmethod
+    def _parse_position(text):
+        split = max(text.rfind("+"), text.rfind("-"))
+        return float(text[:split]), float(text[split:])
+
+    @staticmethod
+    def _radius_deg(params):
+        for key, factor in (("-c.rd", 1.0), ("-c.rm", 1 / 60), ("-c.rs", 1 / 3600)):
+            if key in params:
+                return float(params[key].split(",")[-1]) * factor
+        return 2.0 / 60
+
+    def _query_catalog(self, catalog, positions, radius_deg, params, columns, row_limit):
+        mag_column = self.sky.CATALOG_MAG_COLUMNS.get(catalog, "mag")
+        mag_limit = None
+        mag_filter = params.get(mag_column)
+        if mag_filter and mag_filter.startswith("<"):
+            mag_limit = float(mag_filter.lstrip("<="))
+
+        rows = {"_q": [], "_r": [], "index": []}
+        for number, (ra, dec) in enumerate(positions, start=1):
+            indices, separation = self.sky.cone(ra, dec, radius_deg, mag_limit)
+            rows["_q"].extend([number] * len(indices))
+            rows["_r"].extend(separation)
+            rows["index"].extend(indices)
+
+        if not rows["index"]:
+            return None
+        if row_limit is not None:
+            rows = {key: values[:row_limit] for key, values in rows.items()}
+
+        index = np.asarray(rows["index"], dtype=int)
+        stars = self.sky.stars
+        available = {
+            "_RAJ2000": stars["ra"][index],
+            "_DEJ2000": stars["dec"][index],
+            "RAJ2000": stars["ra"][index],
+            "DEJ2000": stars["dec"][index],
+            "RA_ICRS": stars["ra"][index],
+            "DE_ICRS": stars["dec"][index],
+            mag_column: stars["mag"][index],
+            "_r": np.asarray(rows["_r"]) * 60,
+            "_q": np.asarray(rows["_q"], dtype=int)
+        }
+        if len(positions) > 1:
+            columns = columns + ["_q"]
+        selected = [c for c in dict.fromkeys(columns or ["_RAJ2000", "_DEJ2000", mag_column]) if c in available]
+        return Table({name: available[name] for name in selected})
+
+    @staticmethod
+    def _votable_bytes(tables):
+        if not tables:
+            tables = [("empty", Table({"_RAJ2000": np.array([], dtype=float)}))]
+
+        votable = from_table(tables[0][1])
+        resource = votable.resources[0]
+        resource.tables[0].name = tables[0][0]
+        for name, table in tables[1:]:
+            extra = from_table(table).resources[0].tables[0]
+            extra.name = name
+            resource.tables.append(extra)
+
+        buffer = io.BytesIO()
+        votable.to_xml(buffer)
+        return buffer.getvalue()
+
+
+@contextlib.contextmanager
+def stand_in_environment(astrometry_server=None, vizier_server=None):
+    overrides = {"NO_PROXY": "127.0.0.1,localhost", "no_proxy": "127.0.0.1,localhost"}
+    if astrometry_server is not None:
+        overrides.update({"HTTP_PROXY": astrometry_server.proxy_url, "http_proxy": astrometry_server.proxy_url})
+    if vizier_server is not None and vizier_server.ca_bundle is not None:
+        overrides["REQUESTS_CA_BUNDLE"] = vizier_server.ca_bundle
+
+    previous = {key: os.environ.get(key) for key in overrides}
+    os.environ.update(overrides)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def _create_self_signed_certificate(host, directory):
+    import ipaddress
+    import datetime
+    from cryptography import x509
+    from cryptography.x509.oid import NameOID
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+
+    try:
+        alt_name = x509.IPAddress(ipaddress.ip_address(host))
+    except ValueError:
+        alt_name = x509.DNSName(host)
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, host)])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([alt_name]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+
+    cert_path = os.path.join(directory, "stand_in.pem")
+    key_path = os.path.join(directory, "stand_in.key")
+    with open(cert_path, "wb") as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL,
+                                  serialization.NoEncryption()))
+    return cert_path, key_path
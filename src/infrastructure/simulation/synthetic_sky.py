@@ -0,0 +1,107 @@
+import numpy as np
+
+from PIL import Image
+from astropy.wcs import WCS
+
+
+class SyntheticSky:
+    CATALOG_MAG_COLUMNS = {
+        "I/355/gaiadr3": "Gmag",
+        "I/284/out": "R1mag",
+        "II/349/ps1": "rmag"
+    }
+
+    def __init__(self, center_ra=150.0, center_dec=30.0, image_size=(1024, 768),
+                 pixel_scale_arcsec=1.5, star_count=400, unknown_count=5,
+                 mag_range=(9.0, 19.0), catalog_margin_deg=0.25, index_mag_limit=15.0, seed=0):
+        self.rng = np.random.default_rng(seed)
+        self.image_size = tuple(image_size)
+        self.pixel_scale_arcsec = pixel_scale_arcsec
+        self.index_mag_limit = index_mag_limit
+        self.mag_range = mag_range
+
+        width, height = self.image_size
+        self.wcs = WCS(naxis=2)
+        self.wcs.wcs.ctype = ["RA---TAN", "DEC--TAN"]
+        self.wcs.wcs.crval = [center_ra, center_dec]
+        self.wcs.wcs.crpix = [width / 2 + 0.5, height / 2 + 0.5]
+        scale = pixel_scale_arcsec / 3600
+        self.wcs.wcs.cd = np.array([[-scale, 0.0], [0.0, scale]])
+        self.wcs.pixel_shape = (width, height)
+
+        margin_pix = catalog_margin_deg / scale
+        field_stars = int(star_count * (width + 2 * margin_pix) * (height + 2 * margin_pix) / (width * height))
+        x = self.rng.uniform(-margin_pix, width + margin_pix, field_stars)
+        y = self.rng.uniform(-margin_pix, height + margin_pix, field_stars)
+        ra, dec = self.wcs.all_pix2world(x, y, 0)
+        self.stars = {"ra": ra, "dec": dec, "mag": self._magnitudes(field_stars)}
+
+        edge = 20
+        ux = self.rng.uniform(edge, width - edge, unknown_count)
+        uy = self.rng.uniform(edge, height - edge, unknown_count)
+        ura, udec = self.wcs.all_pix2world(ux, uy, 0)
+        self.unknown = {
+            "ra": ura,
+            "dec": udec,
+            "mag": self.rng.uniform(mag_range[0] + 2, index_mag_limit, unknown_count)
+        }
+
+    def _magnitudes(self, count):
+        low, high = self.mag_range
+        slope = 0.3 * np.log(10)
+        u = self.rng.uniform(0, 1, count)
+        return np.log(np.exp(slope * low) + u * (np.exp(slope * high) - np.exp(slope * low))) / slope
+
+    @property
+    def center(self):
+        return tuple(self.wcs.wcs.crval)
+
+    def cone(self, ra, dec, radius_deg, mag_limit=None):
+        separation = self.separation_deg(ra, dec, self.stars["ra"], self.stars["dec"])
+        mask = separation <= radius_deg
+        if mag_limit is not None:
+            mask &= self.stars["mag"] <= mag_limit
+        indices = np.flatnonzero(mask)
+        order = np.argsort(separation[indices])
+        return indices[order], separation[indices][order]
+
+    def stars_in_image(self, mag_limit=None):
+        x, y = self.wcs.all_world2pix(self.stars["ra"], self.stars["dec"], 0)
+        width, height = self.image_size
+        mask = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        if mag_limit is not None:
+            mask &= self.stars["mag"] <= mag_limit
+        return np.flatnonzero(mask), x[mask], y[mask]
+
+    def render_image(self, path, zeropoint=24.0, background=20.0, noise=2.0, sigma_pix=1.5):
+        width, height = self.image_size
+        image = np.full((height, width), background, dtype=np.float64)
+
+        indices, x, y = self.stars_in_image()
+        ux, uy = self.wcs.all_world2pix(self.unknown["ra"], self.unknown["dec"], 0)
+        x = np.concatenate([x, ux])
+        y = np.concatenate([y, uy])
+        mags = np.concatenate([self.stars["mag"][indices], self.unknown["mag"]])
+        fluxes = 10 ** (-0.4 * (mags - zeropoint))
+
+        half = int(np.ceil(4 * sigma_pix))
+        offsets = np.arange(-half, half + 1)
+        for xc, yc, flux in zip(x, y, fluxes):
+            ix, iy = int(round(xc)), int(round(yc))
+            xs = np.clip(ix + offsets, 0, width - 1)
+            ys = np.clip(iy + offsets, 0, height - 1)
+            gx = np.exp(-0.5 * ((xs - xc) / sigma_pix) ** 2)
+            gy = np.exp(-0.5 * ((ys - yc) / sigma_pix) ** 2)
+            stamp = np.outer(gy, gx) * flux / (2 * np.pi * sigma_pix ** 2)
+            image[np.ix_(ys, xs)] += stamp
+
+        image += self.rng.normal(0, noise, image.shape)
+        Image.fromarray(np.clip(image, 0, 255).astype(np.uint8)).save(path)
+        return path
+
+    @staticmethod
+    def separation_deg(ra1, dec1, ra2, dec2):
+        ra1, dec1, ra2, dec2 = map(np.deg2rad, (ra1, dec1, ra2, dec2))
+        hav = (np.sin((dec2 - dec1) / 2) ** 2 +
+               np.cos(dec1) * np.cos(dec2) * np.sin((ra2 - ra1) / 2) ** 2)
+        return np.rad2deg(2 * np.arcsin(np.sqrt(np.clip(hav, 0, 1))))
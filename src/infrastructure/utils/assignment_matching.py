@@ -0,0 +1,109 @@
+import numpy as np
+
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+from src.infrastructure.utils.sky_geometry import radec_to_unit, arcsec_to_chord, chord_to_arcsec
+
+ASSIGNMENT_METHODS = ("optimal", "greedy")
+
+
+def candidate_pairs(points, ref_points, radius, tree=None):
+    points = np.asarray(points, dtype=float)
+    if len(points) == 0 or (tree is None and len(ref_points) == 0):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+
+    if tree is None:
+        tree = cKDTree(np.asarray(ref_points, dtype=float))
+    pairs = cKDTree(points).sparse_distance_matrix(tree, radius, output_type="ndarray")
+    return pairs["i"].astype(np.int64), pairs["j"].astype(np.int64), pairs["v"]
+
+
+def assign_one_to_one(points, ref_points, radius, method="optimal", max_component_size=400, tree=None):
+    if method not in ASSIGNMENT_METHODS:
+        raise ValueError(f"Unknown assignment method: {method}")
+
+    rows, cols, costs = candidate_pairs(points, ref_points, radius, tree)
+    ref_count = len(ref_points) if tree is None else tree.n
+    return assign_pairs(len(points), ref_count, rows, cols, costs, radius, method=method,
+                        max_component_size=max_component_size)
+
+
+def assign_pairs(count, ref_count, rows, cols, costs, radius, method="optimal", max_component_size=400):
+    if method not in ASSIGNMENT_METHODS:
+        raise ValueError(f"Unknown assignment method: {method}")
+
+    indices = np.full(count, -1, dtype=np.int64)
+    distances = np.full(count, np.inf)
+    if len(rows) == 0:
+        return indices, distances
+
+    graph = coo_matrix((np.ones(len(rows)), (rows, count + cols)), shape=(count + ref_count, count + ref_count))
+    _, labels = connected_components(graph, directed=False)
+    component = labels[rows]
+
+    order = np.argsort(component, kind="stable")
+    rows, cols, costs, component = rows[order], cols[order], costs[order], component[order]
+    starts = np.flatnonzero(np.concatenate([[True], component[1:] != component[:-1]]))
+    stops = np.append(starts[1:], len(rows))
+
+    single = stops - starts == 1
+    indices[rows[starts[single]]] = cols[starts[single]]
+    distances[rows[starts[single]]] = costs[starts[single]]
+
+    for start, stop in zip(starts[~single], stops[~single]):
+        edges = slice(start, stop)
+        if method == "optimal":
+            local_rows, row_ids = np.unique(rows[edges], return_inverse=True)
+            local_cols, col_ids = np.unique(cols[edges], return_inverse=True)
+            if max(len(local_rows), len(local_cols)) <= max_component_size:
+                matched_rows, matched_cols, matched_costs = _solve_component(
+                    local_rows, local_cols, row_ids, col_ids, costs[edges], radius
+                )
+                indices[matched_rows] = matched_cols
+                distances[matched_rows] = matched_costs
+                continue
+        matched_rows, matched_cols, matched_costs = _greedy_component(rows[edges], cols[edges], costs[edges])
+        indices[matched_rows] = matched_cols
+        distances[matched_rows] = matched_costs
+
+    return indices, distances
+
+
+def assign_sky(ra, dec, ref_ra, ref_dec, radius_arcsec, method="optimal", max_component_size=400, tree=None):
+    ra = np.atleast_1d(np.asarray(ra, dtype=float))
+    if ra.size == 0 or (tree is None and len(ref_ra) == 0):
+        return np.full(ra.shape, -1, dtype=np.int64), np.full(ra.shape, np.inf)
+
+    ref_points = None if tree is not None else radec_to_unit(ref_ra, ref_dec)
+    indices, chords = assign_one_to_one(radec_to_unit(ra, dec), ref_points, float(arcsec_to_chord(radius_arcsec)),
+                                        method=method, max_component_size=max_component_size, tree=tree)
+    separations = np.full(ra.shape, np.inf)
+    separations[indices >= 0] = chord_to_arcsec(chords[indices >= 0])
+    return indices, separations
+
+
+def _solve_component(local_rows, local_cols, row_ids, col_ids, costs, radius):
+    unmatched = radius * (len(local_rows) + len(local_cols)) + 1.0
+    cost = np.full((len(local_rows), len(local_cols)), unmatched)
+    cost[row_ids, col_ids] = costs
+    row_ind, col_ind = linear_sum_assignment(cost)
+    valid = cost[row_ind, col_ind] < unmatched
+    row_ind, col_ind = row_ind[valid], col_ind[valid]
+    return local_rows[row_ind], local_cols[col_ind], cost[row_ind, col_ind]
+
+
+def _greedy_component(rows, cols, costs):
+    used_rows = set()
+    used_cols = set()
+    matched = []
+    for edge in np.argsort(costs, kind="stable"):
+        row, col = rows[edge], cols[edge]
+        if row in used_rows or col in used_cols:
+            continue
+        used_rows.add(row)
+        used_cols.add(col)
+        matched.append(edge)
+    matched = np.asarray(matched, dtype=np.int64)
+    return rows[matched], cols[matched], costs[matched]
@@ -0,0 +1,85 @@
+import math
+import threading
+import numpy as np
+import astropy.units as u
+
+from collections import defaultdict
+from astropy_healpix import HEALPix
+
+
+class AdaptiveCatalogScheduler:
+    def __init__(self, region_nside=8, mag_bin_width=1.0, prior_strength=4.0, prior_hit_rate=0.5,
+                 latency_prior=1.0, latency_alpha=0.2):
+        self.healpix = HEALPix(nside=region_nside, order="nested")
+        self.mag_bin_width = mag_bin_width
+        self.prior_strength = prior_strength
+        self.prior_hit_rate = prior_hit_rate
+        self.latency_prior = latency_prior
+        self.latency_alpha = latency_alpha
+
+        self._counts = defaultdict(lambda: [0, 0])
+        self._latency = {}
+        self._lock = threading.Lock()
+
+    def order(self, names, ra, dec, mag=None):
+        region, mag_bin = self._cell(ra, dec, mag)
+        with self._lock:
+            costs = {name: self._latency_of(name) / max(self._hit_rate(name, region, mag_bin), 1e-3)
+                     for name in names}
+        return sorted(names, key=lambda name: costs[name])
+
+    def record(self, name, ra, dec, hit, latency, mag=None):
+        region, mag_bin = self._cell(ra, dec, mag)
+        with self._lock:
+            for key in ((name,), (name, region), (name, region, mag_bin)):
+                counts = self._counts[key]
+                counts[0] += int(bool(hit))
+                counts[1] += 1
+            previous = self._latency.get(name)
+            self._latency[name] = latency if previous is None else \
+                (1 - self.latency_alpha) * previous + self.latency_alpha * latency
+
+    def expected_time_to_hit(self, names, ra, dec, mag=None):
+        region, mag_bin = self._cell(ra, dec, mag)
+        with self._lock:
+            elapsed = 0.0
+            expected = 0.0
+            miss_probability = 1.0
+            for name in names:
+                elapsed += self._latency_of(name)
+                p_hit = self._hit_rate(name, region, mag_bin)
+                expected += miss_probability * p_hit * elapsed
+                miss_probability *= 1 - p_hit
+            return expected + miss_probability * elapsed
+
+    def statistics(self):
+        with self._lock:
+            stats = {}
+            for key, (hits, trials) in self._counts.items():
+                entry = stats.setdefault(key[0], {"hits": 0, "queries": 0, "latency": None, "regions": {}})
+                if len(key) == 1:
+                    entry.update(hits=hits, queries=trials, hit_rate=hits / trials,
+                                 latency=self._latency.get(key[0]))
+                elif len(key) == 3:
+                    entry["regions"][(key[1], key[2])] = {
+                        "hits": hits,
+                        "queries": trials,
+                        "hit_rate": self._hit_rate(key[0], key[1], key[2])
+                    }
+            return stats
+
+    def _hit_rate(self, name, region, mag_bin):
+        estimate = self.prior_hit_rate
+        for key in ((name,), (name, region), (name, region, mag_bin)):
+            hits, trials = self._counts.get(key, (0, 0))
+            estimate = (hits + self.prior_strength * estimate) / (trials + self.prior_strength)
+        return estimate
+
+    def _latency_of(self, name):
+        return self._latency.get(name, self.latency_prior)
+
+    def _cell(self, ra, dec, mag):
+        region = int(self.healpix.lonlat_to_healpix(ra * u.deg, dec * u.deg))
+        if mag is None or not np.isfinite(mag):
+            return region, None
+        return region, int(math.floor(mag / self.mag_bin_width))
@@ -0,0 +1,222 @@
+import os
+import time
+import uuid
+import threading
+import numpy as np
+import astropy.units as u
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from astropy_healpix import HEALPix
+from src.infrastructure.utils.logger import Logger
+from src.infrastructure.utils.sky_geometry import angular_separation_deg
+
+
+class CatalogTileCache:
+    COLUMNS = ("ra", "dec", "mag")
+
+    def __init__(self, cache_dir, nside=128, max_bytes=512 * 1024 * 1024, memory_tiles=256,
+                 touch_interval=60.0, lock_timeout=10.0, stale_lock_age=30.0):
+        self.service_name = "CatalogTileCache"
+        self.logger = Logger()
+        self.cache_dir = cache_dir
+        self.healpix = HEALPix(nside=nside, order="nested")
+        self.max_bytes = max_bytes
+        self.memory_tiles = memory_tiles
+        self.touch_interval = touch_interval
+        self.lock_timeout = lock_timeout
+        self.stale_lock_age = stale_lock_age
+
+        self._memory = OrderedDict()
+        self._touched = {}
+        self._lock = threading.Lock()
+        self._lock_path = os.path.join(cache_dir, ".lock")
+        os.makedirs(cache_dir, exist_ok=True)
+        self._bytes_estimate = self._scan()[1]
+
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def tiles_for_cone(self, ra, dec, radius_deg):
+        tiles = self.healpix.cone_search_lonlat(ra * u.deg, dec * u.deg, radius=radius_deg * u.deg)
+        return np.unique(tiles)
+
+    def tile_cone(self, tile):
+        lon, lat = self.healpix.healpix_to_lonlat([tile])
+        corners_lon, corners_lat = self.healpix.boundaries_lonlat([tile], step=4)
+        radius = np.max(angular_separation_deg(lon.deg[0], lat.deg[0], corners_lon.deg[0], corners_lat.deg[0]))
+        return float(lon.deg[0]), float(lat.deg[0]), float(radius)
+
+    def tile_of(self, ra, dec):
+        return self.healpix.lonlat_to_healpix(np.asarray(ra) * u.deg, np.asarray(dec) * u.deg)
+
+    def missing_tiles(self, catalog, tiles):
+        return [tile for tile in tiles if self.get_tile(catalog, tile) is None]
+
+    def query_cone(self, catalog, ra, dec, radius_deg):
+        tiles = [self.get_tile(catalog, tile) for tile in self.tiles_for_cone(ra, dec, radius_deg)]
+        if any(tile is None for tile in tiles):
+            return None
+
+        bands = []
+        for tile in tiles:
+            start, stop = np.searchsorted(tile["dec"], [dec - radius_deg, dec + radius_deg], side="left")
+            bands.append({name: tile[name][start:stop] for name in self.COLUMNS})
+
+        columns = {name: np.concatenate([band[name] for band in bands]) for name in self.COLUMNS}
+        inside = angular_separation_deg(ra, dec, columns["ra"], columns["dec"]) <= radius_deg
+        return {name: values[inside] for name, values in columns.items()}
+
+    def get_tile(self, catalog, tile):
+        key = (catalog, int(tile))
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+        if data is None:
+            data = self._load(key)
+        if data is None:
+            self._count("misses")
+            return None
+
+        self._count("hits")
+        self._touch(key)
+        return data
+
+    def put_tile(self, catalog, tile, ra, dec, mag):
+        key = (catalog, int(tile))
+        order = np.argsort(np.asarray(dec, dtype=np.float64), kind="stable")
+        data = {
+            "ra": np.ascontiguousarray(np.asarray(ra, dtype=np.float64)[order]),
+            "dec": np.ascontiguousarray(np.asarray(dec, dtype=np.float64)[order]),
+            "mag": np.ascontiguousarray(np.asarray(mag, dtype=np.float32)[order])
+        }
+        path = self._tile_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(f, **data)
+            size = os.path.getsize(tmp_path)
+            try:
+                replaced = os.path.getsize(path)
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.warning(self.service_name, f"Tile store failed for {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        self._remember(key, data)
+        with self._lock:
+            self.stats["stores"] += 1
+            self._bytes_estimate += size - replaced
+            over_budget = self._bytes_estimate > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def evict(self):
+        try:
+            with self._file_lock():
+                entries, total = self._scan()
+                entries.sort(key=lambda entry: entry[1])
+                for path, _, size in entries:
+                    if total <= self.max_bytes:
+                        break
+                    try:
+                        os.remove(path)
+                        total -= size
+                        self._count("evictions")
+                    except FileNotFoundError:
+                        pass
+        except TimeoutError as e:
+            self.logger.warning(self.service_name, str(e))
+            return
+
+        with self._lock:
+            self._bytes_estimate = total
+            self._memory.clear()
+
+    def size_bytes(self):
+        return self._scan()[1]
+
+    def _load(self, key):
+        path = self._tile_path(key)
+        try:
+            with np.load(path) as npz:
+                data = {name: npz[name] for name in self.COLUMNS}
+        except (FileNotFoundError, OSError, ValueError, KeyError):
+            return None
+        self._remember(key, data)
+        return data
+
+    def _remember(self, key, data):
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_tiles:
+                self._memory.popitem(last=False)
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _touch(self, key):
+        now = time.time()
+        if now - self._touched.get(key, 0.0) < self.touch_interval:
+            return
+        self._touched[key] = now
+        try:
+            os.utime(self._tile_path(key))
+        except FileNotFoundError:
+            with self._lock:
+                self._memory.pop(key, None)
+
+    def _tile_path(self, key):
+        catalog, tile = key
+        catalog_dir = catalog.replace("/", "_")
+        return os.path.join(self.cache_dir, catalog_dir, f"nside{self.healpix.nside}", f"{tile}.npz")
+
+    def _scan(self):
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".npz"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((path, stat.st_mtime, stat.st_size))
+                total += stat.st_size
+        return entries, total
+
+    @contextmanager
+    def _file_lock(self):
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            try:
+                fd = os.open(self._lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self._lock_path) > self.stale_lock_age:
+                        os.remove(self._lock_path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Cache lock {self._lock_path} is busy")
+                time.sleep(0.01)
+        try:
+            yield
+        finally:
+            try:
+                os.remove(self._lock_path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,255 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import threading
+import numpy as np
+import astropy.units as u
+
+from contextlib import contextmanager
+from scipy.spatial import cKDTree
+from astropy_healpix import HEALPix
+from src.infrastructure.utils.logger import Logger
+from src.infrastructure.utils.sky_geometry import radec_to_unit, match_nearest, arcsec_to_chord, chord_to_arcsec
+from src.infrastructure.utils.assignment_matching import candidate_pairs, assign_pairs
+from src.infrastructure.utils.local_catalog_store import LocalCatalogStore
+from src.infrastructure.utils.sky_clustering import friends_of_friends, cluster_representatives
+
+
+class FieldReferenceIndex:
+    def __init__(self, index_dir, field_nside=16, zone_height_deg=0.05, compact_threshold=5000,
+                 duplicate_arcsec=1.0, lock_timeout=30.0, stale_lock_age=120.0):
+        self.service_name = "FieldReferenceIndex"
+        self.logger = Logger()
+        self.index_dir = index_dir
+        self.healpix = HEALPix(nside=field_nside, order="nested")
+        self.zone_height_deg = zone_height_deg
+        self.compact_threshold = compact_threshold
+        self.duplicate_arcsec = duplicate_arcsec
+        self.lock_timeout = lock_timeout
+        self.stale_lock_age = stale_lock_age
+
+        self._fields = {}
+        self._lock = threading.Lock()
+        self.stats = {"builds": 0, "inserted": 0, "compactions": 0, "queries": 0}
+
+    def field_key(self, ra, dec):
+        return f"n{self.healpix.nside}_{int(self.healpix.lonlat_to_healpix(ra * u.deg, dec * u.deg))}"
+
+    def has_field(self, key):
+        return os.path.exists(self._current_path(key))
+
+    def size(self, key):
+        field = self._open(key)
+        if field is None:
+            return 0
+        return len(field["store"]) + len(field["delta"])
+
+    def build(self, key, ra, dec):
+        ra, dec = self._unique(np.atleast_1d(np.asarray(ra, dtype=float)), np.atleast_1d(np.asarray(dec, dtype=float)))
+        try:
+            with self._file_lock(key):
+                self._build(key, ra, dec)
+        except TimeoutError as e:
+            self.logger.warning(self.service_name, str(e))
+        return self._open(key)
+
+    def insert(self, key, ra, dec):
+        ra = np.atleast_1d(np.asarray(ra, dtype=float))
+        dec = np.atleast_1d(np.asarray(dec, dtype=float))
+        if len(ra) == 0:
+            return 0
+        try:
+            with self._file_lock(key):
+                return self._insert(key, ra, dec)
+        except TimeoutError as e:
+            self.logger.warning(self.service_name, str(e))
+            return 0
+
+    def _build(self, key, ra, dec):
+        version = self._next_version(key)
+        self._write_version(key, version, ra, dec)
+        self.stats["builds"] += 1
+
+    def _insert(self, key, ra, dec):
+        if not self.has_field(key):
+            ra, dec = self._unique(ra, dec)
+            self._build(key, ra, dec)
+            self.stats["inserted"] += len(ra)
+            return len(ra)
+
+        indices, _ = self.match(key, ra, dec, self.duplicate_arcsec)
+        ra, dec = self._unique(ra[indices < 0], dec[indices < 0])
+        if len(ra) == 0:
+            return 0
+
+        field = self._open(key)
+        delta = np.concatenate([field["delta"], np.column_stack([ra, dec])])
+        if len(delta) > self.compact_threshold:
+            base_ra, base_dec = field["store"].positions(np.arange(len(field["store"])))
+            self._write_version(key, field["version"] + 1, np.concatenate([base_ra, delta[:, 0]]),
+                                np.concatenate([base_dec, delta[:, 1]]))
+            self.stats["compactions"] += 1
+        else:
+            self._save_array(os.path.join(self._version_dir(key, field["version"]), "delta.npy"), delta)
+        self.stats["inserted"] += len(ra)
+        return len(ra)
+
+    def match(self, key, ra, dec, radius_arcsec):
+        ra = np.atleast_1d(np.asarray(ra, dtype=float))
+        dec = np.atleast_1d(np.asarray(dec, dtype=float))
+        radius_arcsec = np.asarray(radius_arcsec, dtype=float)
+        field = self._open(key)
+        self.stats["queries"] += 1
+        if field is None:
+            return np.full(len(ra), -1, dtype=np.int64), np.full(len(ra), np.inf)
+
+        indices, separations = field["store"].match_nearest(ra, dec, float(radius_arcsec.max()))
+        if len(field["delta"]):
+            delta_indices, delta_separations = match_nearest(ra, dec, None, None, float(radius_arcsec.max()),
+                                                             tree=field["delta_tree"])
+            closer = delta_separations < separations
+            indices[closer] = len(field["store"]) + delta_indices[closer]
+            separations[closer] = delta_separations[closer]
+        outside = separations > radius_arcsec
+        indices[outside] = -1
+        separations[outside] = np.inf
+        return indices, separations
+
+    def assign(self, key, ra, dec, radius_arcsec, method="optimal"):
+        ra = np.atleast_1d(np.asarray(ra, dtype=float))
+        dec = np.atleast_1d(np.asarray(dec, dtype=float))
+        radius_arcsec = np.broadcast_to(np.asarray(radius_arcsec, dtype=float), ra.shape)
+        field = self._open(key)
+        self.stats["queries"] += 1
+        if field is None or len(ra) == 0:
+            return np.full(len(ra), -1, dtype=np.int64), np.full(len(ra), np.inf)
+
+        max_radius = float(radius_arcsec.max())
+        rows, cols, separations = field["store"].candidates(ra, dec, max_radius / 3600.0)
+        separations = separations * 3600.0
+        if len(field["delta"]):
+            delta_rows, delta_cols, chords = candidate_pairs(radec_to_unit(ra, dec), None,
+                                                             float(arcsec_to_chord(max_radius)),
+                                                             tree=field["delta_tree"])
+            rows = np.concatenate([rows, delta_rows])
+            cols = np.concatenate([cols, len(field["store"]) + delta_cols])
+            separations = np.concatenate([separations, chord_to_arcsec(chords)])
+
+        inside = separations <= radius_arcsec[rows]
+        return assign_pairs(len(ra), len(field["store"]) + len(field["delta"]), rows[inside], cols[inside],
+                            separations[inside], max_radius, method=method)
+
+    def unique_mask(self, key, ra, dec, radius_arcsec, assignment=None):
+        if assignment is not None:
+            indices, _ = self.assign(key, ra, dec, radius_arcsec, method=assignment)
+        else:
+            indices, _ = self.match(key, ra, dec, radius_arcsec)
+        return indices < 0
+
+    def _open(self, key):
+        try:
+            with open(self._current_path(key), "r", encoding="utf-8") as f:
+                version = json.load(f)["version"]
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+        version_dir = self._version_dir(key, version)
+        delta_path = os.path.join(version_dir, "delta.npy")
+        delta_mtime = os.path.getmtime(delta_path) if os.path.exists(delta_path) else None
+
+        with self._lock:
+            field = self._fields.get(key)
+            if field is not None and field["version"] == version and field["delta_mtime"] == delta_mtime:
+                return field
+
+        store = field["store"] if field is not None and field["version"] == version else \
+            LocalCatalogStore(os.path.join(version_dir, "base"))
+        delta = np.load(delta_path) if delta_mtime is not None else np.empty((0, 2))
+        field = {
+            "version": version,
+            "store": store,
+            "delta": delta,
+            "delta_mtime": delta_mtime,
+            "delta_tree": cKDTree(radec_to_unit(delta[:, 0], delta[:, 1])) if len(delta) else None
+        }
+        with self._lock:
+            self._fields[key] = field
+        return field
+
+    def _write_version(self, key, version, ra, dec):
+        version_dir = self._version_dir(key, version)
+        tmp_dir = f"{version_dir}.{uuid.uuid4().hex}.tmp"
+        LocalCatalogStore.build(os.path.join(tmp_dir, "base"), key, ra, dec, np.zeros(len(ra)), epoch=0.0,
+                                zone_height_deg=self.zone_height_deg)
+        if os.path.exists(version_dir):
+            shutil.rmtree(version_dir)
+        os.replace(tmp_dir, version_dir)
+
+        current_tmp = f"{self._current_path(key)}.{uuid.uuid4().hex}.tmp"
+        with open(current_tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": version, "count": int(len(ra))}, f)
+        os.replace(current_tmp, self._current_path(key))
+
+        with self._lock:
+            previous = self._fields.pop(key, None)
+        if previous is not None:
+            previous["store"].close()
+
+        field_dir = os.path.join(self.index_dir, key)
+        for name in os.listdir(field_dir):
+            if name.startswith("v") and name != f"v{version}" and not name.endswith(".tmp"):
+                shutil.rmtree(os.path.join(field_dir, name), ignore_errors=True)
+        self.logger.info(self.service_name, f"Reference index {key} v{version}: {len(ra)} stars")
+
+    def _next_version(self, key):
+        field = self._open(key)
+        return 1 if field is None else field["version"] + 1
+
+    def _unique(self, ra, dec):
+        if len(ra) < 2:
+            return ra, dec
+        keep = np.sort(cluster_representatives(friends_of_friends(ra, dec, self.duplicate_arcsec)))
+        return ra[keep], dec[keep]
+
+    def _save_array(self, path, array):
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp.npy"
+        np.save(tmp_path, array)
+        os.replace(tmp_path, path)
+
+    @contextmanager
+    def _file_lock(self, key):
+        field_dir = os.path.join(self.index_dir, key)
+        os.makedirs(field_dir, exist_ok=True)
+        lock_path = os.path.join(field_dir, ".lock")
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > self.stale_lock_age:
+                        os.remove(lock_path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Reference index lock {lock_path} is busy")
+                time.sleep(0.01)
+        try:
+            yield
+        finally:
+            try:
+                os.remove(lock_path)
+            except FileNotFoundError:
+                pass
+
+    def _current_path(self, key):
+        return os.path.join(self.index_dir, key, "current.json")
+
+    def _version_dir(self, key, version):
+        return os.path.join(self.index_dir, key, f"v{version}")
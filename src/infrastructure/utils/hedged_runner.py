@@ -0,0 +1,95 @@
+import time
+import queue
+import threading
+
+
+class HedgedRunner:
+    def __init__(self, is_valid=None, cancel_poll_interval=0.1):
+        self.is_valid = is_valid or (lambda result: result is not None)
+        self.cancel_poll_interval = cancel_poll_interval
+
+    def run(self, tasks, delays, timeout=None, on_complete=None, cancelled=None):
+        completions = queue.Queue()
+        started_at = time.monotonic()
+        deadline = started_at + timeout if timeout is not None else None
+        launched = []
+        finished = set()
+        errors = {}
+        report_lock = threading.Lock()
+        decided = threading.Event()
+
+        def launch(name, func):
+            def target():
+                begin = time.monotonic()
+                try:
+                    result, error = func(), None
+                except Exception as e:
+                    result, error = None, e
+                latency = time.monotonic() - begin
+                if on_complete:
+                    with report_lock:
+                        if not decided.is_set():
+                            on_complete(name, result, error, latency)
+                completions.put((name, result, error, latency))
+
+            launched.append(name)
+            threading.Thread(target=target, daemon=True).start()
+
+        def finish(outcome):
+            with report_lock:
+                decided.set()
+            return outcome
+
+        next_task = 0
+        while True:
+            if cancelled is not None and cancelled.is_set():
+                break
+            now = time.monotonic()
+            all_failed = len(finished) == len(launched)
+            while next_task < len(tasks) and (all_failed or now - started_at >= delays[next_task]):
+                launch(*tasks[next_task])
+                next_task += 1
+                all_failed = False
+
+            if not launched or (next_task == len(tasks) and len(finished) == len(launched)):
+                break
+
+            wait = None
+            if next_task < len(tasks):
+                wait = max(0.0, started_at + delays[next_task] - now)
+            if deadline is not None:
+                remaining = deadline - now
+                if remaining <= 0:
+                    break
+                wait = remaining if wait is None else min(wait, remaining)
+            if cancelled is not None:
+                wait = self.cancel_poll_interval if wait is None else min(wait, self.cancel_poll_interval)
+
+            try:
+                name, result, error, latency = completions.get(timeout=wait)
+            except queue.Empty:
+                continue
+
+            finished.add(name)
+            if error is not None:
+                errors[name] = error
+            elif self.is_valid(result):
+                return finish({
+                    "winner": name,
+                    "result": result,
+                    "latency": time.monotonic() - started_at,
+                    "launched": launched,
+                    "abandoned": [n for n in launched if n not in finished],
+                    "skipped": [n for n, _ in tasks[next_task:]],
+                    "errors": errors
+                })
+
+        return finish({
+            "winner": None,
+            "result": None,
+            "latency": time.monotonic() - started_at,
+            "launched": launched,
+            "abandoned": [n for n in launched if n not in finished],
+            "skipped": [n for n, _ in tasks[next_task:]],
+            "errors": errors
+        })
@@ -0,0 +1,86 @@
+import os
+import numpy as np
+
+from astropy.table import Table, vstack
+from src.infrastructure.utils.logger import Logger
+from src.infrastructure.utils.local_catalog_store import LocalCatalogStore
+
+
+class LocalCatalogImporter:
+    PRESETS = {
+        "gaia": {
+            "ra": "ra", "dec": "dec", "mag": "phot_g_mean_mag",
+            "pmra": "pmra", "pmdec": "pmdec", "epoch": 2016.0, "mag_name": "Gmag"
+        },
+        "usno": {
+            "ra": "RAJ2000", "dec": "DEJ2000", "mag": "R1mag",
+            "pmra": "pmRA", "pmdec": "pmDE", "epoch": 2000.0, "mag_name": "R1mag"
+        }
+    }
+    FORMATS = {
+        ".csv": "ascii.csv",
+        ".fits": "fits",
+        ".fit": "fits",
+        ".parquet": "parquet"
+    }
+
+    def __init__(self, zone_height_deg=0.1):
+        self.service_name = "LocalCatalogImporter"
+        self.logger = Logger()
+        self.zone_height_deg = zone_height_deg
+
+    def import_files(self, paths, store_dir, name, preset="gaia", column_map=None):
+        if isinstance(paths, str):
+            paths = [paths]
+        mapping = dict(self.PRESETS.get(preset, {}))
+        mapping.update(column_map or {})
+        for required in ("ra", "dec", "mag"):
+            if required not in mapping:
+                raise ValueError(f"Column mapping for '{required}' is missing")
+
+        tables = [self._read(path, mapping) for path in paths]
+        table = vstack(tables, metadata_conflicts="silent") if len(tables) > 1 else tables[0]
+
+        for required in ("ra", "dec", "mag"):
+            if mapping[required] not in table.colnames:
+                raise ValueError(f"Column '{mapping[required]}' not found in {paths}")
+
+        ra = self._column(table, mapping["ra"])
+        dec = self._column(table, mapping["dec"])
+        valid = np.isfinite(ra) & np.isfinite(dec)
+        if not np.all(valid):
+            self.logger.warning(self.service_name, f"Skipping {np.count_nonzero(~valid)} rows without coordinates")
+
+        columns = {
+            "mag": self._column(table, mapping["mag"]),
+            "pmra": self._column(table, mapping.get("pmra")),
+            "pmdec": self._column(table, mapping.get("pmdec"))
+        }
+        store = LocalCatalogStore.build(
+            store_dir, name, ra[valid], dec[valid], columns["mag"][valid],
+            pmra=None if columns["pmra"] is None else columns["pmra"][valid],
+            pmdec=None if columns["pmdec"] is None else columns["pmdec"][valid],
+            epoch=mapping.get("epoch", 2000.0),
+            mag_name=mapping.get("mag_name", mapping["mag"]),
+            zone_height_deg=self.zone_height_deg
+        )
+        self.logger.info(self.service_name, f"Imported {len(store)} sources into {store_dir}")
+        return store
+
+    def _read(self, path, mapping):
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in self.FORMATS:
+            raise ValueError(f"Unsupported catalog format: {ext}")
+        names = [mapping[key] for key in ("ra", "dec", "mag", "pmra", "pmdec") if mapping.get(key)]
+        if ext == ".parquet":
+            try:
+                return Table.read(path, format="parquet", include_names=names)
+            except ImportError as e:
+                raise ImportError("Parquet import requires pyarrow") from e
+        table = Table.read(path, format=self.FORMATS[ext])
+        return table[[name for name in names if name in table.colnames]]
+
+    def _column(self, table, name):
+        if not name or name not in table.colnames:
+            return None
+        return np.ma.filled(np.ma.asarray(table[name], dtype=float), np.nan)
@@ -0,0 +1,156 @@
+import os
+import json
+import numpy as np
+
+from src.infrastructure.utils.sky_geometry import angular_separation_deg
+
+
+class LocalCatalogStore:
+    COLUMNS = ("ra", "dec", "mag", "pmra", "pmdec")
+    ZONE_STRIDE = 400.0
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        self.name = self.meta["name"]
+        self.mag_name = self.meta["mag_name"]
+        self.epoch = self.meta["epoch"]
+        self.zone_height = self.meta["zone_height_deg"]
+        self.max_pm = self.meta["max_pm_mas"]
+
+        self.key = np.load(os.path.join(store_dir, "key.npy"), mmap_mode="r")
+        self.columns = {
+            name: np.load(os.path.join(store_dir, f"{name}.npy"), mmap_mode="r")
+            for name in self.COLUMNS
+        }
+        self.zone_count = int(np.ceil(180.0 / self.zone_height))
+
+    def __len__(self):
+        return len(self.key)
+
+    def close(self):
+        self.key = np.empty(0)
+        self.columns = {name: np.empty(0, dtype=column.dtype) for name, column in self.columns.items()}
+
+    @classmethod
+    def build(cls, store_dir, name, ra, dec, mag, pmra=None, pmdec=None, epoch=2016.0,
+              mag_name="mag", zone_height_deg=0.1):
+        ra = np.mod(np.asarray(ra, dtype=np.float64), 360.0)
+        dec = np.asarray(dec, dtype=np.float64)
+        mag = np.asarray(mag, dtype=np.float32)
+        pmra = np.zeros(len(ra), np.float32) if pmra is None else np.nan_to_num(np.asarray(pmra, dtype=np.float32))
+        pmdec = np.zeros(len(ra), np.float32) if pmdec is None else np.nan_to_num(np.asarray(pmdec, dtype=np.float32))
+
+        zone_count = int(np.ceil(180.0 / zone_height_deg))
+        zone = np.clip(np.floor((dec + 90.0) / zone_height_deg), 0, zone_count - 1)
+        key = zone * cls.ZONE_STRIDE + ra
+        order = np.argsort(key, kind="stable")
+
+        os.makedirs(store_dir, exist_ok=True)
+        columns = {"key": key, "ra": ra, "dec": dec, "mag": mag, "pmra": pmra, "pmdec": pmdec}
+        for column, values in columns.items():
+            np.save(os.path.join(store_dir, f"{column}.npy"), values[order])
+
+        max_pm = float(np.max(np.hypot(pmra, pmdec))) if len(ra) else 0.0
+        meta = {
+            "name": name,
+            "mag_name": mag_name,
+            "epoch": float(epoch),
+            "zone_height_deg": float(zone_height_deg),
+            "max_pm_mas": max_pm,
+            "count": int(len(ra))
+        }
+        with open(os.path.join(store_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        return cls(store_dir)
+
+    def positions(self, indices, epoch=None):
+        indices = np.asarray(indices, dtype=np.int64)
+        ra = np.asarray(self.columns["ra"][indices], dtype=np.float64)
+        dec = np.asarray(self.columns["dec"][indices], dtype=np.float64)
+        if epoch is None or epoch == self.epoch or self.max_pm == 0.0:
+            return ra, dec
+
+        dt = epoch - self.epoch
+        dec_new = dec + self.columns["pmdec"][indices] * dt / 3.6e6
+        cos_dec = np.maximum(np.cos(np.deg2rad(dec)), 1e-9)
+        ra_new = np.mod(ra + self.columns["pmra"][indices] * dt / 3.6e6 / cos_dec, 360.0)
+        return ra_new, np.clip(dec_new, -90.0, 90.0)
+
+    def cone(self, ra, dec, radius_deg, epoch=None, mag_limit=None):
+        _, indices, _ = self.candidates([ra], [dec], radius_deg, epoch, mag_limit)
+        return indices
+
+    def match_nearest(self, ra, dec, radius_arcsec, epoch=None, mag_limit=None):
+        ra = np.atleast_1d(np.asarray(ra, dtype=np.float64))
+        dec = np.atleast_1d(np.asarray(dec, dtype=np.float64))
+        nearest = np.full(len(ra), -1, dtype=np.int64)
+        separations = np.full(len(ra), np.inf)
+
+        query, indices, sep = self.candidates(ra, dec, radius_arcsec / 3600.0, epoch, mag_limit)
+        if len(query) == 0:
+            return nearest, separations
+
+        order = np.lexsort((sep, query))
+        query, indices, sep = query[order], indices[order], sep[order]
+        first = np.concatenate([[True], query[1:] != query[:-1]])
+        nearest[query[first]] = indices[first]
+        separations[query[first]] = sep[first] * 3600.0
+        return nearest, separations
+
+    def candidates(self, ra, dec, radius_deg, epoch=None, mag_limit=None):
+        ra = np.mod(np.asarray(ra, dtype=np.float64), 360.0)
+        dec = np.asarray(dec, dtype=np.float64)
+        radius_deg = np.broadcast_to(np.asarray(radius_deg, dtype=np.float64), ra.shape)
+        empty = np.empty(0, dtype=np.int64)
+        if len(ra) == 0 or len(self.key) == 0:
+            return empty, empty, np.empty(0)
+
+        pad = 0.0 if epoch is None else self.max_pm * abs(epoch - self.epoch) / 3.6e6
+        search = radius_deg + pad
+
+        zone_lo = np.clip(np.floor((dec - search + 90.0) / self.zone_height), 0, self.zone_count - 1).astype(np.int64)
+        zone_hi = np.clip(np.floor((dec + search + 90.0) / self.zone_height), 0, self.zone_count - 1).astype(np.int64)
+        cos_max = np.cos(np.deg2rad(np.minimum(np.abs(dec) + search, 90.0)))
+        dra = np.where(cos_max > 1e-9, search / np.maximum(cos_max, 1e-9), 180.0)
+        dra = np.minimum(dra, 180.0)
+
+        zones_per_query = zone_hi - zone_lo + 1
+        query = np.repeat(np.arange(len(ra)), zones_per_query)
+        offsets = np.cumsum(zones_per_query) - zones_per_query
+        zone = zone_lo[query] + (np.arange(len(query)) - offsets[query])
+
+        lo = ra[query] - dra[query]
+        hi = ra[query] + dra[query]
+        full = dra[query] >= 180.0
+        main_lo = np.where(full, 0.0, np.maximum(lo, 0.0))
+        main_hi = np.where(full, 360.0, np.minimum(hi, 360.0))
+        wrap = ~full & ((lo < 0.0) | (hi > 360.0))
+        wrap_lo = np.where(lo < 0.0, lo + 360.0, 0.0)[wrap]
+        wrap_hi = np.where(lo < 0.0, 360.0, hi - 360.0)[wrap]
+
+        range_query = np.concatenate([query, query[wrap]])
+        range_base = np.concatenate([zone, zone[wrap]]) * self.ZONE_STRIDE
+        range_lo = range_base + np.concatenate([main_lo, wrap_lo])
+        range_hi = range_base + np.concatenate([main_hi, wrap_hi])
+
+        start = np.searchsorted(self.key, range_lo, side="left")
+        stop = np.searchsorted(self.key, range_hi, side="right")
+        lengths = stop - start
+        total = int(lengths.sum())
+        if total == 0:
+            return empty, empty, np.empty(0)
+
+        owner = np.repeat(range_query, lengths)
+        indices = np.repeat(start - (np.cumsum(lengths) - lengths), lengths) + np.arange(total)
+        if mag_limit is not None:
+            bright = self.columns["mag"][indices] < mag_limit
+            owner, indices = owner[bright], indices[bright]
+
+        src_ra, src_dec = self.positions(indices, epoch)
+        sep = angular_separation_deg(ra[owner], dec[owner], src_ra, src_dec)
+        inside = sep <= radius_deg[owner]
+        return owner[inside], indices[inside], sep[inside]
+
@@ -0,0 +1,44 @@
+import numpy as np
+
+from astropy.wcs.utils import proj_plane_pixel_scales
+from scipy.spatial import cKDTree
+
+RAYLEIGH_MEDIAN = np.sqrt(2 * np.log(2))
+
+
+def residual_sigma(residuals):
+    residuals = np.asarray(residuals, dtype=float)
+    residuals = residuals[np.isfinite(residuals)]
+    if len(residuals) == 0:
+        return None
+    return float(np.median(residuals) / RAYLEIGH_MEDIAN)
+
+
+def nearest_residuals(detected_xy, reference_xy, max_distance):
+    detected = np.asarray(detected_xy, dtype=float).reshape(-1, 2)
+    reference = np.asarray(reference_xy, dtype=float).reshape(-1, 2)
+    if len(detected) == 0 or len(reference) == 0:
+        return np.empty(0)
+    distances, _ = cKDTree(detected).query(reference, k=1, distance_upper_bound=max_distance)
+    return distances[np.isfinite(distances)]
+
+
+def adaptive_match_radius(residuals, a=None, b=None, k=3.0, min_radius=1.0, max_radius=10.0, min_residuals=5):
+    residuals = np.asarray(residuals, dtype=float)
+    if len(residuals) < min_residuals:
+        return None
+
+    sigma = residual_sigma(residuals)
+    if a is None or b is None or len(a) == 0:
+        return float(np.clip(k * sigma, min_radius, max_radius))
+
+    size = np.sqrt(np.asarray(a, dtype=float) * np.asarray(b, dtype=float))
+    excess = np.maximum(size / np.median(size) - 1.0, 0.0)
+    return np.clip(k * sigma * np.sqrt(1.0 + excess ** 2), min_radius, max_radius)
+
+
+def pixel_scale_arcsec(wcs):
+    try:
+        return float(np.mean(proj_plane_pixel_scales(wcs.celestial)) * 3600)
+    except Exception:
+        return None
@@ -0,0 +1,295 @@
+import os
+import math
+import threading
+import numpy as np
+import astropy.units as u
+
+from collections import OrderedDict
+from astropy.time import Time
+from astropy_healpix import HEALPix
+from astropy.coordinates import get_body_barycentric
+from src.infrastructure.utils.logger import Logger
+from src.infrastructure.utils.sky_geometry import radec_to_unit, angular_separation_deg, match_nearest
+
+SPEED_OF_LIGHT_AU_PER_DAY = 173.1446326846693
+OBLIQUITY_J2000 = math.radians(84381.448 / 3600)
+
+
+def unpack_epoch(packed):
+    def value(char):
+        return int(char) if char.isdigit() else ord(char) - ord("A") + 10
+
+    century = {"I": 1800, "J": 1900, "K": 2000}[packed[0]]
+    return century + int(packed[1:3]), value(packed[3]), value(packed[4])
+
+
+def solve_kepler(mean_anomaly, eccentricity, iterations=12):
+    mean_anomaly = np.remainder(mean_anomaly, 2 * np.pi)
+    anomaly = np.where(eccentricity > 0.8, np.pi, mean_anomaly)
+    for _ in range(iterations):
+        delta = (anomaly - eccentricity * np.sin(anomaly) - mean_anomaly) / (1 - eccentricity * np.cos(anomaly))
+        anomaly = anomaly - delta
+        if np.max(np.abs(delta), initial=0.0) < 1e-12:
+            break
+    return anomaly
+
+
+class MinorPlanetEphemeris:
+    COLUMNS = ("H", "G", "epoch", "M", "peri", "node", "incl", "e", "n", "a")
+
+    def __init__(self, orbit_file, bucket_hours=1.0, index_nside=32, max_buckets=8, cache_arrays=True):
+        self.service_name = "MinorPlanetEphemeris"
+        self.logger = Logger()
+        self.orbit_file = orbit_file
+        self.bucket_days = bucket_hours / 24
+        self.healpix = HEALPix(nside=index_nside, order="nested")
+        self.max_buckets = max_buckets
+
+        self.elements, self.designations = self._load(orbit_file, cache_arrays)
+        self._basis = self._orbit_basis()
+
+        self._edges = OrderedDict()
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"edges_computed": 0, "bucket_hits": 0, "bucket_misses": 0, "candidates": 0}
+
+    def __len__(self):
+        return len(self.designations)
+
+    def bucket_of(self, epoch):
+        return int(math.floor(self._jd(epoch) / self.bucket_days))
+
+    def positions(self, epoch, indices=None):
+        jd = self._jd(epoch)
+        indices = np.arange(len(self)) if indices is None else np.asarray(indices, dtype=int)
+        unit, mag = self._geocentric(jd, indices)
+        ra, dec = self._unit_to_radec(unit)
+        return ra, dec, mag
+
+    def query_cone(self, ra, dec, radius_deg, epoch, mag_limit=None):
+        jd = self._jd(epoch)
+        bucket = int(math.floor(jd / self.bucket_days))
+        index = self._index(bucket)
+
+        cells = self.healpix.cone_search_lonlat(ra * u.deg, dec * u.deg,
+                                                radius=(radius_deg + index["pad_deg"]) * u.deg)
+        cells = np.unique(cells)
+        starts = np.searchsorted(index["cells"], cells, side="left")
+        stops = np.searchsorted(index["cells"], cells, side="right")
+        slow = [index["order"][start:stop] for start, stop in zip(starts, stops) if stop > start]
+        candidates = np.unique(np.concatenate(slow + [index["fast"]]))
+        with self._lock:
+            self.stats["candidates"] += len(candidates)
+
+        fraction = jd / self.bucket_days - bucket
+        start_unit, start_mag = self._edge(bucket)
+        stop_unit, stop_mag = self._edge(bucket + 1)
+        unit = (1 - fraction) * start_unit[candidates] + fraction * stop_unit[candidates]
+        mag = (1 - fraction) * start_mag[candidates] + fraction * stop_mag[candidates]
+        src_ra, src_dec = self._unit_to_radec(unit)
+
+        separation = angular_separation_deg(ra, dec, src_ra, src_dec)
+        keep = separation <= radius_deg
+        if mag_limit is not None:
+            keep &= ~(mag >= mag_limit)
+        return {
+            "index": candidates[keep],
+            "designation": self.designations[candidates[keep]],
+            "ra": src_ra[keep],
+            "dec": src_dec[keep],
+            "mag": mag[keep].astype(float),
+            "separation_arcsec": separation[keep] * 3600
+        }
+
+    def cross_match(self, ra, dec, radius_arcsec, epoch, mag_limit=None):
+        ra = np.atleast_1d(np.asarray(ra, dtype=float))
+        dec = np.atleast_1d(np.asarray(dec, dtype=float))
+        match = {
+            "matched": np.zeros(len(ra), dtype=bool),
+            "separation_arcsec": np.full(len(ra), np.inf),
+            "ra": np.full(len(ra), np.nan),
+            "dec": np.full(len(ra), np.nan),
+            "mag": np.full(len(ra), np.nan)
+        }
+        if len(ra) == 0:
+            return match
+
+        center = np.sum(radec_to_unit(ra, dec), axis=0)
+        if np.linalg.norm(center) < 1e-9:
+            center = np.array([1.0, 0.0, 0.0])
+        center_ra, center_dec = self._unit_to_radec(center[None, :])
+        radius = float(np.max(angular_separation_deg(center_ra[0], center_dec[0], ra, dec))) + radius_arcsec / 3600
+        found = self.query_cone(center_ra[0], center_dec[0], min(radius, 180.0), epoch, mag_limit=mag_limit)
+
+        indices, separations = match_nearest(ra, dec, found["ra"], found["dec"], radius_arcsec)
+        matched = indices >= 0
+        match["matched"] = matched
+        match["separation_arcsec"] = separations
+        for column in ("ra", "dec", "mag"):
+            match[column][matched] = found[column][indices[matched]]
+        return match
+
+    def _index(self, bucket):
+        with self._lock:
+            index = self._indexes.get(bucket)
+            if index is not None:
+                self._indexes.move_to_end(bucket)
+                self.stats["bucket_hits"] += 1
+                return index
+            self.stats["bucket_misses"] += 1
+
+        start_unit, _ = self._edge(bucket)
+        stop_unit, _ = self._edge(bucket + 1)
+        motion = np.degrees(np.arccos(np.clip(np.sum(start_unit * stop_unit, axis=1, dtype=np.float64), -1, 1)))
+        cell_size = self.healpix.pixel_resolution.to_value(u.deg)
+        fast = motion > cell_size
+
+        ra, dec = self._unit_to_radec(start_unit)
+        cells = np.asarray(self.healpix.lonlat_to_healpix(ra * u.deg, dec * u.deg), dtype=np.int64)
+        slow = np.flatnonzero(~fast)
+        order = slow[np.argsort(cells[slow], kind="stable")]
+        index = {
+            "cells": cells[order],
+            "order": order,
+            "fast": np.flatnonzero(fast),
+            "pad_deg": float(np.max(motion[slow], initial=0.0))
+        }
+        with self._lock:
+            self._indexes[bucket] = index
+            while len(self._indexes) > self.max_buckets:
+                self._indexes.popitem(last=False)
+        return index
+
+    def _edge(self, bucket):
+        with self._lock:
+            edge = self._edges.get(bucket)
+            if edge is not None:
+                self._edges.move_to_end(bucket)
+                return edge
+
+        unit, mag = self._geocentric(bucket * self.bucket_days, np.arange(len(self)))
+        edge = (unit.astype(np.float32), mag.astype(np.float32))
+        with self._lock:
+            self._edges[bucket] = edge
+            while len(self._edges) > self.max_buckets + 1:
+                self._edges.popitem(last=False)
+            self.stats["edges_computed"] += 1
+        return edge
+
+    def _geocentric(self, jd, indices):
+        time = Time(jd, format="jd", scale="tt")
+        earth = (get_body_barycentric("earth", time) - get_body_barycentric("sun", time)).xyz.to_value(u.au)
+
+        helio = self._heliocentric(np.full(len(indices), jd), indices)
+        delta = np.linalg.norm(helio - earth, axis=1)
+        helio = self._heliocentric(jd - delta / SPEED_OF_LIGHT_AU_PER_DAY, indices)
+        geo = helio - earth
+        delta = np.linalg.norm(geo, axis=1)
+        distance = np.linalg.norm(helio, axis=1)
+        sun_distance = np.linalg.norm(earth)
+
+        cos_phase = np.clip((distance ** 2 + delta ** 2 - sun_distance ** 2) / (2 * distance * delta), -1, 1)
+        half_tan = np.tan(np.arccos(cos_phase) / 2)
+        slope = self.elements["G"][indices]
+        phase = (1 - slope) * np.exp(-3.33 * half_tan ** 0.63) + slope * np.exp(-1.87 * half_tan ** 1.22)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mag = self.elements["H"][indices] + 5 * np.log10(distance * delta) - 2.5 * np.log10(phase)
+        return geo / delta[:, None], mag
+
+    def _heliocentric(self, jd, indices):
+        elements = self.elements
+        eccentricity = elements["e"][indices]
+        axis = elements["a"][indices]
+        mean_anomaly = np.radians(elements["M"][indices]) + \
+            np.radians(elements["n"][indices]) * (jd - elements["epoch"][indices])
+        anomaly = solve_kepler(mean_anomaly, eccentricity)
+
+        x = axis * (np.cos(anomaly) - eccentricity)
+        y = axis * np.sqrt(1 - eccentricity ** 2) * np.sin(anomaly)
+        p, q = self._basis
+        return x[:, None] * p[indices] + y[:, None] * q[indices]
+
+    def _orbit_basis(self):
+        peri = np.radians(self.elements["peri"])
+        node = np.radians(self.elements["node"])
+        incl = np.radians(self.elements["incl"])
+        cos_w, sin_w = np.cos(peri), np.sin(peri)
+        cos_n, sin_n = np.cos(node), np.sin(node)
+        cos_i, sin_i = np.cos(incl), np.sin(incl)
+
+        p = np.stack([cos_w * cos_n - sin_w * sin_n * cos_i,
+                      cos_w * sin_n + sin_w * cos_n * cos_i,
+                      sin_w * sin_i], axis=1)
+        q = np.stack([-sin_w * cos_n - cos_w * sin_n * cos_i,
+                      -sin_w * sin_n + cos_w * cos_n * cos_i,
+                      cos_w * sin_i], axis=1)
+
+        cos_e, sin_e = math.cos(OBLIQUITY_J2000), math.sin(OBLIQUITY_J2000)
+        rotation = np.array([[1.0, 0.0, 0.0], [0.0, cos_e, -sin_e], [0.0, sin_e, cos_e]])
+        return p @ rotation.T, q @ rotation.T
+
+    def _load(self, orbit_file, cache_arrays):
+        cache_path = f"{orbit_file}.npz"
+        if cache_arrays and os.path.exists(cache_path) and \
+                os.path.getmtime(cache_path) >= os.path.getmtime(orbit_file):
+            with np.load(cache_path, allow_pickle=False) as data:
+                return {name: data[name] for name in self.COLUMNS}, data["designation"]
+
+        elements, designations = self._parse(orbit_file)
+        self.logger.info(self.service_name, f"Loaded {len(designations)} orbits from {orbit_file}")
+        if cache_arrays:
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp.npz"
+            try:
+                np.savez(tmp_path, designation=designations, **elements)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                self.logger.warning(self.service_name, f"Orbit array cache not written: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        return elements, designations
+
+    def _parse(self, orbit_file):
+        rows = []
+        names = []
+        epochs = {}
+        with open(orbit_file, "r", encoding="ascii", errors="replace") as f:
+            for line in f:
+                if len(line) < 103 or not line[26:35].strip():
+                    continue
+                try:
+                    packed = line[20:25]
+                    if packed not in epochs:
+                        year, month, day = unpack_epoch(packed)
+                        epochs[packed] = Time(f"{year:04d}-{month:02d}-{day:02d}", scale="tt").jd
+                    values = [
+                        float(line[8:13]) if line[8:13].strip() else np.nan,
+                        float(line[14:19]) if line[14:19].strip() else 0.15,
+                        epochs[packed],
+                        float(line[26:35]), float(line[37:46]), float(line[48:57]),
+                        float(line[59:68]), float(line[70:79]), float(line[80:91]), float(line[92:103])
+                    ]
+                except (ValueError, KeyError):
+                    continue
+                if not 0 <= values[7] < 1:
+                    continue
+                rows.append(values)
+                name = line[166:194].strip() if len(line) > 166 else ""
+                names.append(name or line[0:7].strip())
+
+        if not rows:
+            raise ValueError(f"No orbital elements found in {orbit_file}")
+        table = np.asarray(rows, dtype=np.float64)
+        elements = {name: np.ascontiguousarray(table[:, i]) for i, name in enumerate(self.COLUMNS)}
+        return elements, np.asarray(names, dtype=str)
+
+    @staticmethod
+    def _jd(epoch):
+        return Time(epoch, format="jyear", scale="utc").tt.jd
+
+    @staticmethod
+    def _unit_to_radec(unit):
+        unit = np.asarray(unit, dtype=np.float64)
+        unit = unit / np.linalg.norm(unit, axis=1)[:, None]
+        ra = np.degrees(np.arctan2(unit[:, 1], unit[:, 0])) % 360
+        dec = np.degrees(np.arcsin(np.clip(unit[:, 2], -1, 1)))
+        return ra, dec
@@ -0,0 +1,38 @@
+import numpy as np
+
+
+def estimate_zeropoint(fluxes, catalog_mags, clip_sigma=3.0, iterations=5):
+    fluxes = np.asarray(fluxes, dtype=float)
+    catalog_mags = np.asarray(catalog_mags, dtype=float)
+    valid = np.isfinite(fluxes) & (fluxes > 0) & np.isfinite(catalog_mags)
+    if not np.any(valid):
+        return None, None, 0
+
+    zeropoints = catalog_mags[valid] + 2.5 * np.log10(fluxes[valid])
+    keep = np.ones(len(zeropoints), dtype=bool)
+    for _ in range(iterations):
+        center = np.median(zeropoints[keep])
+        scatter = 1.4826 * np.median(np.abs(zeropoints[keep] - center))
+        updated = np.abs(zeropoints - center) <= clip_sigma * max(scatter, 1e-3)
+        if np.array_equal(updated, keep):
+            break
+        keep = updated
+
+    return float(np.median(zeropoints[keep])), float(np.std(zeropoints[keep])), int(np.count_nonzero(keep))
+
+
+def estimate_limiting_magnitude(fluxes, catalog_mags, detection_fluxes, margin=1.0, min_stars=5):
+    zeropoint, scatter, used = estimate_zeropoint(fluxes, catalog_mags)
+    detection_fluxes = np.asarray(detection_fluxes, dtype=float)
+    detection_fluxes = detection_fluxes[np.isfinite(detection_fluxes) & (detection_fluxes > 0)]
+    if zeropoint is None or used < min_stars or len(detection_fluxes) == 0:
+        return None
+
+    faintest = zeropoint - 2.5 * np.log10(np.min(detection_fluxes))
+    return {
+        "zeropoint": zeropoint,
+        "zeropoint_scatter": scatter,
+        "calibration_stars": used,
+        "faintest_detection_mag": float(faintest),
+        "limiting_mag": float(faintest + margin + scatter)
+    }
@@ -0,0 +1,66 @@
+import numpy as np
+
+from scipy.spatial import cKDTree
+
+
+def offset_histogram_peak(points, ref_points, max_offset=20.0, bin_size=1.0):
+    tree = cKDTree(points)
+    pairs = cKDTree(ref_points).sparse_distance_matrix(tree, max_offset, output_type="ndarray")
+    if len(pairs) == 0:
+        return None, 0
+
+    offsets = ref_points[pairs["i"]] - points[pairs["j"]]
+    edges = np.arange(-max_offset, max_offset + bin_size, bin_size)
+    counts, x_edges, y_edges = np.histogram2d(offsets[:, 0], offsets[:, 1], bins=(edges, edges))
+    peak_x, peak_y = np.unravel_index(np.argmax(counts), counts.shape)
+    near = (np.abs(offsets[:, 0] - (x_edges[peak_x] + x_edges[peak_x + 1]) / 2) <= bin_size) & \
+           (np.abs(offsets[:, 1] - (y_edges[peak_y] + y_edges[peak_y + 1]) / 2) <= bin_size)
+    return np.median(offsets[near], axis=0), int(counts[peak_x, peak_y])
+
+
+def fit_rigid(points, ref_points):
+    center = points.mean(axis=0)
+    ref_center = ref_points.mean(axis=0)
+    a = points - center
+    b = ref_points - ref_center
+    angle = np.arctan2(np.sum(a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]), np.sum(a[:, 0] * b[:, 0] + a[:, 1] * b[:, 1]))
+    return {"angle": float(angle), "center": center, "shift": ref_center - center}
+
+
+def apply_alignment(points, transform):
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if transform is None or len(points) == 0:
+        return points
+    cos, sin = np.cos(transform["angle"]), np.sin(transform["angle"])
+    shifted = points - transform["center"]
+    rotated = np.column_stack([cos * shifted[:, 0] - sin * shifted[:, 1], sin * shifted[:, 0] + cos * shifted[:, 1]])
+    return rotated + transform["center"] + transform["shift"]
+
+
+def estimate_alignment(points, ref_points, max_offset=20.0, bin_size=1.0, tolerance=2.0, min_pairs=5,
+                       iterations=2):
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    ref_points = np.asarray(ref_points, dtype=float).reshape(-1, 2)
+    if len(points) < min_pairs or len(ref_points) < min_pairs:
+        return None
+
+    offset, votes = offset_histogram_peak(points, ref_points, max_offset, bin_size)
+    if offset is None or votes < min_pairs:
+        return None
+
+    transform = {"angle": 0.0, "center": points.mean(axis=0), "shift": offset}
+    ref_tree = cKDTree(ref_points)
+    for _ in range(iterations):
+        distances, nearest = ref_tree.query(apply_alignment(points, transform), k=1, distance_upper_bound=tolerance)
+        found = np.isfinite(distances)
+        if found.sum() < min_pairs:
+            return None
+        transform = fit_rigid(points[found], ref_points[nearest[found]])
+
+    distances, _ = ref_tree.query(apply_alignment(points, transform), k=1, distance_upper_bound=tolerance)
+    found = np.isfinite(distances)
+    unaligned, _ = ref_tree.query(points, k=1, distance_upper_bound=tolerance)
+    if found.sum() <= np.isfinite(unaligned).sum():
+        return None
+    transform.update(pairs=int(found.sum()), rms=float(np.sqrt(np.mean(distances[found] ** 2))))
+    return transform
@@ -0,0 +1,132 @@
+import os
+import time
+import uuid
+import pickle
+import threading
+import numpy as np
+import astropy.units as u
+
+from collections import OrderedDict
+from astropy_healpix import HEALPix
+from src.infrastructure.utils.logger import Logger
+
+
+class QueryMemo:
+    VOLATILE_CATALOGS = ("mpc",)
+
+    def __init__(self, nside=2 ** 18, hit_ttl=7 * 24 * 3600.0, miss_ttl=3600.0, max_entries=100000,
+                 persist_path=None, save_every=200):
+        self.service_name = "QueryMemo"
+        self.logger = Logger()
+        self.healpix = HEALPix(nside=nside, order="nested")
+        self.hit_ttl = hit_ttl
+        self.miss_ttl = miss_ttl
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self.save_every = save_every
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "expired": 0, "stored": 0}
+
+        if persist_path:
+            self._load()
+
+    def key(self, ra, dec, radius_arcsec, catalogs, early_exit):
+        cell = int(self.healpix.lonlat_to_healpix(ra * u.deg, dec * u.deg))
+        return cell, round(float(radius_arcsec), 3), tuple(catalogs), bool(early_exit)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            expires, value = entry
+            if expires <= now:
+                del self._entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits" if value else "negative_hits"] += 1
+            return list(value)
+
+    def put(self, key, results, partial=False):
+        value = [(name, self._plain_row(row)) for name, row in results]
+        volatile = any(name in self.VOLATILE_CATALOGS for name, _ in value)
+        ttl = self.hit_ttl if value and not partial and not volatile else self.miss_ttl
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.stats["stored"] += 1
+            self._unsaved += 1
+            save = self.persist_path and self._unsaved >= self.save_every
+        if save:
+            self.save()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def save(self):
+        if not self.persist_path:
+            return
+        now = time.time()
+        with self._lock:
+            entries = [(key, entry) for key, entry in self._entries.items() if entry[0] > now]
+            self._unsaved = 0
+
+        directory = os.path.dirname(os.path.abspath(self.persist_path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.persist_path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump({"nside": self.healpix.nside, "entries": entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.persist_path)
+        except OSError as e:
+            self.logger.warning(self.service_name, f"Memo save failed: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _load(self):
+        try:
+            with open(self.persist_path, "rb") as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            self.logger.warning(self.service_name, f"Memo load failed: {e}")
+            return
+
+        if data.get("nside") != self.healpix.nside:
+            return
+        now = time.time()
+        for key, entry in data.get("entries", []):
+            if entry[0] > now:
+                self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _plain_row(row):
+        if isinstance(row, dict):
+            items = row.items()
+        else:
+            items = ((name, row[name]) for name in row.colnames)
+
+        plain = {}
+        for name, value in items:
+            if value is np.ma.masked:
+                value = None
+            elif isinstance(value, np.generic):
+                value = value.item()
+            plain[name] = value
+        return plain
@@ -0,0 +1,37 @@
+import time
+import threading
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens=1):
+        return self._reserve(tokens) == 0.0
+
+    def acquire(self, tokens=1, timeout=None, cancelled=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._reserve(tokens)
+            if wait == 0.0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            if cancelled is None:
+                time.sleep(wait)
+            elif cancelled.wait(wait):
+                return False
+
+    def _reserve(self, tokens):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
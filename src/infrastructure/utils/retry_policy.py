@@ -0,0 +1,30 @@
+import time
+import random
+
+
+class QueryAbandoned(Exception):
+    pass
+
+
+class RetryPolicy:
+    def __init__(self, attempts=2, base_delay=0.5, max_delay=4.0):
+        self.attempts = max(1, int(attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def call(self, func, *args, deadline=None):
+        for attempt in range(self.attempts):
+            try:
+                return func(*args)
+            except QueryAbandoned:
+                raise
+            except Exception:
+                if attempt == self.attempts - 1:
+                    raise
+                delay = self.backoff(attempt)
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    raise
+                time.sleep(delay)
+
+    def backoff(self, attempt):
+        return random.uniform(0.0, min(self.max_delay, self.base_delay * 2 ** attempt))
@@ -0,0 +1,32 @@
+import numpy as np
+
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+from src.infrastructure.utils.sky_geometry import radec_to_unit, arcsec_to_chord
+
+
+def friends_of_friends(ra, dec, linking_arcsec):
+    ra = np.atleast_1d(np.asarray(ra, dtype=float))
+    if len(ra) < 2:
+        return np.arange(len(ra), dtype=np.int64)
+
+    tree = cKDTree(radec_to_unit(ra, dec))
+    pairs = tree.query_pairs(float(arcsec_to_chord(linking_arcsec)), output_type="ndarray")
+    graph = coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(len(ra), len(ra)))
+    _, labels = connected_components(graph, directed=False)
+    return labels.astype(np.int64)
+
+
+def cluster_representatives(labels, weights=None):
+    labels = np.asarray(labels, dtype=np.int64)
+    if len(labels) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    weights = np.zeros(len(labels)) if weights is None else np.nan_to_num(np.asarray(weights, dtype=float),
+                                                                          nan=-np.inf)
+    order = np.lexsort((-weights, labels))
+    first = np.concatenate([[True], labels[order][1:] != labels[order][:-1]])
+    representatives = np.empty(labels.max() + 1, dtype=np.int64)
+    representatives[labels[order][first]] = order[first]
+    return representatives
@@ -0,0 +1,90 @@
+import numpy as np
+
+from astropy.time import Time
+from scipy.spatial import cKDTree
+
+
+def radec_to_unit(ra, dec):
+    ra = np.deg2rad(np.asarray(ra, dtype=float))
+    dec = np.deg2rad(np.asarray(dec, dtype=float))
+    cos_dec = np.cos(dec)
+    return np.column_stack([cos_dec * np.cos(ra), cos_dec * np.sin(ra), np.sin(dec)])
+
+
+def arcsec_to_chord(radius_arcsec):
+    return 2 * np.sin(np.deg2rad(np.asarray(radius_arcsec, dtype=float) / 3600) / 2)
+
+
+def chord_to_arcsec(chord):
+    return np.rad2deg(2 * np.arcsin(np.clip(np.asarray(chord, dtype=float) / 2, 0, 1))) * 3600
+
+
+def angular_separation_deg(ra1, dec1, ra2, dec2):
+    ra1, dec1, ra2, dec2 = (np.deg2rad(np.asarray(v, dtype=float)) for v in (ra1, dec1, ra2, dec2))
+    hav = (np.sin((dec2 - dec1) / 2) ** 2 +
+           np.cos(dec1) * np.cos(dec2) * np.sin((ra2 - ra1) / 2) ** 2)
+    return np.rad2deg(2 * np.arcsin(np.sqrt(np.clip(hav, 0, 1))))
+
+
+def match_nearest(ra, dec, ref_ra, ref_dec, radius_arcsec, tree=None, workers=1):
+    ra = np.atleast_1d(np.asarray(ra, dtype=float))
+    indices = np.full(ra.shape, -1, dtype=np.int64)
+    separations = np.full(ra.shape, np.inf)
+    if ra.size == 0 or (tree is None and len(ref_ra) == 0):
+        return indices, separations
+
+    if tree is None:
+        tree = cKDTree(radec_to_unit(ref_ra, ref_dec))
+    chord, nearest = tree.query(radec_to_unit(ra, dec), k=1,
+                                distance_upper_bound=float(arcsec_to_chord(radius_arcsec)), workers=workers)
+    found = np.isfinite(chord)
+    indices[found] = nearest[found]
+    separations[found] = chord_to_arcsec(chord[found])
+    return indices, separations
+
+
+def gnomonic_project(ra, dec, ra0, dec0):
+    ra, dec = np.deg2rad(np.asarray(ra, dtype=float)), np.deg2rad(np.asarray(dec, dtype=float))
+    ra0, dec0 = np.deg2rad(ra0), np.deg2rad(dec0)
+    cos_c = np.sin(dec0) * np.sin(dec) + np.cos(dec0) * np.cos(dec) * np.cos(ra - ra0)
+    xi = np.cos(dec) * np.sin(ra - ra0) / cos_c
+    eta = (np.cos(dec0) * np.sin(dec) - np.sin(dec0) * np.cos(dec) * np.cos(ra - ra0)) / cos_c
+    return np.rad2deg(xi), np.rad2deg(eta)
+
+
+def gnomonic_deproject(xi, eta, ra0, dec0):
+    xi, eta = np.deg2rad(np.asarray(xi, dtype=float)), np.deg2rad(np.asarray(eta, dtype=float))
+    ra0, dec0 = np.deg2rad(ra0), np.deg2rad(dec0)
+    denom = np.cos(dec0) - eta * np.sin(dec0)
+    ra = np.rad2deg(ra0 + np.arctan2(xi, denom)) % 360.0
+    dec = np.rad2deg(np.arctan2(np.sin(dec0) + eta * np.cos(dec0), np.hypot(xi, denom)))
+    return ra, dec
+
+
+def compute_footprint(wcs, xs=None, ys=None, margin_arcsec=0.0):
+    shape = wcs.pixel_shape
+    if shape is not None:
+        x_min, x_max, y_min, y_max = -0.5, shape[0] - 0.5, -0.5, shape[1] - 0.5
+    elif xs is not None and len(xs) > 0:
+        x_min, x_max, y_min, y_max = np.min(xs), np.max(xs), np.min(ys), np.max(ys)
+    else:
+        return None
+
+    center_ra, center_dec = wcs.all_pix2world([(x_min + x_max) / 2], [(y_min + y_max) / 2], 0)
+    edge_x = np.array([x_min, x_max, x_max, x_min, (x_min + x_max) / 2, x_max, (x_min + x_max) / 2, x_min])
+    edge_y = np.array([y_min, y_min, y_max, y_max, y_min, (y_min + y_max) / 2, y_max, (y_min + y_max) / 2])
+    edge_ra, edge_dec = wcs.all_pix2world(edge_x, edge_y, 0)
+    radius = np.max(angular_separation_deg(center_ra[0], center_dec[0], edge_ra, edge_dec))
+
+    return float(center_ra[0]), float(center_dec[0]), float(radius + margin_arcsec / 3600)
+
+
+def observation_epoch(wcs):
+    try:
+        if np.isfinite(wcs.wcs.mjdobs):
+            return float(Time(wcs.wcs.mjdobs, format="mjd").jyear)
+        if wcs.wcs.dateobs:
+            return float(Time(wcs.wcs.dateobs).jyear)
+    except (AttributeError, TypeError, ValueError):
+        pass
+    return None
@@ -0,0 +1,236 @@
+import threading
+import numpy as np
+
+from collections import OrderedDict
+
+
+class WcsTransformEngine:
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+    cache_size = 8
+    chunk_size = 1 << 15
+
+    def __init__(self, wcs, tolerance_pix=0.01, min_points=2000, grid_size=33,
+                 max_degree=9, margin=0.05):
+        self.wcs = wcs
+        self.tolerance_pix = tolerance_pix
+        self.min_points = min_points
+        self.grid_size = grid_size
+        self.max_degree = max_degree
+        self.margin = margin
+        self.degree = None
+        self.max_error_pix = None
+        self._lock = threading.Lock()
+        self._built = False
+
+        shape = wcs.pixel_shape
+        if shape is None:
+            crpix = np.asarray(wcs.wcs.crpix, dtype=float)
+            shape = tuple(np.maximum(2 * crpix, 2.0))
+        self.width, self.height = float(shape[0]), float(shape[1])
+
+    @classmethod
+    def for_wcs(cls, wcs):
+        key = id(wcs)
+        with cls._cache_lock:
+            engine = cls._cache.get(key)
+            if engine is not None and engine.wcs is wcs:
+                cls._cache.move_to_end(key)
+                return engine
+            engine = cls(wcs)
+            cls._cache[key] = engine
+            while len(cls._cache) > cls.cache_size:
+                cls._cache.popitem(last=False)
+            return engine
+
+    @property
+    def is_approximated(self):
+        self._ensure_built()
+        return self.degree is not None
+
+    def pix2world(self, x, y):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if x.size < self.min_points or not self.is_approximated:
+            return self.wcs.all_pix2world(x, y, 0)
+
+        ra = np.empty(x.shape)
+        dec = np.empty(x.shape)
+        inside = self._inside_pixel_domain(x, y)
+        ra[inside], dec[inside] = self._chunked(self._forward, x[inside], y[inside])
+
+        outside = ~inside
+        if outside.any():
+            ra[outside], dec[outside] = self.wcs.all_pix2world(x[outside], y[outside], 0)
+        return ra, dec
+
+    def world2pix(self, ra, dec):
+        ra = np.asarray(ra, dtype=float)
+        dec = np.asarray(dec, dtype=float)
+        if ra.size < self.min_points or not self.is_approximated:
+            return self.wcs.all_world2pix(ra, dec, 0)
+
+        x, y = self._chunked(self._inverse, ra.ravel(), dec.ravel())
+        redo = np.flatnonzero(~np.isfinite(x) | ~self._inside_pixel_domain(x, y))
+        if redo.size:
+            x[redo], y[redo] = self.wcs.all_world2pix(ra.ravel()[redo], dec.ravel()[redo], 0)
+        return x.reshape(ra.shape), y.reshape(ra.shape)
+
+    def _forward(self, x, y):
+        u, v = self._normalize_pixel(x, y)
+        xi, eta = self._polyval(u, v, self._fwd_xi, self._fwd_eta)
+        return self._deproject(xi, eta)
+
+    def _inverse(self, ra, dec):
+        xi, eta = self._project(ra, dec)
+        inside = ((xi >= self._xi_range[0]) & (xi <= self._xi_range[1]) &
+                  (eta >= self._eta_range[0]) & (eta <= self._eta_range[1]))
+        s, t = self._normalize_plane(xi, eta)
+        x, y = self._polyval(s, t, self._inv_x, self._inv_y)
+        x[~inside] = np.nan
+        return x, y
+
+    def _chunked(self, transform, a, b):
+        out_a = np.empty(a.shape)
+        out_b = np.empty(b.shape)
+        for start in range(0, a.size, self.chunk_size):
+            stop = start + self.chunk_size
+            out_a[start:stop], out_b[start:stop] = transform(a[start:stop], b[start:stop])
+        return out_a, out_b
+
+    @staticmethod
+    def _polyval(u, v, coef_a, coef_b):
+        degree = coef_a.shape[0] - 1
+        v_powers = [None, v]
+        for j in range(2, degree + 1):
+            v_powers.append(v_powers[-1] * v)
+
+        term = np.empty_like(u)
+        results = []
+        for coef in (coef_a, coef_b):
+            acc = np.zeros_like(u)
+            for i in range(degree, -1, -1):
+                acc *= u
+                acc += coef[i, 0]
+                for j in range(1, degree + 1 - i):
+                    np.multiply(v_powers[j], coef[i, j], out=term)
+                    acc += term
+            results.append(acc)
+        return results
+
+    def _ensure_built(self):
+        if self._built:
+            return
+        with self._lock:
+            if not self._built:
+                self._build()
+                self._built = True
+
+    def _build(self):
+        pad_x = self.margin * self.width
+        pad_y = self.margin * self.height
+        self._x_range = (-0.5 - pad_x, self.width - 0.5 + pad_x)
+        self._y_range = (-0.5 - pad_y, self.height - 0.5 + pad_y)
+
+        center_ra, center_dec = self.wcs.all_pix2world(
+            [np.mean(self._x_range)], [np.mean(self._y_range)], 0)
+        self._ra0 = np.deg2rad(center_ra[0])
+        self._dec0 = np.deg2rad(center_dec[0])
+
+        grid_x, grid_y = self._grid(self.grid_size, offset=0.0)
+        check_x, check_y = self._grid(2 * self.grid_size - 1, offset=0.5)
+        grid_ra, grid_dec = self.wcs.all_pix2world(grid_x, grid_y, 0)
+        check_ra, check_dec = self.wcs.all_pix2world(check_x, check_y, 0)
+        if not (np.all(np.isfinite(grid_ra)) and np.all(np.isfinite(check_ra))):
+            return
+
+        grid_xi, grid_eta = self._project(grid_ra, grid_dec)
+        check_xi, check_eta = self._project(check_ra, check_dec)
+        pad_xi = self.margin * np.ptp(grid_xi)
+        pad_eta = self.margin * np.ptp(grid_eta)
+        self._xi_range = (grid_xi.min() - pad_xi, grid_xi.max() + pad_xi)
+        self._eta_range = (grid_eta.min() - pad_eta, grid_eta.max() + pad_eta)
+
+        pixel_scale = np.deg2rad(np.mean(np.abs(self._local_scale())))
+
+        u, v = self._normalize_pixel(grid_x, grid_y)
+        s, t = self._normalize_plane(grid_xi, grid_eta)
+        check_u, check_v = self._normalize_pixel(check_x, check_y)
+        check_s, check_t = self._normalize_plane(check_xi, check_eta)
+
+        for degree in range(1, self.max_degree + 1):
+            fwd_xi, fwd_eta = self._fit(u, v, grid_xi, grid_eta, degree)
+            inv_x, inv_y = self._fit(s, t, grid_x, grid_y, degree)
+
+            fit_xi, fit_eta = self._polyval(check_u, check_v, fwd_xi, fwd_eta)
+            fit_x, fit_y = self._polyval(check_s, check_t, inv_x, inv_y)
+            fwd_err = np.hypot(fit_xi - check_xi, fit_eta - check_eta) / pixel_scale
+            inv_err = np.hypot(fit_x - check_x, fit_y - check_y)
+            error = float(max(fwd_err.max(), inv_err.max()))
+
+            if error <= self.tolerance_pix:
+                self.degree = degree
+                self.max_error_pix = error
+                self._fwd_xi, self._fwd_eta = fwd_xi, fwd_eta
+                self._inv_x, self._inv_y = inv_x, inv_y
+                return
+
+    def _local_scale(self):
+        cx, cy = np.mean(self._x_range), np.mean(self._y_range)
+        ra, dec = self.wcs.all_pix2world([cx, cx + 1, cx], [cy, cy, cy + 1], 0)
+        xi, eta = self._project(ra, dec)
+        return np.rad2deg([np.hypot(xi[1] - xi[0], eta[1] - eta[0]),
+                           np.hypot(xi[2] - xi[0], eta[2] - eta[0])])
+
+    def _grid(self, size, offset):
+        step_x = (self._x_range[1] - self._x_range[0]) / (size - 1 + 2 * offset)
+        step_y = (self._y_range[1] - self._y_range[0]) / (size - 1 + 2 * offset)
+        xs = self._x_range[0] + (np.arange(size) + offset) * step_x
+        ys = self._y_range[0] + (np.arange(size) + offset) * step_y
+        gx, gy = np.meshgrid(xs, ys)
+        return gx.ravel(), gy.ravel()
+
+    @staticmethod
+    def _fit(u, v, target_a, target_b, degree):
+        powers = [(i, j) for i in range(degree + 1) for j in range(degree + 1 - i)]
+        design = np.column_stack([u ** i * v ** j for i, j in powers])
+        solution, _, _, _ = np.linalg.lstsq(design, np.column_stack([target_a, target_b]), rcond=None)
+        coef_a = np.zeros((degree + 1, degree + 1))
+        coef_b = np.zeros((degree + 1, degree + 1))
+        for (i, j), a, b in zip(powers, solution[:, 0], solution[:, 1]):
+            coef_a[i, j] = a
+            coef_b[i, j] = b
+        return coef_a, coef_b
+
+    def _inside_pixel_domain(self, x, y):
+        return ((x >= self._x_range[0]) & (x <= self._x_range[1]) &
+                (y >= self._y_range[0]) & (y <= self._y_range[1]))
+
+    def _normalize_pixel(self, x, y):
+        return (self._scale(x, self._x_range), self._scale(y, self._y_range))
+
+    def _normalize_plane(self, xi, eta):
+        return (self._scale(xi, self._xi_range), self._scale(eta, self._eta_range))
+
+    @staticmethod
+    def _scale(values, bounds):
+        return (2.0 * values - (bounds[0] + bounds[1])) / (bounds[1] - bounds[0])
+
+    def _project(self, ra, dec):
+        ra = np.deg2rad(ra)
+        dec = np.deg2rad(dec)
+        d_ra = ra - self._ra0
+        cos_dec = np.cos(dec)
+        sin_dec0, cos_dec0 = np.sin(self._dec0), np.cos(self._dec0)
+        cos_c = sin_dec0 * np.sin(dec) + cos_dec0 * cos_dec * np.cos(d_ra)
+        cos_c = np.where(cos_c > 0, cos_c, np.nan)
+        xi = cos_dec * np.sin(d_ra) / cos_c
+        eta = (cos_dec0 * np.sin(dec) - sin_dec0 * cos_dec * np.cos(d_ra)) / cos_c
+        return xi, eta
+
+    def _deproject(self, xi, eta):
+        sin_dec0, cos_dec0 = np.sin(self._dec0), np.cos(self._dec0)
+        denom = cos_dec0 - eta * sin_dec0
+        ra = np.rad2deg(self._ra0 + np.arctan2(xi, denom)) % 360.0
+        dec = np.rad2deg(np.arctan2(sin_dec0 + eta * cos_dec0, np.hypot(xi, denom)))
+        return ra, dec
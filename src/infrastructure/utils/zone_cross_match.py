@@ -0,0 +1,196 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from src.infrastructure.utils.local_catalog_store import LocalCatalogStore
+from src.infrastructure.utils.sky_geometry import angular_separation_deg
+
+
+def sweep_nearest(x, y, ref_x, ref_y, radius, spherical=True, chunk_size=100000):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    nearest = np.full(len(x), -1, dtype=np.int64)
+    distances = np.full(len(x), np.inf)
+    if len(x) == 0 or len(ref_x) == 0:
+        return nearest, distances
+
+    ref_x = np.asarray(ref_x, dtype=np.float64)
+    ref_y = np.asarray(ref_y, dtype=np.float64)
+    if spherical:
+        cos_max = np.cos(np.deg2rad(np.minimum(np.abs(y) + radius, 90.0)))
+        window = np.minimum(np.where(cos_max > 1e-9, radius / np.maximum(cos_max, 1e-9), 180.0), 180.0)
+        reach = float(np.max(window))
+        low = ref_x < reach
+        high = ref_x > 360.0 - reach
+        owners = np.concatenate([np.arange(len(ref_x)), np.flatnonzero(low), np.flatnonzero(high)])
+        ref_x = np.concatenate([ref_x, ref_x[low] + 360.0, ref_x[high] - 360.0])
+        ref_y = ref_y[owners]
+    else:
+        window = np.full(len(x), float(radius))
+        owners = np.arange(len(ref_x))
+
+    order = np.argsort(ref_x, kind="stable")
+    sorted_x = ref_x[order]
+    sorted_y = ref_y[order]
+    sorted_owner = owners[order]
+
+    for begin in range(0, len(x), chunk_size):
+        end = min(begin + chunk_size, len(x))
+        cx, cy, cw = x[begin:end], y[begin:end], window[begin:end]
+        start = np.searchsorted(sorted_x, cx - cw, side="left")
+        stop = np.searchsorted(sorted_x, cx + cw, side="right")
+        lengths = stop - start
+        total = int(lengths.sum())
+        if total == 0:
+            continue
+
+        query = np.repeat(np.arange(end - begin), lengths)
+        candidate = np.repeat(start - (np.cumsum(lengths) - lengths), lengths) + np.arange(total)
+        if spherical:
+            distance = angular_separation_deg(cx[query], cy[query], sorted_x[candidate], sorted_y[candidate])
+        else:
+            distance = np.hypot(cx[query] - sorted_x[candidate], cy[query] - sorted_y[candidate])
+        inside = distance <= radius
+        query, candidate, distance = query[inside], candidate[inside], distance[inside]
+        if len(query) == 0:
+            continue
+
+        best = np.lexsort((distance, query))
+        first = best[np.concatenate([[True], query[best][1:] != query[best][:-1]])]
+        nearest[begin + query[first]] = sorted_owner[candidate[first]]
+        distances[begin + query[first]] = distance[first]
+
+    return nearest, distances
+
+
+def _match_sky_band(task):
+    if "left_dir" in task:
+        ra = np.load(os.path.join(task["left_dir"], "ra.npy"), mmap_mode="r")[task["start"]:task["stop"]]
+        dec = np.load(os.path.join(task["left_dir"], "dec.npy"), mmap_mode="r")[task["start"]:task["stop"]]
+    else:
+        ra, dec = task["ra"], task["dec"]
+
+    store = LocalCatalogStore(task["store_dir"])
+    first, last = np.searchsorted(store.key, [task["key_lo"], task["key_hi"]], side="left")
+    indices = np.arange(first, last, dtype=np.int64)
+    if task["mag_limit"] is not None and len(indices):
+        indices = indices[np.asarray(store.columns["mag"][first:last]) < task["mag_limit"]]
+    ref_ra, ref_dec = store.positions(indices, task["epoch"])
+
+    nearest, separations = sweep_nearest(ra, dec, ref_ra, ref_dec, task["radius_deg"])
+    matched = nearest >= 0
+    nearest[matched] = indices[nearest[matched]]
+    return task["start"], nearest, separations * 3600.0
+
+
+def _match_planar_band(task):
+    nearest, distances = sweep_nearest(task["x"], task["y"], task["ref_x"], task["ref_y"], task["radius"],
+                                       spherical=False)
+    matched = nearest >= 0
+    nearest[matched] = task["ref_index"][nearest[matched]]
+    return task["start"], nearest, distances
+
+
+class ZoneCrossMatcher:
+    def __init__(self, band_height_deg=1.0, band_height_pix=256.0, workers=None, min_parallel_rows=1000000,
+                 temp_dir=None):
+        self.band_height_deg = band_height_deg
+        self.band_height_pix = band_height_pix
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel_rows = min_parallel_rows
+        self.temp_dir = temp_dir
+
+    def match(self, ra, dec, store, radius_arcsec, epoch=None, mag_limit=None):
+        ra = np.mod(np.atleast_1d(np.asarray(ra, dtype=np.float64)), 360.0)
+        dec = np.atleast_1d(np.asarray(dec, dtype=np.float64))
+        nearest = np.full(len(ra), -1, dtype=np.int64)
+        separations = np.full(len(ra), np.inf)
+        if len(ra) == 0 or len(store) == 0:
+            return nearest, separations
+
+        order = np.argsort(dec, kind="stable")
+        sorted_dec = dec[order]
+        radius_deg = radius_arcsec / 3600.0
+        pad = radius_deg
+        if epoch is not None:
+            pad += store.max_pm * abs(epoch - store.epoch) / 3.6e6
+
+        edges = np.arange(np.floor(sorted_dec[0]), sorted_dec[-1] + self.band_height_deg, self.band_height_deg)
+        bounds = np.searchsorted(sorted_dec, edges, side="left")
+        bounds = np.unique(np.concatenate([[0], bounds, [len(ra)]]))
+
+        tasks = []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            zone_lo = self._store_zone(store, sorted_dec[start] - pad)
+            zone_hi = self._store_zone(store, sorted_dec[stop - 1] + pad)
+            tasks.append({
+                "start": int(start), "stop": int(stop), "store_dir": store.store_dir,
+                "key_lo": zone_lo * store.ZONE_STRIDE, "key_hi": (zone_hi + 1) * store.ZONE_STRIDE,
+                "radius_deg": radius_deg, "epoch": epoch, "mag_limit": mag_limit
+            })
+
+        if len(ra) < self.min_parallel_rows or self.workers <= 1 or len(tasks) == 1:
+            for task in tasks:
+                task["ra"] = ra[order[task["start"]:task["stop"]]]
+                task["dec"] = sorted_dec[task["start"]:task["stop"]]
+            results = map(_match_sky_band, tasks)
+            return self._collect(results, order, nearest, separations)
+
+        left_dir = tempfile.mkdtemp(prefix="zone_match_", dir=self.temp_dir)
+        try:
+            np.save(os.path.join(left_dir, "ra.npy"), ra[order])
+            np.save(os.path.join(left_dir, "dec.npy"), sorted_dec)
+            for task in tasks:
+                task["left_dir"] = left_dir
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as pool:
+                return self._collect(pool.map(_match_sky_band, tasks), order, nearest, separations)
+        finally:
+            shutil.rmtree(left_dir, ignore_errors=True)
+
+    def match_planar(self, x, y, ref_x, ref_y, radius):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        ref_x = np.asarray(ref_x, dtype=np.float64)
+        ref_y = np.asarray(ref_y, dtype=np.float64)
+        nearest = np.full(len(x), -1, dtype=np.int64)
+        distances = np.full(len(x), np.inf)
+        if len(x) == 0 or len(ref_x) == 0:
+            return nearest, distances
+
+        order = np.argsort(y, kind="stable")
+        sorted_y = y[order]
+        ref_order = np.argsort(ref_y, kind="stable")
+        sorted_ref_y = ref_y[ref_order]
+
+        edges = np.arange(np.floor(sorted_y[0]), sorted_y[-1] + self.band_height_pix, self.band_height_pix)
+        bounds = np.unique(np.concatenate([[0], np.searchsorted(sorted_y, edges, side="left"), [len(x)]]))
+
+        tasks = []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            ref_start = np.searchsorted(sorted_ref_y, sorted_y[start] - radius, side="left")
+            ref_stop = np.searchsorted(sorted_ref_y, sorted_y[stop - 1] + radius, side="right")
+            ref_index = ref_order[ref_start:ref_stop]
+            band = order[start:stop]
+            tasks.append({
+                "start": int(start), "x": x[band], "y": y[band], "ref_x": ref_x[ref_index],
+                "ref_y": ref_y[ref_index], "ref_index": ref_index, "radius": radius
+            })
+
+        if len(x) < self.min_parallel_rows or self.workers <= 1 or len(tasks) == 1:
+            return self._collect(map(_match_planar_band, tasks), order, nearest, distances)
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as pool:
+            return self._collect(pool.map(_match_planar_band, tasks), order, nearest, distances)
+
+    @staticmethod
+    def _collect(results, order, nearest, distances):
+        for start, band_nearest, band_distances in results:
+            rows = order[start:start + len(band_nearest)]
+            nearest[rows] = band_nearest
+            distances[rows] = band_distances
+        return nearest, distances
+
+    @staticmethod
+    def _store_zone(store, dec):
+        return int(np.clip(np.floor((dec + 90.0) / store.zone_height), 0, store.zone_count - 1))
@@ -3,11 +3,18 @@ import tkinter as tk
 
 from src.infrastructure.adapters.sep_detection_adapter import SepDetectionAdapter
 from src.infrastructure.adapters.astrometry_net_adapter import AstrometryNetAdapter
-from src.infrastructure.adapters.celestial_catalog_adapter import CelestialCatalogAdapter
+from src.infrastructure.adapters.async_catalog_adapter import AsyncCatalogAdapter
 
 from src.infrastructure.service.file_dialog_service import FileDialogService
 from src.infrastructure.service.object_comparison_service import ObjectComparisonService
+from src.infrastructure.service.catalog_prefetch_service import CatalogPrefetchService
 from src.infrastructure.service.parallel_processing_service import ParallelProcessingService
+from src.infrastructure.service.sequence_calibration_service import SequenceCalibrationService
+from src.infrastructure.utils.catalog_tile_cache import CatalogTileCache
+from src.infrastructure.utils.query_memo import QueryMemo
+from src.infrastructure.utils.catalog_scheduler import AdaptiveCatalogScheduler
+from src.infrastructure.utils.minor_planet_ephemeris import MinorPlanetEphemeris
+from src.infrastructure.utils.field_reference_index import FieldReferenceIndex
 
 from src.application.use_cases.select_image_use_case import SelectImageUseCase
 from src.application.use_cases.process_image_use_case import ProcessImageUseCase
@@ -47,24 +54,38 @@ def main():
     astrometry_service = AstrometryNetAdapter(api_key)
     detection_service = SepDetectionAdapter()
     file_selection_service = FileDialogService()
-    catalog_service = CelestialCatalogAdapter()
-    comparison_service = ObjectComparisonService()
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    tile_cache = CatalogTileCache(os.path.join(project_root, "cache", "catalog_tiles"))
+    memo = QueryMemo(persist_path=os.path.join(project_root, "cache", "catalog_memo.pkl"))
+    orbit_file = os.path.join(project_root, "data", "MPCORB.DAT")
+    minor_planets = MinorPlanetEphemeris(orbit_file) if os.path.exists(orbit_file) else None
+    catalog_service = AsyncCatalogAdapter(tile_cache=tile_cache, memo=memo, scheduler=AdaptiveCatalogScheduler(),
+                                          request_timeout=20.0, frame_deadline=120.0, minor_planets=minor_planets)
+    comparison_service = ObjectComparisonService(assignment="optimal", pre_align=True)
+    reference_index = FieldReferenceIndex(os.path.join(project_root, "cache", "reference_index"))
+    prefetch_service = CatalogPrefetchService(catalog_service)
 
     select_image_use_case = SelectImageUseCase(file_selection_service)
-    calibrate_image_use_case = CalibrateImageUseCase(astrometry_service)
+    calibrate_image_use_case = CalibrateImageUseCase(SequenceCalibrationService(astrometry_service))
     detect_objects_use_case = DetectObjectsUseCase(detection_service)
 
     parallel_service = ParallelProcessingService(calibrate_image_use_case, detect_objects_use_case)
 
-    verify_unknown_objects_use_case = VerifyUnknownObjectsUseCase(catalog_service, comparison_service)
+    verify_unknown_objects_use_case = VerifyUnknownObjectsUseCase(catalog_service, comparison_service,
+                                                                  mag_limit_margin=1.0,
+                                                                  reference_index=reference_index,
+                                                                  adaptive_radius=True, cluster_arcsec=3.0)
 
-    process_image_use_case = ProcessImageUseCase(parallel_service, verify_unknown_objects_use_case)
+    process_image_use_case = ProcessImageUseCase(parallel_service, verify_unknown_objects_use_case,
+                                                 prefetch_service=prefetch_service)
 
-    controller = AnalysisController(select_image_use_case, process_image_use_case)
+    controller = AnalysisController(select_image_use_case, process_image_use_case, deadline=180.0)
 
     root = tk.Tk()
     AstrometryApp(root, controller)
     root.mainloop()
+    prefetch_service.close()
+    catalog_service.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
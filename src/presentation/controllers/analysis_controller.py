@@ -1,12 +1,15 @@
+import time
 import astropy.units as u
 
 from astropy.coordinates import SkyCoord
+from src.infrastructure.utils.wcs_transform import WcsTransformEngine
 
 
 class AnalysisController:
-    def __init__(self, select_image_use_case, process_image_use_case):
+    def __init__(self, select_image_use_case, process_image_use_case, deadline=None):
         self.select_image_use_case = select_image_use_case
         self.process_image_use_case = process_image_use_case
+        self.deadline = deadline
 
     def select_image(self):
         return self.select_image_use_case.execute()
@@ -16,7 +19,8 @@ class AnalysisController:
             if status_callback:
                 status_callback("Калибровка изображения...", "blue")
 
-            result = self.process_image_use_case.execute(image_path, status_callback)
+            deadline = None if self.deadline is None else time.monotonic() + self.deadline
+            result = self.process_image_use_case.execute(image_path, status_callback, deadline=deadline)
 
             if "error" in result:
                 return result
@@ -28,29 +32,35 @@ class AnalysisController:
             wcs = result.get("astrometry", {}).get("wcs")
 
             truly_unknown_coords = []
-            if wcs:
-                for obj in unknown_objects:
-                    x, y = obj.get("x"), obj.get("y")
-                    ra, dec = wcs.all_pix2world([[x, y]], 0)[0]
-                    coords = SkyCoord(ra=ra * u.deg, dec=dec * u.deg, frame='icrs')
-                    ra_hms = coords.ra.hms
-                    ra_str = f"{int(ra_hms.h):02d}h {int(ra_hms.m):02d}m {ra_hms.s:.2f}s"
-                    dec_dms = coords.dec.dms
-                    sign = '+' if dec_dms.d >= 0 else '-'
-                    dec_str = f"{sign}{int(abs(dec_dms.d)):02d}° {int(abs(dec_dms.m)):02d}' {abs(dec_dms.s):.2f}\""
+            if wcs and unknown_objects:
+                xs = [obj.get("x") for obj in unknown_objects]
+                ys = [obj.get("y") for obj in unknown_objects]
+                ra_all, dec_all = WcsTransformEngine.for_wcs(wcs).pix2world(xs, ys)
+                coords = SkyCoord(ra=ra_all * u.deg, dec=dec_all * u.deg, frame='icrs')
+                ra_hms = coords.ra.hms
+                dec_dms = coords.dec.dms
+
+                for i, (x, y) in enumerate(zip(xs, ys)):
+                    ra_str = f"{int(ra_hms.h[i]):02d}h {int(ra_hms.m[i]):02d}m {ra_hms.s[i]:.2f}s"
+                    sign = '+' if dec_dms.d[i] >= 0 else '-'
+                    dec_str = f"{sign}{int(abs(dec_dms.d[i])):02d}° {int(abs(dec_dms.m[i])):02d}' {abs(dec_dms.s[i]):.2f}\""
 
                     truly_unknown_coords.append({
                         "x": x,
                         "y": y,
-                        "ra": ra,
-                        "dec": dec,
+                        "ra": float(ra_all[i]),
+                        "dec": float(dec_all[i]),
                         "ra_str": ra_str,
                         "dec_str": dec_str
                     })
 
             return {
                 "visualization_path": result.get("visualization_path", ""),
-                "truly_unknown_coords": truly_unknown_coords
+                "truly_unknown_coords": truly_unknown_coords,
+                "unverified_count": len(result.get("unverified_objects", [])),
+                "queries_avoided": result.get("queries_avoided", 0),
+                "extra_queries": result.get("extra_queries", 0),
+                "budget_exhausted": result.get("budget_exhausted", False)
             }
 
         except Exception as e:
@@ -181,6 +181,21 @@ class AstrometryApp:
                 (f"\nКоличество объектов: {len(unknown_objects)} (выделены желтым)", "black")
             ]
 
+            unverified_count = result.get("unverified_count", 0)
+            if unverified_count and result.get("budget_exhausted"):
+                text_parts.append((f"\nНе проверено (истекло время проверки): {unverified_count} (выделены серым)",
+                                   "orange"))
+            elif unverified_count:
+                text_parts.append((f"\nНе проверено (каталоги недоступны): {unverified_count} (выделены серым)",
+                                   "orange"))
+
+            queries_avoided = result.get("queries_avoided", 0)
+            if queries_avoided > 0:
+                text_parts.append((f"\nИсключено запросов к каталогам: {queries_avoided}", "black"))
+            extra_queries = result.get("extra_queries", 0)
+            if extra_queries > 0:
+                text_parts.append((f"\nДополнительных запросов из-за узкого радиуса: {extra_queries}", "black"))
+
             if unknown_objects:
                 text_parts.append(("\nКоординаты объектов:", "black"))
                 for i, obj in enumerate(unknown_objects):
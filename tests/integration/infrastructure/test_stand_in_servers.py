@@ -0,0 +1,314 @@
+import os
+import time
+import pytest
+import numpy as np
+from astroquery.vizier import Vizier
+from src.infrastructure.simulation.synthetic_sky import SyntheticSky
+from src.infrastructure.simulation.stand_in_servers import (
+    FaultProfile, AstrometryStandInServer, VizierStandInServer, stand_in_environment
+)
+from src.infrastructure.adapters.astrometry_net_adapter import AstrometryNetAdapter
+from src.infrastructure.adapters.celestial_catalog_adapter import CelestialCatalogAdapter
+from src.infrastructure.utils.catalog_tile_cache import CatalogTileCache
+from src.infrastructure.adapters.async_catalog_adapter import AsyncCatalogAdapter
+from src.infrastructure.utils.query_memo import QueryMemo
+from src.infrastructure.utils.catalog_scheduler import AdaptiveCatalogScheduler
+from src.infrastructure.utils.retry_policy import RetryPolicy
+from src.infrastructure.service.catalog_prefetch_service import CatalogPrefetchService
+
+
+@pytest.fixture(scope="module")
+def sky():
+    return SyntheticSky(seed=3)
+
+
+@pytest.fixture
+def frame_path(sky, tmp_path):
+    image_dir = tmp_path / "test-image"
+    image_dir.mkdir()
+    return sky.render_image(str(image_dir / "frame.png"))
+
+
+class TestStandInServers:
+    def test_astrometry_adapter_against_stand_in(self, sky, frame_path):
+        """Тест калибровки через локальный сервер astrometry.net"""
+        with AstrometryStandInServer(sky) as server, stand_in_environment(astrometry_server=server):
+            result = AstrometryNetAdapter("stand-in-key").calibrate_image(frame_path)
+
+        assert result is not None
+        assert np.allclose(result["wcs"].wcs.crval, sky.center)
+        assert len(result["pixel_coords"]) > 0
+        assert len(result["corr_coords"]) == len(result["pixel_coords"])
+        assert server.stats["requests"] > 0
+
+    def test_catalog_adapter_against_stand_in(self, sky):
+        """Тест поиска в каталогах через локальный сервер Vizier"""
+        with VizierStandInServer(sky) as server, stand_in_environment(vizier_server=server):
+            adapter = CelestialCatalogAdapter(vizier_server=server.address)
+            known = adapter.find_object_match(sky.stars["ra"][0], sky.stars["dec"][0])
+            unknown = adapter.find_object_match(sky.unknown["ra"][0], sky.unknown["dec"][0])
+
+        assert known and known[0][0] == "gaia"
+        assert unknown == []
+        assert server.stats["requests"] == 4
+
+    def test_localhost_tls_server(self, sky):
+        """Тест сертификата локального сервера Vizier для имени узла"""
+        with VizierStandInServer(sky, host="localhost") as server, stand_in_environment(vizier_server=server):
+            adapter = CelestialCatalogAdapter(vizier_server=server.address)
+            known = adapter.find_object_match(sky.stars["ra"][0], sky.stars["dec"][0])
+
+        assert server.address.startswith("localhost:")
+        assert known and known[0][0] == "gaia"
+
+    def test_repeated_queries_reach_server(self, sky):
+        """Тест отключения дискового кэша astroquery при работе с локальным сервером"""
+        with VizierStandInServer(sky) as server, stand_in_environment(vizier_server=server):
+            adapter = CelestialCatalogAdapter(vizier_server=server.address)
+            adapter.find_object_match(sky.unknown["ra"][0], sky.unknown["dec"][0])
+            adapter.find_object_match(sky.unknown["ra"][0], sky.unknown["dec"][0])
+
+        assert server.stats["requests"] == 6
+
+    def test_cone_distance_column(self, sky):
+        """Тест соответствия столбца _r координатам возвращенных звезд"""
+        ra, dec = sky.center
+        with VizierStandInServer(sky) as server, stand_in_environment(vizier_server=server):
+            vizier = Vizier(columns=["_RAJ2000", "_DEJ2000", "_r"], row_limit=-1)
+            vizier.VIZIER_SERVER = server.address
+            table = vizier.query_region(f"{ra} {dec}", radius="6m", catalog="I/355/gaiadr3")[0]
+
+        separation = sky.separation_deg(ra, dec, np.asarray(table["_RAJ2000"]), np.asarray(table["_DEJ2000"]))
+        assert len(table) > 1
+        assert np.allclose(np.asarray(table["_r"]), separation * 60, atol=1e-3)
+        assert np.all(np.diff(np.asarray(table["_r"])) >= 0)
+
+    def test_injected_latency(self, sky):
+        """Тест внесения задержки ответа"""
+        with VizierStandInServer(sky, FaultProfile(latency=0.2)) as server, \
+                stand_in_environment(vizier_server=server):
+            adapter = CelestialCatalogAdapter(vizier_server=server.address)
+            start = time.monotonic()
+            adapter.find_object_match(sky.stars["ra"][1], sky.stars["dec"][1])
+
+        assert time.monotonic() - start >= 0.2
+
+    def test_injected_errors(self, sky):
+        """Тест внесения ошибок сервера"""
+        with VizierStandInServer(sky, FaultProfile(error_rate=1.0)) as server, \
+                stand_in_environment(vizier_server=server):
+            adapter = CelestialCatalogAdapter(vizier_server=server.address)
+            result = adapter.find_object_match(sky.stars["ra"][2], sky.stars["dec"][2])
+
+        assert result is None
+        assert server.stats["errors"] == 6
+
+    def test_rate_limit(self, sky):
+        """Тест ограничения частоты запросов"""
+        with VizierStandInServer(sky, FaultProfile(rate_limit=1, burst=1)) as server, \
+                stand_in_environment(vizier_server=server):
+            adapter = CelestialCatalogAdapter(vizier_server=server.address)
+            adapter.find_object_match(sky.unknown["ra"][1], sky.unknown["dec"][1])
+
+        assert server.stats["throttled"] >= 1
+
+    def test_environment_is_restored(self, sky):
+        """Тест восстановления переменных окружения"""
+        before = os.environ.get("HTTP_PROXY")
+        with AstrometryStandInServer(sky) as server, stand_in_environment(astrometry_server=server):
+            assert os.environ["HTTP_PROXY"] == server.proxy_url
+
+        assert os.environ.get("HTTP_PROXY") == before
+
+    def test_field_query_against_stand_in(self, sky):
+        """Тест постраничного запроса поля кадра через локальный сервер Vizier"""
+        ra, dec = sky.center
+        with VizierStandInServer(sky) as server, stand_in_environment(vizier_server=server):
+            adapter = CelestialCatalogAdapter(vizier_server=server.address, field_page_radius_deg=0.1)
+            field = adapter.query_field(ra, dec, 0.3)
+
+        expected, _ = sky.cone(ra, dec, 0.3)
+        assert set(field) == {"gaia", "usno", "ps1"}
+        assert len(field["gaia"]["ra"]) >= len(expected)
+        for sources in field.values():
+            coords = set(zip(np.round(sources["ra"], 6), np.round(sources["dec"], 6)))
+            assert len(coords) == len(sources["ra"])
+
+    def test_tile_cache_answers_repeated_queries(self, sky, tmp_path):
+        """Тест ответа на повторные запросы из локального кэша плиток"""
+        ra, dec = sky.center
+        with VizierStandInServer(sky) as server, stand_in_environment(vizier_server=server):
+            adapter = CelestialCatalogAdapter(vizier_server=server.address,
+                                              tile_cache=CatalogTileCache(str(tmp_path), nside=64))
+            field = adapter.query_field(ra, dec, 0.3)
+            requests = server.stats["requests"]
+            star = sky.cone(ra, dec, 0.1)[0][0]
+            known = adapter.find_object_match(sky.stars["ra"][star], sky.stars["dec"][star])
+            unknown = adapter.find_object_match(sky.unknown["ra"][0], sky.unknown["dec"][0])
+
+        assert len(field["gaia"]["ra"]) == len(sky.cone(ra, dec, 0.3)[0])
+        assert known and known[0][0] == "gaia"
+        assert unknown == []
+        assert server.stats["requests"] == requests
+
+    def test_async_batch_overlaps_queries(self, sky):
+        """Тест одновременной проверки всех кандидатов асинхронным адаптером"""
+        coords = list(zip(sky.unknown["ra"], sky.unknown["dec"])) + [(sky.stars["ra"][0], sky.stars["dec"][0])]
+        with VizierStandInServer(sky, FaultProfile(latency=0.3)) as server, \
+                stand_in_environment(vizier_server=server):
+            adapter = AsyncCatalogAdapter(vizier_server=server.address,
+                                          service_limits={"vizier": {"concurrency": 8, "rate": 100, "burst": 100}})
+            start = time.monotonic()
+            matches = adapter.find_object_matches(coords)
+            elapsed = time.monotonic() - start
+            adapter.close()
+
+        assert [bool(m) for m in matches] == [False] * len(sky.unknown["ra"]) + [True]
+        assert server.stats["requests"] == 3 * len(sky.unknown["ra"]) + 1
+        assert elapsed < 0.3 * server.stats["requests"] / 3
+
+    def test_cross_match_upload(self, sky):
+        """Тест пакетного сопоставления списка позиций через локальный сервер Vizier"""
+        stars = np.arange(20)
+        ra = np.concatenate([sky.stars["ra"][stars] + 1e-4, sky.unknown["ra"]])
+        dec = np.concatenate([sky.stars["dec"][stars], sky.unknown["dec"]])
+        with VizierStandInServer(sky) as server, stand_in_environment(vizier_server=server):
+            adapter = CelestialCatalogAdapter(vizier_server=server.address, max_upload_size=8)
+            matches = adapter.cross_match(ra, dec, radius_arcsec=2)
+
+        assert server.stats["requests"] == 3 * int(np.ceil(len(ra) / 8))
+        gaia = matches["gaia"]
+        assert gaia["matched"].tolist() == [True] * len(stars) + [False] * len(sky.unknown["ra"])
+        assert np.allclose(gaia["ra"][:len(stars)], sky.stars["ra"][stars])
+        assert np.allclose(gaia["separation_arcsec"][:len(stars)], 1e-4 * 3600 * np.cos(np.deg2rad(dec[:len(stars)])), rtol=1e-3)
+
+    def test_memo_skips_repeated_queries(self, sky):
+        """Тест повторного использования результатов запросов"""
+        with VizierStandInServer(sky) as server, stand_in_environment(vizier_server=server):
+            adapter = CelestialCatalogAdapter(vizier_server=server.address, memo=QueryMemo())
+            known = adapter.find_object_match(sky.stars["ra"][0], sky.stars["dec"][0])
+            unknown = adapter.find_object_match(sky.unknown["ra"][0], sky.unknown["dec"][0])
+            requests = server.stats["requests"]
+            again = adapter.find_object_match(sky.stars["ra"][0], sky.stars["dec"][0])
+            assert adapter.find_object_match(sky.unknown["ra"][0], sky.unknown["dec"][0]) == unknown == []
+
+        assert server.stats["requests"] == requests
+        assert [name for name, _ in again] == [name for name, _ in known]
+        assert again[0][1]["_RAJ2000"] == pytest.approx(known[0][1]["_RAJ2000"])
+        assert adapter.memo.stats["hits"] == 1
+        assert adapter.memo.stats["negative_hits"] == 1
+
+    def test_memo_ignores_failed_queries(self, sky):
+        """Тест отказа от запоминания результатов при ошибках сервера"""
+        with VizierStandInServer(sky, FaultProfile(error_rate=1.0)) as server, \
+                stand_in_environment(vizier_server=server):
+            adapter = CelestialCatalogAdapter(vizier_server=server.address, memo=QueryMemo())
+            adapter.find_object_match(sky.stars["ra"][0], sky.stars["dec"][0])
+
+        assert len(adapter.memo) == 0
+
+    def test_magnitude_limited_queries(self, sky):
+        """Тест передачи ограничения по звездной величине в запросы к каталогу"""
+        ra, dec = sky.center
+        with VizierStandInServer(sky) as server, stand_in_environment(vizier_server=server):
+            adapter = CelestialCatalogAdapter(vizier_server=server.address)
+            full = adapter.query_field(ra, dec, 0.2)
+            adapter.set_mag_limit(13.9)
+            limited = adapter.query_field(ra, dec, 0.2)
+            faint = sky.cone(ra, dec, 0.2)[0]
+            faint = faint[sky.stars["mag"][faint] > 15][0]
+            missed = adapter.find_object_match(sky.stars["ra"][faint], sky.stars["dec"][faint])
+
+        assert adapter.mag_limit == 14.0
+        assert np.all(limited["gaia"]["mag"] < 14.0)
+        assert 0 < len(limited["gaia"]["ra"]) < len(full["gaia"]["ra"])
+        assert np.all(limited["usno"]["mag"] < 14.5)
+        assert 0 < len(limited["usno"]["ra"]) < len(full["usno"]["ra"])
+        assert missed == []
+
+    def test_cold_lookup_skips_tile_fetch(self, sky, tmp_path):
+        """Тест прямого запроса с ограничением величины при пустом кэше плиток"""
+        tile_cache = CatalogTileCache(str(tmp_path), nside=64)
+        with VizierStandInServer(sky) as server, stand_in_environment(vizier_server=server):
+            adapter = CelestialCatalogAdapter(vizier_server=server.address, tile_cache=tile_cache)
+            adapter.set_mag_limit(14.0)
+            unknown = adapter.find_object_match(sky.unknown["ra"][0], sky.unknown["dec"][0])
+
+        assert unknown == []
+        assert server.stats["requests"] == 3
+        assert tile_cache.size_bytes() == 0
+
+    def test_adaptive_scheduler_reduces_round_trips(self, sky):
+        """Тест сокращения числа запросов за счет адаптивного порядка каталогов"""
+        scheduler = AdaptiveCatalogScheduler()
+        for _ in range(10):
+            scheduler.record("gaia", sky.center[0], sky.center[1], hit=False, latency=0.1)
+            scheduler.record("ps1", sky.center[0], sky.center[1], hit=True, latency=0.1)
+
+        with VizierStandInServer(sky) as server, stand_in_environment(vizier_server=server):
+            adapter = CelestialCatalogAdapter(vizier_server=server.address, scheduler=scheduler)
+            result = adapter.find_object_match(sky.stars["ra"][0], sky.stars["dec"][0])
+
+        assert result[0][0] == "ps1"
+        assert server.stats["requests"] == 1
+        assert scheduler.statistics()["ps1"]["queries"] == 11
+
+    def test_circuit_breaker_skips_failing_service(self, sky):
+        """Тест пропуска отказавшего сервиса на период ожидания"""
+        with VizierStandInServer(sky, FaultProfile(error_rate=1.0)) as server, \
+                stand_in_environment(vizier_server=server):
+            adapter = CelestialCatalogAdapter(vizier_server=server.address, retry_policy=RetryPolicy(attempts=1),
+                                              failure_threshold=1)
+            first = adapter.find_object_match(sky.stars["ra"][0], sky.stars["dec"][0])
+            second = adapter.find_object_match(sky.stars["ra"][1], sky.stars["dec"][1])
+
+        assert first is None and second is None
+        assert server.stats["errors"] == 3
+
+    def test_failed_field_query_is_marked(self, sky):
+        """Тест отметки отказавших каталогов в запросах по полю и пакетном сопоставлении"""
+        ra, dec = sky.center
+        with VizierStandInServer(sky, FaultProfile(error_rate=1.0)) as server, \
+                stand_in_environment(vizier_server=server):
+            adapter = CelestialCatalogAdapter(vizier_server=server.address, retry_policy=RetryPolicy(attempts=2),
+                                              failure_threshold=1)
+            field = adapter.query_field(ra, dec, 0.1)
+            matches = adapter.cross_match([ra], [dec])
+
+        assert field == {"gaia": None, "usno": None, "ps1": None}
+        assert matches == {"gaia": None, "usno": None, "ps1": None}
+        assert server.stats["errors"] == 6
+
+    def test_frame_deadline_bounds_latency(self, sky):
+        """Тест ограничения времени проверки кадра крайним сроком"""
+        coords = list(zip(sky.unknown["ra"][:4], sky.unknown["dec"][:4]))
+        with VizierStandInServer(sky, FaultProfile(latency=1.0)) as server, \
+                stand_in_environment(vizier_server=server):
+            adapter = AsyncCatalogAdapter(vizier_server=server.address, frame_deadline=0.3)
+            started = time.monotonic()
+            matches = adapter.find_object_matches(coords)
+            elapsed = time.monotonic() - started
+            adapter.close()
+
+        assert matches == [None] * 4
+        assert elapsed < 1.0
+
+    def test_prefetch_makes_verification_local(self, sky, tmp_path):
+        """Тест предварительной загрузки каталогов по полю кадра до проверки"""
+        ra, dec = sky.center
+        with VizierStandInServer(sky) as server, stand_in_environment(vizier_server=server):
+            adapter = CelestialCatalogAdapter(vizier_server=server.address,
+                                              tile_cache=CatalogTileCache(str(tmp_path), nside=64))
+            prefetch = CatalogPrefetchService(adapter)
+            assert prefetch.wait(prefetch.submit([(ra, dec, 0.3), (ra + 0.05, dec, 0.3)]))
+            prefetch.close()
+            requests = server.stats["requests"]
+            star = sky.cone(ra, dec, 0.1)[0][0]
+            known = adapter.find_object_match(sky.stars["ra"][star], sky.stars["dec"][star])
+            unknown = adapter.find_object_match(sky.unknown["ra"][0], sky.unknown["dec"][0])
+
+        assert prefetch.stats["failed"] == 0
+        assert requests == prefetch.stats["fetched"]
+        assert known and known[0][0] == "gaia"
+        assert unknown == []
+        assert server.stats["requests"] == requests
@@ -1,3 +1,4 @@
+import time
 import pytest
 from unittest.mock import Mock
 from src.application.use_cases.calibrate_image_use_case import CalibrateImageUseCase
@@ -55,4 +56,26 @@ class TestCalibrateImageUseCase:
         result = self.use_case.process(data)
 
         assert "error" in result
-        assert result["error"] == "The path to the image is missing"
\ No newline at end of file
+        assert result["error"] == "The path to the image is missing"
+
+    def test_deadline_bounds_solver_timeout(self):
+        """Тест ограничения времени калибровки сроком анализа"""
+        self.mock_astrometry_service.calibrate_image.return_value = {"wcs": "wcs"}
+
+        self.use_case.process({"image_path": self.test_image_path, "deadline": time.monotonic() + 60})
+
+        image_path, timeout = self.mock_astrometry_service.calibrate_image.call_args[0]
+        assert image_path == self.test_image_path
+        assert 55 < timeout <= 60
+
+    def test_detections_are_passed_to_sequence_calibration(self):
+        """Тест передачи результатов обнаружения в калибровку последовательности"""
+        detections = Mock()
+        self.mock_astrometry_service.calibrate_with_detections.return_value = {"wcs": "wcs"}
+
+        result = self.use_case.process({"image_path": self.test_image_path, "pending": {"detection": detections}})
+
+        assert result == {"wcs": "wcs"}
+        self.mock_astrometry_service.calibrate_with_detections.assert_called_once_with(self.test_image_path,
+                                                                                        detections)
+        self.mock_astrometry_service.calibrate_image.assert_not_called()
@@ -110,4 +110,57 @@ class TestProcessImageUseCase:
             "error": "Ошибка калибровки изображения",
             "pixel_coords": [(100, 200)]
         }
-        self.mock_comparison_processor.process.assert_called_once_with(expected_combined_data)
\ No newline at end of file
+        self.mock_comparison_processor.process.assert_called_once_with(expected_combined_data)
+
+
+class TestProcessImageUseCasePrefetch:
+    def setup_method(self):
+        self.calls = []
+        self.parallel_service = Mock()
+        self.parallel_service.execute_parallel_tasks.side_effect = self.solve
+        self.verify_use_case = Mock()
+        self.verify_use_case.execute.side_effect = self.verify
+        self.prefetch_service = Mock()
+        self.prefetch_service.footprint.side_effect = lambda wcs: ("footprint", wcs)
+        self.prefetch_service.submit.side_effect = lambda footprints: self.calls.append(("submit", footprints))
+        self.use_case = ProcessImageUseCase(self.parallel_service, self.verify_use_case,
+                                            prefetch_service=self.prefetch_service)
+
+    def solve(self, initial_data):
+        self.calls.append(("solve", initial_data["image_path"]))
+        return {"astrometry": {"wcs": f"wcs-{initial_data['image_path']}", "pixel_coords": []},
+                "detection": {"pixel_coords": []}}
+
+    def verify(self, image_path, *args, **kwargs):
+        self.calls.append(("verify", image_path))
+        return {"unknown_objects": [], "unverified_objects": []}
+
+    @patch('src.application.use_cases.process_image_use_case.ImageHighlighter')
+    def test_previous_footprint_is_prefetched_while_solving(self, mock_highlighter):
+        """Тест предзагрузки поля предыдущего кадра до решения текущего"""
+        self.use_case.execute("first.jpg")
+        self.use_case.execute("second.jpg")
+
+        assert self.calls == [
+            ("solve", "first.jpg"),
+            ("verify", "first.jpg"),
+            ("submit", [("footprint", "wcs-first.jpg")]),
+            ("solve", "second.jpg"),
+            ("verify", "second.jpg"),
+        ]
+
+    @patch('src.application.use_cases.process_image_use_case.ImageHighlighter')
+    def test_verification_does_not_wait_for_prefetch(self, mock_highlighter):
+        """Тест запуска проверки без ожидания предзагрузки"""
+        self.use_case.execute("first.jpg")
+        self.use_case.execute("second.jpg")
+
+        self.prefetch_service.wait.assert_not_called()
+        self.prefetch_service.submit_wcs.assert_not_called()
+        assert self.verify_use_case.execute.call_count == 2
+
+    def test_prefetch_without_service(self):
+        """Тест отсутствия предзагрузки без сервиса"""
+        use_case = ProcessImageUseCase(self.parallel_service, self.verify_use_case)
+
+        assert use_case.prefetch([(150.0, 30.0, 0.1)]) is None
@@ -1,7 +1,30 @@
 import pytest
 from unittest.mock import Mock, patch, mock_open
 import os
+import time
+import numpy as np
+from astropy.wcs import WCS
 from src.application.use_cases.verify_unknown_objects_use_case import VerifyUnknownObjectsUseCase
+from src.domain.interfaces.catalog_service import ICatalogService
+from src.infrastructure.service.object_comparison_service import ObjectComparisonService
+from src.infrastructure.utils.field_reference_index import FieldReferenceIndex
+
+
+def make_catalog_service():
+    catalog_service = Mock()
+    catalog_service.find_object_matches.side_effect = (
+        lambda coords, **kwargs: ICatalogService.find_object_matches(catalog_service, coords, **kwargs)
+    )
+    return catalog_service
+
+
+def make_wcs():
+    wcs = WCS(naxis=2)
+    wcs.wcs.ctype = ["RA---TAN", "DEC--TAN"]
+    wcs.wcs.crval = [150.0, 30.0]
+    wcs.wcs.crpix = [500.0, 500.0]
+    wcs.wcs.cdelt = [-1.0 / 3600, 1.0 / 3600]
+    return wcs
 
 
 class TestVerifyUnknownObjectsUseCase:
@@ -147,4 +170,444 @@ class TestVerifyUnknownObjectsUseCase:
         result = self.use_case.process(data)
 
         assert "error" in result
-        assert "Недостаточно данных" in result["error"]
\ No newline at end of file
+        assert "Недостаточно данных" in result["error"]
+
+
+class TestVerifyUnknownObjectsWithCorrespondences:
+    def setup_method(self):
+        self.mock_catalog_service = make_catalog_service()
+        self.mock_catalog_service.find_object_match.return_value = []
+        self.use_case = VerifyUnknownObjectsUseCase(self.mock_catalog_service, ObjectComparisonService())
+
+        self.wcs = make_wcs()
+
+        self.sep_coords = [{"x": 100.0, "y": 100.0}, {"x": 200.0, "y": 200.0}, {"x": 300.0, "y": 300.0}]
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_solver_matches_skip_catalog_queries(self, mock_highlighter):
+        """Тест исключения звезд, сопоставленных решателем, из проверки по каталогам"""
+        corr_coords = [(100.8, 99.5), (200.5, 200.2)]
+
+        result = self.use_case.execute("image.png", self.sep_coords, [], self.wcs, corr_coords=corr_coords)
+
+        assert result["solver_matched_count"] == 2
+        assert self.mock_catalog_service.find_object_match.call_count == 1
+        assert result["unknown_objects"] == [self.sep_coords[2]]
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_without_correspondences(self, mock_highlighter):
+        """Тест проверки всех объектов при отсутствии соответствий решателя"""
+        result = self.use_case.execute("image.png", self.sep_coords, [], self.wcs)
+
+        assert result["solver_matched_count"] == 0
+        assert self.mock_catalog_service.find_object_match.call_count == 3
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_reference_match_in_arcseconds(self, mock_highlighter):
+        """Тест исключения опорных звезд по порогу в угловых секундах"""
+        astro_coords = [(103.0, 100.0), (200.5, 200.0)]
+        self.use_case.reference_match_arcsec = 2.0
+
+        result = self.use_case.execute("image.png", self.sep_coords, astro_coords, self.wcs)
+
+        assert result["unknown_objects"] == [self.sep_coords[0], self.sep_coords[2]]
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_unverified_objects_are_not_unknown(self, mock_highlighter):
+        """Тест отделения непроверенных объектов от неизвестных"""
+        self.mock_catalog_service.find_object_match.side_effect = [[], None, [("gaia", None)]]
+
+        result = self.use_case.execute("image.png", self.sep_coords, [], self.wcs)
+
+        assert result["unknown_objects"] == [self.sep_coords[0]]
+        assert result["unverified_objects"] == [self.sep_coords[1]]
+        assert result["unverified_count"] == 1
+
+
+class TestVerifyUnknownObjectsFieldMode:
+    def setup_method(self):
+        self.wcs = make_wcs()
+        self.wcs.pixel_shape = (1000, 1000)
+
+        self.sep_coords = [{"x": 100.0, "y": 100.0}, {"x": 200.0, "y": 200.0}, {"x": 300.0, "y": 300.0}]
+        ra, dec = self.wcs.all_pix2world([100.0, 300.0], [100.0, 300.0], 0)
+
+        self.mock_catalog_service = make_catalog_service()
+        self.mock_catalog_service.query_field.return_value = {
+            "gaia": {"ra": ra[:1], "dec": dec[:1], "mag": [12.0]},
+            "usno": {"ra": ra[1:] + 1.0 / 3600, "dec": dec[1:], "mag": [14.0]}
+        }
+        self.use_case = VerifyUnknownObjectsUseCase(
+            self.mock_catalog_service, ObjectComparisonService(), verification_mode="field"
+        )
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_single_field_query(self, mock_highlighter):
+        """Тест проверки всех объектов одним запросом по полю кадра"""
+        result = self.use_case.execute("image.png", self.sep_coords, [], self.wcs)
+
+        assert self.mock_catalog_service.query_field.call_count == 1
+        assert self.mock_catalog_service.find_object_match.call_count == 0
+        assert result["unknown_objects"] == [self.sep_coords[1]]
+
+        ra, dec, radius = self.mock_catalog_service.query_field.call_args[0]
+        assert radius > 500 * 2 ** 0.5 / 3600
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_fallback_when_field_unavailable(self, mock_highlighter):
+        """Тест перехода к поштучной проверке при недоступности каталогов"""
+        self.mock_catalog_service.query_field.return_value = {}
+        self.mock_catalog_service.find_object_match.return_value = [("gaia", None)]
+
+        result = self.use_case.execute("image.png", self.sep_coords, [], self.wcs)
+
+        assert self.mock_catalog_service.find_object_match.call_count == 3
+        assert result["unknown_objects"] == []
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_failed_catalog_leaves_unmatched_unverified(self, mock_highlighter):
+        """Тест пометки несовпавших объектов как непроверенных при сбое каталога"""
+        self.mock_catalog_service.query_field.return_value["ps1"] = None
+
+        result = self.use_case.execute("image.png", self.sep_coords, [], self.wcs)
+
+        assert self.mock_catalog_service.find_object_match.call_count == 0
+        assert result["unknown_objects"] == []
+        assert result["unverified_objects"] == [self.sep_coords[1]]
+
+
+class TestVerifyUnknownObjectsCrossMatchMode:
+    def setup_method(self):
+        self.wcs = make_wcs()
+
+        self.sep_coords = [{"x": 100.0, "y": 100.0}, {"x": 200.0, "y": 200.0}, {"x": 300.0, "y": 300.0}]
+        self.mock_catalog_service = make_catalog_service()
+        self.mock_catalog_service.cross_match.return_value = {
+            "gaia": {"matched": [True, False, False]},
+            "usno": {"matched": [False, False, True]}
+        }
+        self.use_case = VerifyUnknownObjectsUseCase(
+            self.mock_catalog_service, ObjectComparisonService(), verification_mode="cross_match"
+        )
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_single_batch_request(self, mock_highlighter):
+        """Тест проверки всех объектов одним пакетным запросом"""
+        result = self.use_case.execute("image.png", self.sep_coords, [], self.wcs)
+
+        assert self.mock_catalog_service.cross_match.call_count == 1
+        assert self.mock_catalog_service.find_object_match.call_count == 0
+        assert result["unknown_objects"] == [self.sep_coords[1]]
+        assert len(self.mock_catalog_service.cross_match.call_args[0][0]) == 3
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_fallback_when_cross_match_unavailable(self, mock_highlighter):
+        """Тест перехода к поштучной проверке при сбое пакетного запроса"""
+        self.mock_catalog_service.cross_match.return_value = {}
+        self.mock_catalog_service.find_object_match.return_value = []
+
+        result = self.use_case.execute("image.png", self.sep_coords, [], self.wcs)
+
+        assert self.mock_catalog_service.find_object_match.call_count == 3
+        assert len(result["unknown_objects"]) == 3
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_failed_catalog_leaves_unmatched_unverified(self, mock_highlighter):
+        """Тест пометки несовпавших объектов как непроверенных при сбое пакетного запроса к каталогу"""
+        self.mock_catalog_service.cross_match.return_value["ps1"] = None
+
+        result = self.use_case.execute("image.png", self.sep_coords, [], self.wcs)
+
+        assert result["unknown_objects"] == []
+        assert result["unverified_objects"] == [self.sep_coords[1]]
+
+
+class TestVerifyUnknownObjectsDepth:
+    def setup_method(self):
+        self.wcs = make_wcs()
+
+        mags = np.linspace(10, 14, 10)
+        self.known = [{"x": 50.0 * i, "y": 40.0, "flux": float(10 ** (-0.4 * (m - 25.0)))} for i, m in enumerate(mags)]
+        self.candidate = {"x": 400.0, "y": 400.0, "flux": float(10 ** (-0.4 * (17.0 - 25.0)))}
+        astro_coords = [(obj["x"], obj["y"]) for obj in self.known]
+
+        self.mock_catalog_service = make_catalog_service()
+        self.mock_catalog_service.cross_match.return_value = {
+            "gaia": {"matched": np.ones(10, dtype=bool), "mag": mags},
+            "usno": {"matched": np.zeros(10, dtype=bool), "mag": np.full(10, np.nan)}
+        }
+        self.mock_catalog_service.find_object_match.return_value = []
+        self.args = ("image.png", self.known + [self.candidate], astro_coords, self.wcs)
+        self.comparison_service = ObjectComparisonService()
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_magnitude_limit_from_matched_stars(self, mock_highlighter):
+        """Тест передачи каталогу предельной величины, оцененной по опорным звездам"""
+        use_case = VerifyUnknownObjectsUseCase(self.mock_catalog_service, self.comparison_service,
+                                               mag_limit_margin=1.0)
+
+        result = use_case.execute(*self.args)
+
+        assert result["limiting_magnitude"] == pytest.approx(18.0, abs=0.05)
+        self.mock_catalog_service.set_mag_limit.assert_called_with(result["limiting_magnitude"])
+        assert len(self.mock_catalog_service.cross_match.call_args[0][0]) == 10
+        assert self.mock_catalog_service.cross_match.call_args[1]["catalogs"] == ("gaia",)
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_calibrates_against_gaia_band(self, mock_highlighter):
+        """Тест калибровки предельной величины только по каталогу Gaia"""
+        self.mock_catalog_service.cross_match.return_value["usno"] = {
+            "matched": np.ones(10, dtype=bool), "mag": np.full(10, 5.0)
+        }
+        self.mock_catalog_service.cross_match.return_value["gaia"]["matched"][:3] = False
+        use_case = VerifyUnknownObjectsUseCase(self.mock_catalog_service, self.comparison_service,
+                                               mag_limit_margin=1.0)
+
+        result = use_case.execute(*self.args)
+
+        assert result["limiting_magnitude"] == pytest.approx(18.0, abs=0.05)
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_disabled_by_default(self, mock_highlighter):
+        """Тест отсутствия оценки глубины без явного включения"""
+        use_case = VerifyUnknownObjectsUseCase(self.mock_catalog_service, self.comparison_service)
+
+        result = use_case.execute(*self.args)
+
+        assert result["limiting_magnitude"] is None
+        assert self.mock_catalog_service.cross_match.call_count == 0
+
+
+class TestVerifyUnknownObjectsReferenceIndex:
+    def setup_method(self):
+        self.wcs = make_wcs()
+
+        self.sep_coords = [{"x": 100.0, "y": 100.0}, {"x": 200.0, "y": 200.0}, {"x": 300.0, "y": 300.0}]
+        self.astro_coords = [(400.0, 400.0)]
+        self.mock_catalog_service = make_catalog_service()
+        self.mock_catalog_service.find_object_match.return_value = []
+        self.use_case = VerifyUnknownObjectsUseCase(self.mock_catalog_service, ObjectComparisonService())
+
+    def attach_index(self, index_dir):
+        self.use_case.reference_index = FieldReferenceIndex(str(index_dir))
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_remembers_confirmed_stars(self, mock_highlighter, tmp_path):
+        """Тест пропуска подтвержденных звезд поля в следующих кадрах"""
+        self.attach_index(tmp_path)
+        self.mock_catalog_service.find_object_match.side_effect = [[("gaia", None)], [], [("gaia", None)]]
+
+        first = self.use_case.execute("image.png", self.sep_coords, self.astro_coords, self.wcs)
+        self.mock_catalog_service.find_object_match.side_effect = None
+        second = self.use_case.execute("image.png", self.sep_coords, self.astro_coords, self.wcs)
+
+        assert first["unknown_objects"] == [self.sep_coords[1]]
+        assert second["unknown_objects"] == [self.sep_coords[1]]
+        assert self.mock_catalog_service.find_object_match.call_count == 4
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_minor_planet_matches_are_not_remembered(self, mock_highlighter, tmp_path):
+        """Тест исключения совпадений только с малыми планетами из опорного индекса"""
+        self.attach_index(tmp_path)
+        self.mock_catalog_service.find_object_match.side_effect = [[("mpc", None)], [], [("gaia", None)]]
+
+        self.use_case.execute("image.png", self.sep_coords, self.astro_coords, self.wcs)
+        self.mock_catalog_service.find_object_match.side_effect = None
+        second = self.use_case.execute("image.png", self.sep_coords, self.astro_coords, self.wcs)
+
+        assert second["unknown_objects"] == [self.sep_coords[0], self.sep_coords[1]]
+        assert self.mock_catalog_service.find_object_match.call_count == 5
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_index_path_applies_assignment(self, mock_highlighter, tmp_path):
+        """Тест взаимно однозначного сопоставления с опорным индексом"""
+        sep_coords = [{"x": 400.0, "y": 400.0}, {"x": 401.5, "y": 400.0}]
+        astro_coords = [(400.5, 400.0)]
+        self.use_case.comparison_service = ObjectComparisonService(assignment="optimal")
+        self.attach_index(tmp_path)
+
+        result = self.use_case.execute("image.png", sep_coords, astro_coords, self.wcs)
+
+        assert result["unknown_objects"] == [sep_coords[1]]
+
+
+class TestVerifyUnknownObjectsAdaptiveRadius:
+    def setup_method(self):
+        self.wcs = make_wcs()
+
+        self.sep_coords = [{"x": 100.0, "y": 100.0}, {"x": 200.0, "y": 200.0}, {"x": 300.0, "y": 300.0}]
+        self.residuals = [2.0, 1.8, 2.2, 2.0, 1.9]
+        self.mock_catalog_service = make_catalog_service()
+        self.mock_catalog_service.find_object_match.return_value = []
+        self.use_case = VerifyUnknownObjectsUseCase(self.mock_catalog_service, ObjectComparisonService(),
+                                                    adaptive_radius=True)
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_radius_from_residuals(self, mock_highlighter):
+        """Тест выбора радиуса по невязкам решения и подсчета исключенных запросов"""
+        astro_coords = [(113.0, 100.0), (212.0, 200.0), (300.0, 300.0)]
+
+        result = self.use_case.execute("image.png", self.sep_coords, astro_coords, self.wcs,
+                                       corr_residuals=[6.0, 5.5, 6.5, 6.0, 5.8])
+
+        assert result["match_radius_px"] == pytest.approx(3 * 6.0 / 1.1774, rel=0.01)
+        assert result["match_radius_arcsec"] == pytest.approx(10.0)
+        assert result["queries_avoided"] == 2
+        assert result["unknown_objects"] == []
+        assert self.mock_catalog_service.find_object_match.call_count == 0
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_tighter_radius_reports_extra_queries(self, mock_highlighter):
+        """Тест отдельного учета дополнительных запросов при узком радиусе"""
+        astro_coords = [(108.0, 100.0), (208.0, 200.0), (308.0, 300.0)]
+
+        result = self.use_case.execute("image.png", self.sep_coords, astro_coords, self.wcs,
+                                       corr_residuals=self.residuals)
+
+        assert result["queries_avoided"] == 0
+        assert result["extra_queries"] == 3
+        assert result["unknown_objects"] == self.sep_coords
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_reference_index_uses_per_object_radius(self, mock_highlighter, tmp_path):
+        """Тест передачи индивидуальных радиусов вытянутых объектов в опорный индекс"""
+        shapes = [(2.0, 2.0), (6.0, 6.0), (2.0, 2.0)]
+        candidates = [dict(obj, a=a, b=b) for obj, (a, b) in zip(self.sep_coords, shapes)]
+        astro_coords = [(108.0, 100.0), (208.0, 200.0)]
+        self.use_case.reference_index = FieldReferenceIndex(str(tmp_path))
+
+        result = self.use_case.execute("image.png", candidates, astro_coords, self.wcs,
+                                       corr_residuals=self.residuals)
+
+        assert result["unknown_objects"] == [candidates[0], candidates[2]]
+
+
+class TestVerifyUnknownObjectsClustering:
+    def setup_method(self):
+        self.wcs = make_wcs()
+
+        self.mock_catalog_service = make_catalog_service()
+        self.mock_catalog_service.find_object_match.return_value = []
+        self.use_case = VerifyUnknownObjectsUseCase(self.mock_catalog_service, ObjectComparisonService(),
+                                                    cluster_arcsec=3.0)
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_fragments_share_one_query(self, mock_highlighter):
+        """Тест одного запроса на группу фрагментов одного источника"""
+        fragments = [{"x": 100.0, "y": 100.0, "flux": 1.0}, {"x": 102.0, "y": 100.0, "flux": 9.0},
+                     {"x": 104.0, "y": 101.0, "flux": 2.0}, {"x": 300.0, "y": 300.0, "flux": 3.0}]
+        self.mock_catalog_service.find_object_match.side_effect = [[("gaia", None)], []]
+
+        result = self.use_case.execute("image.png", fragments, [], self.wcs)
+
+        assert self.mock_catalog_service.find_object_match.call_count == 2
+        assert self.mock_catalog_service.find_object_match.call_args_list[0][0][0] == pytest.approx(
+            self.wcs.pixel_to_world_values(102.0, 100.0)[0])
+        assert result["unknown_objects"] == [fragments[3]]
+        assert result["queries_avoided"] == 2
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_chain_members_beyond_radius_are_queried(self, mock_highlighter):
+        """Тест отдельной проверки членов цепочки вне радиуса найденной звезды"""
+        chain = [{"x": 100.0 + 2.8 * i, "y": 100.0, "flux": 9.0 if i == 0 else 1.0} for i in range(4)]
+        ra, dec = self.wcs.pixel_to_world_values(100.0, 100.0)
+        star = ("gaia", {"_RAJ2000": float(ra), "_DEJ2000": float(dec)})
+        self.mock_catalog_service.find_object_match.side_effect = [[star], [], [("usno", None)]]
+
+        result = self.use_case.execute("image.png", chain, [], self.wcs)
+
+        queried = [call[0][0] for call in self.mock_catalog_service.find_object_match.call_args_list]
+        assert queried == pytest.approx([float(self.wcs.pixel_to_world_values(x, 100.0)[0])
+                                         for x in (100.0, 105.6, 108.4)])
+        assert result["unknown_objects"] == [chain[2]]
+        assert result["queries_avoided"] == 1
+
+
+class TestVerifyUnknownObjectsBudget:
+    def setup_method(self):
+        self.wcs = make_wcs()
+
+        self.sep_coords = [{"x": 100.0, "y": 100.0}, {"x": 200.0, "y": 200.0}, {"x": 300.0, "y": 300.0}]
+        self.mock_catalog_service = make_catalog_service()
+        self.mock_catalog_service.find_object_match.return_value = []
+        self.use_case = VerifyUnknownObjectsUseCase(self.mock_catalog_service, ObjectComparisonService())
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_query_budget_by_priority(self, mock_highlighter):
+        """Тест проверки кандидатов по приоритету в пределах бюджета запросов"""
+        candidates = [{"x": 100.0, "y": 100.0, "flux": 10.0, "npix": 4},
+                      {"x": 200.0, "y": 200.0, "flux": 90.0, "npix": 9},
+                      {"x": 300.0, "y": 300.0, "flux": 50.0, "npix": 4, "a": 10.0, "b": 1.0}]
+        self.use_case.query_budget = 2
+
+        result = self.use_case.execute("image.png", candidates, [], self.wcs)
+
+        queried = [call[0][0] for call in self.mock_catalog_service.find_object_match.call_args_list]
+        assert queried == pytest.approx([float(self.wcs.pixel_to_world_values(200.0, 200.0)[0]),
+                                         float(self.wcs.pixel_to_world_values(100.0, 100.0)[0])])
+        assert result["unknown_objects"] == [candidates[0], candidates[1]]
+        assert result["unverified_objects"] == [candidates[2]]
+        assert result["budget_exhausted"]
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_expired_deadline_returns_partial_results(self, mock_highlighter):
+        """Тест возврата непроверенных кандидатов после истечения срока"""
+        result = self.use_case.execute("image.png", self.sep_coords, [], self.wcs, deadline=time.monotonic() - 1)
+
+        assert self.mock_catalog_service.find_object_match.call_count == 0
+        assert result["unverified_objects"] == self.sep_coords
+        assert result["unknown_objects"] == []
+        assert result["budget_exhausted"]
+        self.mock_catalog_service.set_deadline.assert_called_with(None)
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_deadline_submits_candidates_in_one_call(self, mock_highlighter):
+        """Тест передачи всех кандидатов каталогу одним вызовом в порядке приоритета"""
+        candidates = [dict(obj, flux=flux) for obj, flux in zip(self.sep_coords, (10.0, 90.0, 50.0))]
+        deadline = time.monotonic() + 60
+
+        result = self.use_case.execute("image.png", candidates, [], self.wcs, deadline=deadline)
+
+        coords = self.mock_catalog_service.find_object_matches.call_args[0][0]
+        assert self.mock_catalog_service.find_object_matches.call_count == 1
+        assert [ra for ra, _ in coords] == pytest.approx(
+            [float(self.wcs.pixel_to_world_values(x, x)[0]) for x in (200.0, 300.0, 100.0)])
+        assert result["unknown_objects"] == candidates
+        assert not result["budget_exhausted"]
+        assert self.mock_catalog_service.set_deadline.call_args_list[0][0][0] == deadline
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_deadline_covers_depth_estimate(self, mock_highlighter):
+        """Тест действия срока на оценку предельной величины"""
+        deadlines = []
+
+        def cross_match(*args, **kwargs):
+            deadlines.append(self.mock_catalog_service.set_deadline.call_args[0][0])
+            return {}
+
+        self.mock_catalog_service.cross_match.side_effect = cross_match
+        self.use_case.mag_limit_margin = 1.0
+        known = [{"x": 400.0, "y": 400.0, "flux": 100.0}]
+        deadline = time.monotonic() + 60
+
+        self.use_case.execute("image.png", self.sep_coords + known, [(400.0, 400.0)], self.wcs, deadline=deadline)
+
+        assert deadlines == [deadline]
+        self.mock_catalog_service.set_deadline.assert_called_with(None)
+
+    @patch('src.application.use_cases.verify_unknown_objects_use_case.ImageHighlighter')
+    def test_cluster_requery_counts_against_budget(self, mock_highlighter):
+        """Тест учета повторных запросов членов группы в бюджете запросов"""
+        chain = [{"x": 100.0 + 2.8 * i, "y": 100.0, "flux": 9.0 if i == 0 else 1.0} for i in range(4)]
+        ra, dec = self.wcs.pixel_to_world_values(100.0, 100.0)
+        self.mock_catalog_service.find_object_match.return_value = [
+            ("gaia", {"_RAJ2000": float(ra), "_DEJ2000": float(dec)})
+        ]
+        self.use_case.cluster_arcsec = 3.0
+        self.use_case.query_budget = 1
+
+        result = self.use_case.execute("image.png", chain, [], self.wcs)
+
+        assert self.mock_catalog_service.find_object_match.call_count == 1
+        assert result["unverified_objects"] == chain[2:]
+        assert result["budget_exhausted"]
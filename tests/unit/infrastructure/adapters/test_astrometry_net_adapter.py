@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import Mock, patch, mock_open
 import json
 import os
+import threading
 from src.infrastructure.adapters.astrometry_net_adapter import AstrometryNetAdapter
 
 
@@ -201,4 +202,37 @@ class TestAstrometryNetAdapter:
             self.adapter.download_result_file(12345, "wcs_file", "output.fits")
 
         assert "Failed to upload" in str(exc_info.value)
-        mock_get.assert_called_once()
\ No newline at end of file
+        mock_get.assert_called_once()
+
+
+class TestAstrometryNetAdapterCancellation:
+    @patch('src.infrastructure.adapters.astrometry_net_adapter.AstrometryNetClient')
+    def test_cancelled_job_stops_polling(self, mock_client):
+        """Тест прекращения опроса задания после отмены"""
+        cancelled = threading.Event()
+        job = Mock()
+
+        def done():
+            if job.done.call_count >= 3:
+                cancelled.set()
+            return False
+
+        job.done.side_effect = done
+        mock_client.return_value.upload_file.return_value = job
+        adapter = AstrometryNetAdapter("test_api_key", poll_interval=0.01)
+
+        result = adapter.calibrate_image("test_image.jpg", timeout=5, cancelled=cancelled)
+
+        assert result is None
+        assert job.done.call_count == 3
+        job.rdls_file.assert_not_called()
+
+    @patch('src.infrastructure.adapters.astrometry_net_adapter.AstrometryNetClient')
+    def test_cancelled_before_upload(self, mock_client):
+        """Тест отказа от загрузки после отмены"""
+        cancelled = threading.Event()
+        cancelled.set()
+        adapter = AstrometryNetAdapter("test_api_key")
+
+        assert adapter.calibrate_image("test_image.jpg", cancelled=cancelled) is None
+        mock_client.return_value.upload_file.assert_not_called()
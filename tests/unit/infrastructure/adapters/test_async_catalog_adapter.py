@@ -0,0 +1,209 @@
+import time
+import pytest
+import asyncio
+import threading
+from unittest.mock import patch
+from astropy.table import Table
+from src.infrastructure.adapters.async_catalog_adapter import AsyncCatalogAdapter
+from src.infrastructure.utils.retry_policy import RetryPolicy
+from src.infrastructure.utils.catalog_tile_cache import CatalogTileCache
+
+
+class TestAsyncCatalogAdapter:
+    def setup_method(self):
+        """Настройка среды для каждого теста"""
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def slow_request(self, coords, radius=None, catalog=None, column_filters=None, cache=True):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        ra = float(coords.ra.deg)
+        return [Table({"ra": [ra]})] if ra < 10 else []
+
+    def make_adapter(self, request=None, **kwargs):
+        limits = {key: kwargs.pop(key) for key in ("concurrency", "rate", "burst") if key in kwargs}
+        adapter = AsyncCatalogAdapter(service_limits={"vizier": limits} if limits else None, **kwargs)
+        for vizier in adapter.catalog_vizier.values():
+            vizier.query_region = request or self.slow_request
+        adapter._query_mpc = lambda ra, dec, radius_arcsec: []
+        return adapter
+
+    def test_batch_results_in_order(self):
+        """Тест порядка результатов пакетной проверки"""
+        adapter = self.make_adapter(concurrency=8, rate=1000, burst=1000)
+        matches = adapter.find_object_matches([(5.0, 0.0), (20.0, 0.0), (1.0, 0.0)])
+        adapter.close()
+
+        assert [(name, row["ra"]) for name, row in matches[0]] == [("gaia", 5.0)]
+        assert matches[1] == []
+        assert matches[2][0][0] == "gaia"
+
+    def test_concurrency_limit(self):
+        """Тест ограничения числа одновременных запросов к сервису"""
+        adapter = self.make_adapter(concurrency=3, rate=1000, burst=1000)
+        start = time.monotonic()
+        adapter.find_object_matches([(20.0 + i, 0.0) for i in range(6)])
+        elapsed = time.monotonic() - start
+        adapter.close()
+
+        assert self.peak == 3
+        assert elapsed < 18 * 0.05
+
+    def test_rate_limit(self):
+        """Тест ограничения частоты запросов маркерным ведром"""
+        adapter = self.make_adapter(concurrency=8, rate=20, burst=1)
+        start = time.monotonic()
+        adapter.find_object_matches([(20.0 + i, 0.0) for i in range(2)])
+        adapter.close()
+
+        assert time.monotonic() - start >= 5 / 20
+
+    def test_inside_running_loop(self):
+        """Тест синхронного вызова из работающего цикла событий"""
+        adapter = self.make_adapter(concurrency=8, rate=1000, burst=1000)
+
+        async def run():
+            return adapter.find_object_matches([(1.0, 0.0)])
+
+        assert asyncio.run(run())[0][0][0] == "gaia"
+        adapter.close()
+
+    def test_local_queries_leave_event_loop(self):
+        """Тест выполнения локального поиска малых планет вне потока цикла событий"""
+        threads = []
+
+        def local_mpc(ra, dec, radius_arcsec):
+            threads.append(threading.current_thread().name)
+            return []
+
+        adapter = self.make_adapter()
+        adapter.minor_planets = object()
+        adapter.set_epoch(60000.0)
+        adapter._query_mpc = local_mpc
+        adapter.find_object_matches([(20.0, 0.0)])
+        adapter.close()
+
+        assert threads and threads[0].startswith("catalog")
+
+    def test_tile_cache_check_leaves_event_loop(self):
+        """Тест проверки кэша плиток вне потока цикла событий"""
+        threads = []
+
+        class TileCache:
+            def tiles_for_cone(self, ra, dec, radius_deg):
+                return [0]
+
+            def missing_tiles(self, catalog, tiles):
+                threads.append(threading.current_thread().name)
+                return tiles
+
+        adapter = self.make_adapter()
+        adapter.tile_cache = TileCache()
+        adapter.find_object_matches([(20.0, 0.0)])
+        adapter.close()
+
+        assert threads and all(name.startswith("catalog") for name in threads)
+
+    def test_retries_take_rate_tokens(self):
+        """Тест расхода маркера на каждую повторную попытку запроса"""
+        calls = []
+
+        def failing(coords, radius=None, catalog=None, column_filters=None, cache=True):
+            calls.append(time.monotonic())
+            raise ConnectionError("down")
+
+        adapter = self.make_adapter(request=failing, concurrency=8, rate=10, burst=1,
+                                    retry_policy=RetryPolicy(attempts=3, base_delay=0.0))
+        adapter._mpc_available = lambda: False
+        adapter.find_object_matches([(20.0, 0.0)])
+        adapter.close()
+
+        assert len(calls) == 9
+        assert calls[-1] - calls[0] >= 8 / 10 * 0.9
+
+    def test_cancelled_queries_keep_concurrency_limit(self):
+        """Тест соблюдения лимита параллельности после отмены по сроку"""
+        adapter = self.make_adapter(concurrency=2, rate=1000, burst=1000, frame_deadline=0.02)
+        adapter.find_object_matches([(20.0 + i, 0.0) for i in range(4)])
+        adapter.frame_deadline = None
+        adapter.find_object_matches([(40.0 + i, 0.0) for i in range(4)])
+        adapter.close()
+
+        assert self.peak <= 2
+
+    def test_cancelled_queries_stop_before_request(self):
+        """Тест отказа от запроса к сервису после отмены по сроку"""
+        calls = []
+
+        def request(coords, radius=None, catalog=None, column_filters=None, cache=True):
+            calls.append(time.monotonic())
+            time.sleep(0.05)
+            return []
+
+        adapter = self.make_adapter(request=request, concurrency=1, rate=1000, burst=1000, frame_deadline=0.08)
+        adapter._mpc_available = lambda: False
+        adapter.find_object_matches([(20.0 + i, 0.0) for i in range(6)])
+        finished = time.monotonic()
+        time.sleep(0.3)
+        adapter.close()
+
+        assert len(calls) <= 3
+        assert all(call < finished for call in calls)
+
+    def test_cancelled_queries_release_rate_tokens(self):
+        """Тест освобождения очереди за маркерами после отмены по сроку"""
+        calls = []
+
+        def request(coords, radius=None, catalog=None, column_filters=None, cache=True):
+            calls.append(time.monotonic())
+            return []
+
+        adapter = self.make_adapter(request=request, concurrency=8, rate=5, burst=1, frame_deadline=0.1)
+        adapter._mpc_available = lambda: False
+        adapter.find_object_matches([(20.0 + i, 0.0) for i in range(4)])
+        time.sleep(0.5)
+        adapter.close()
+
+        assert len(calls) == 1
+        assert adapter.buckets["vizier"].try_acquire()
+
+    def test_tile_fetch_uses_prefetch_budget(self, tmp_path):
+        """Тест отдельного ограничения частоты при загрузке плиток"""
+        adapter = AsyncCatalogAdapter(service_limits={"vizier": {"rate": 0.1, "burst": 1},
+                                                      "prefetch": {"rate": 10, "burst": 1}},
+                                      tile_cache=CatalogTileCache(str(tmp_path), nside=64))
+        for vizier in adapter.catalog_vizier.values():
+            vizier.query_region = self.slow_request
+        start = time.monotonic()
+        for tile in range(3):
+            adapter.fetch_tile("gaia", tile)
+        adapter.close()
+
+        assert time.monotonic() - start >= 2 / 10 * 0.9
+        assert adapter.buckets["vizier"].try_acquire()
+
+    def test_hedged_fanout_cancels_pending_queries(self):
+        """Тест отмены оставшихся запросов после первого совпадения"""
+        def query(name, ra, dec, radius_arcsec):
+            time.sleep({"gaia": 0.3, "usno": 0.05, "ps1": 0.3}[name])
+            return [(name, {"ra": ra})] if name == "usno" else []
+
+        adapter = AsyncCatalogAdapter(hedge_delay=0.0)
+        adapter._query_catalog = query
+        adapter._mpc_available = lambda: False
+        start = time.monotonic()
+        matches = adapter.find_object_matches([(5.0, 0.0)])
+        elapsed = time.monotonic() - start
+        adapter.close()
+
+        stats = adapter.get_fanout_statistics()
+        assert matches == [[("usno", {"ra": 5.0})]]
+        assert elapsed < 0.3
+        assert stats["extra_queries"] == 1
+        assert stats["abandoned"] == 2
@@ -1,8 +1,13 @@
+import time
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 import astropy.units as u
 from astropy.coordinates import SkyCoord
+from astropy.table import Table
 from src.infrastructure.adapters.celestial_catalog_adapter import CelestialCatalogAdapter
+from src.infrastructure.utils.retry_policy import RetryPolicy
+from src.infrastructure.utils.query_memo import QueryMemo
+from src.infrastructure.utils.catalog_tile_cache import CatalogTileCache
 
 
 class TestCelestialCatalogAdapter:
@@ -158,4 +163,150 @@ class TestCelestialCatalogAdapter:
 
         self.adapter._query_mpc(coord, self.test_radius * u.arcsec, results)
 
-        assert len(results) == 0
\ No newline at end of file
+        assert len(results) == 0
+
+
+class TestCelestialCatalogAdapterHedging:
+    ra = 10.0
+    dec = 20.0
+
+    def slow_query(self, name, ra, dec, radius_arcsec):
+        time.sleep({"gaia": 0.3, "usno": 0.05, "ps1": 0.3}[name])
+        return [(name, {"ra": ra})] if name == "usno" else []
+
+    def make_adapter(self, **kwargs):
+        adapter = CelestialCatalogAdapter(**kwargs)
+        adapter._query_catalog = self.slow_query
+        adapter._mpc_available = lambda: False
+        return adapter
+
+    def test_hedged_fanout_returns_first_match(self):
+        """Тест возврата первого совпадения при параллельном опросе каталогов"""
+        adapter = self.make_adapter(hedge_delay=0.0)
+        start = time.monotonic()
+        result = adapter.find_object_match(self.ra, self.dec)
+        elapsed = time.monotonic() - start
+
+        stats = adapter.get_fanout_statistics()
+        assert result == [("usno", {"ra": self.ra})]
+        assert elapsed < 0.3
+        assert stats["launched"] == 3
+        assert stats["needed"] == 2
+        assert stats["extra_queries"] == 1
+        assert stats["abandoned"] == 2
+
+    def test_abandoned_queries_stop_retrying(self):
+        """Тест прекращения повторов брошенных запросов после первого совпадения"""
+        calls = {"gaia": 0, "usno": 0, "ps1": 0}
+
+        def flaky_query(name, ra, dec, radius_arcsec):
+            with adapter._request_slot("vizier"):
+                calls[name] += 1
+                if name == "usno":
+                    return [(name, {"ra": ra})]
+                time.sleep(0.1)
+                raise ConnectionError("reset")
+
+        adapter = self.make_adapter(hedge_delay=0.0, retry_policy=RetryPolicy(attempts=3, base_delay=0.0))
+        adapter._query_catalog = flaky_query
+        result = adapter.find_object_match(self.ra, self.dec)
+        time.sleep(0.3)
+
+        assert result == [("usno", {"ra": self.ra})]
+        assert calls == {"gaia": 1, "usno": 1, "ps1": 1}
+        assert all(adapter.breakers[name].state == "closed" for name in calls)
+
+    def test_partial_results_are_memoized_briefly(self):
+        """Тест кратковременного запоминания результата при отказе части каталогов"""
+        def query(name, ra, dec, radius_arcsec):
+            if name == "gaia":
+                raise ConnectionError("reset")
+            return [(name, {"ra": ra})] if name == "usno" else []
+
+        adapter = self.make_adapter(memo=QueryMemo(hit_ttl=60, miss_ttl=0.05), retry_policy=RetryPolicy(attempts=1))
+        adapter._query_catalog = query
+        result = adapter.find_object_match(self.ra, self.dec, early_exit=False)
+        key = adapter._memo_key(self.ra, self.dec, 5, False)
+
+        assert result == [("usno", {"ra": self.ra})]
+        assert adapter.memo.get(key) == result
+        time.sleep(0.1)
+        assert adapter.memo.get(key) is None
+
+    def test_sequential_mode_has_no_extra_load(self):
+        """Тест отсутствия дополнительной нагрузки в последовательном режиме"""
+        adapter = self.make_adapter()
+        result = adapter.find_object_match(self.ra, self.dec)
+
+        stats = adapter.get_fanout_statistics()
+        assert result == [("usno", {"ra": self.ra})]
+        assert stats["launched"] == stats["needed"] == 2
+        assert stats["extra_load"] == 0.0
+
+    def test_external_deadline_bounds_batch(self):
+        """Тест ограничения пакетной проверки внешним сроком"""
+        adapter = self.make_adapter(frame_deadline=60.0)
+        adapter.set_deadline(time.monotonic() + 0.2)
+
+        matches = adapter.find_object_matches([(self.ra, self.dec)] * 3)
+
+        assert matches[0] == [("usno", {"ra": self.ra})]
+        assert matches[1:] == [None, None]
+
+    def test_tiles_are_cached_at_whole_magnitude_depth(self, tmp_path):
+        """Тест загрузки плиток до целой предельной величины и отсечения по точному пределу на месте"""
+        cache = CatalogTileCache(str(tmp_path), nside=64)
+        tile_ra, tile_dec, _ = cache.tile_cone(0)
+        filters = []
+
+        def request(coords, radius=None, catalog=None, column_filters=None, cache=True):
+            filters.append(column_filters)
+            return [Table({"_RAJ2000": [tile_ra, tile_ra], "_DEJ2000": [tile_dec, tile_dec],
+                           "Gmag": [14.0, 17.8]})]
+
+        adapter = self.make_adapter(tile_cache=cache)
+        adapter.catalog_vizier["gaia"].query_region = request
+        adapter.set_mag_limit(17.1)
+        adapter.fetch_tile("gaia", 0)
+        adapter.set_mag_limit(17.4)
+        cut = adapter._cached_cone("gaia", tile_ra, tile_dec, 0.001, fetch_missing=False)
+
+        assert filters == [{"Gmag": "<18"}]
+        assert adapter.tile_catalog("gaia") == "I/355/gaiadr3/mag18"
+        assert list(cut["mag"]) == [14.0]
+        adapter.set_mag_limit(None)
+        assert adapter.tile_catalog("gaia") == "I/355/gaiadr3"
+
+    def test_every_catalog_is_magnitude_limited(self):
+        """Тест передачи предельной величины каждому каталогу с поправкой на полосу"""
+        filters = {}
+
+        def request(name):
+            def query(coords, radius=None, catalog=None, column_filters=None, cache=True):
+                filters[name] = column_filters
+                return []
+            return query
+
+        adapter = self.make_adapter()
+        for name, vizier in adapter.catalog_vizier.items():
+            vizier.query_region = request(name)
+        adapter.set_mag_limit(17.1)
+        for name, (catalog, mag_column) in adapter.CATALOGS.items():
+            adapter._query_field_catalog(name, catalog, mag_column, self.ra, self.dec, 0.1)
+
+        assert filters == {"gaia": {"Gmag": "<17.25"}, "usno": {"R1mag": "<17.75"}, "ps1": {"rmag": "<17.75"}}
+        assert adapter.tile_catalog("usno") == "I/284/out/mag18"
+
+    def test_prefetch_failures_keep_foreground_breaker_closed(self, tmp_path):
+        """Тест изоляции отказов предзагрузки от основного предохранителя"""
+        def request(coords, radius=None, catalog=None, column_filters=None, cache=True):
+            raise ConnectionError("reset")
+
+        adapter = self.make_adapter(tile_cache=CatalogTileCache(str(tmp_path), nside=64),
+                                    retry_policy=RetryPolicy(attempts=1), failure_threshold=2)
+        adapter.catalog_vizier["gaia"].query_region = request
+        for tile in range(3):
+            assert adapter.fetch_tile("gaia", tile) is None
+
+        assert adapter.prefetch_breakers["gaia"].state == "open"
+        assert adapter.breakers["gaia"].state == "closed"
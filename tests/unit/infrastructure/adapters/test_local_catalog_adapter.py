@@ -0,0 +1,107 @@
+import pytest
+import numpy as np
+from unittest.mock import Mock
+from src.infrastructure.utils.local_catalog_store import LocalCatalogStore
+from src.infrastructure.adapters.local_catalog_adapter import LocalCatalogAdapter
+from src.infrastructure.utils.zone_cross_match import ZoneCrossMatcher
+
+
+class TestLocalCatalogAdapter:
+    def setup_method(self):
+        """Настройка среды для каждого теста"""
+        self.gaia_ra = np.array([150.0, 150.01])
+        self.gaia_dec = np.array([30.0, 30.01])
+
+    def make_adapter(self, tmp_path, epoch=None):
+        LocalCatalogStore.build(str(tmp_path / "gaia"), "gaia", self.gaia_ra, self.gaia_dec, [12.0, 13.0],
+                                pmra=[0.0, 0.0], pmdec=[0.0, 1000.0], mag_name="Gmag")
+        LocalCatalogStore.build(str(tmp_path / "usno"), "usno", [150.02], [30.02], [15.0],
+                                epoch=2000.0, mag_name="R1mag")
+        return LocalCatalogAdapter({"gaia": str(tmp_path / "gaia"), "usno": str(tmp_path / "usno")}, epoch=epoch)
+
+    def test_find_object_match(self, tmp_path):
+        """Тест поиска объекта в локальных каталогах"""
+        adapter = self.make_adapter(tmp_path)
+
+        result = adapter.find_object_match(150.0, 30.0, radius_arcsec=2)
+        assert result[0][0] == "gaia"
+        assert result[0][1]["Gmag"] == pytest.approx(12.0)
+
+        assert adapter.find_object_match(150.02, 30.02, radius_arcsec=2)[0][0] == "usno"
+        assert adapter.find_object_match(151.0, 31.0, radius_arcsec=2) == []
+
+    def test_epoch_propagation(self, tmp_path):
+        """Тест поиска с учетом эпохи наблюдения"""
+        adapter = self.make_adapter(tmp_path)
+        adapter.set_epoch(2026.0)
+
+        assert adapter.find_object_match(150.01, 30.01, radius_arcsec=2) == []
+        assert adapter.find_object_match(150.01, 30.01 + 10.0 / 3600, radius_arcsec=2)[0][0] == "gaia"
+
+    def test_query_field_and_batch_match(self, tmp_path):
+        """Тест запроса поля и пакетного сопоставления"""
+        adapter = self.make_adapter(tmp_path)
+
+        field = adapter.query_field(150.0, 30.0, 0.1)
+        assert len(field["gaia"]["ra"]) == 2
+        assert len(field["usno"]["ra"]) == 1
+
+        matches = adapter.cross_match([150.0, 150.5], [30.0, 30.5], radius_arcsec=2)
+        assert list(matches["gaia"]["matched"]) == [True, False]
+        assert matches["gaia"]["mag"][0] == pytest.approx(12.0)
+        assert np.isnan(matches["gaia"]["ra"][1])
+        assert not matches["usno"]["matched"].any()
+        assert list(adapter.cross_match([150.0], [30.0], radius_arcsec=2, catalogs=("gaia",))) == ["gaia"]
+
+    def test_magnitude_limit_applies_to_every_catalog(self, tmp_path):
+        """Тест применения предельной величины к каждому каталогу с поправкой на полосу"""
+        adapter = self.make_adapter(tmp_path)
+        adapter.set_mag_limit(12.5)
+        bright = adapter.query_field(150.0, 30.0, 0.1)
+        adapter.set_mag_limit(14.6)
+        deep = adapter.query_field(150.0, 30.0, 0.1)
+
+        assert bright["gaia"]["mag"].tolist() == [12.0]
+        assert len(bright["usno"]["ra"]) == 0
+        assert len(deep["gaia"]["ra"]) == 2
+        assert deep["usno"]["mag"].tolist() == [15.0]
+
+    def test_missing_store(self, tmp_path):
+        """Тест пропуска недоступного локального каталога"""
+        adapter = LocalCatalogAdapter({"gaia": str(tmp_path / "missing")})
+
+        assert adapter.stores == {}
+        assert adapter.find_object_match(150.0, 30.0) == []
+
+    def test_minor_planets_at_epoch(self, tmp_path):
+        """Тест проверки по локальным орбитам малых планет на эпоху снимка"""
+        minor_planets = Mock()
+        minor_planets.query_cone.return_value = {
+            "designation": np.array(["(4) Vesta"]), "ra": np.array([151.0]), "dec": np.array([31.0]),
+            "mag": np.array([7.5])
+        }
+        minor_planets.cross_match.return_value = {"matched": np.array([True])}
+        adapter = self.make_adapter(tmp_path)
+        adapter.minor_planets = minor_planets
+
+        assert adapter.find_object_match(151.0, 31.0, radius_arcsec=2) == []
+        minor_planets.query_cone.assert_not_called()
+
+        adapter.set_epoch(2024.8)
+        result = adapter.find_object_match(151.0, 31.0, radius_arcsec=2)
+
+        assert result == [("mpc", {"designation": "(4) Vesta", "_RAJ2000": 151.0, "_DEJ2000": 31.0, "V": 7.5})]
+        assert minor_planets.query_cone.call_args[0][2:] == (2 / 3600, 2024.8)
+        assert "mpc" in adapter.query_field(151.0, 31.0, 0.1)
+        assert adapter.cross_match([151.0], [31.0], radius_arcsec=2)["mpc"]["matched"][0]
+
+    def test_zone_cross_match_backend(self, tmp_path):
+        """Тест пакетного сопоставления через зонный обработчик"""
+        adapter = self.make_adapter(tmp_path)
+        adapter.cross_matcher = ZoneCrossMatcher(workers=1)
+
+        matches = adapter.cross_match([150.0, 150.5, 150.02], [30.0, 30.5, 30.02], radius_arcsec=2)
+
+        assert list(matches["gaia"]["matched"]) == [True, False, False]
+        assert list(matches["usno"]["matched"]) == [False, False, True]
+        assert matches["gaia"]["mag"][0] == pytest.approx(12.0)
@@ -0,0 +1,136 @@
+import time
+import pytest
+import threading
+import numpy as np
+from src.infrastructure.utils.catalog_tile_cache import CatalogTileCache
+from src.infrastructure.service.catalog_prefetch_service import CatalogPrefetchService
+
+
+class FakeCatalog:
+    CATALOGS = {"gaia": ("I/355/gaiadr3", "Gmag"), "usno": ("I/284/out", "R1mag")}
+
+    def __init__(self, tile_cache, delay=0.0, failing=()):
+        self.tile_cache = tile_cache
+        self.delay = delay
+        self.failing = set(failing)
+        self.fetched = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def tile_catalog(self, name):
+        return f"{self.CATALOGS[name][0]}/stored"
+
+    def fetch_tile(self, name, tile):
+        with self.lock:
+            self.fetched.append((name, tile))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        if name in self.failing:
+            return None
+        ra, dec, _ = self.tile_cache.tile_cone(tile)
+        self.tile_cache.put_tile(self.tile_catalog(name), tile, [ra], [dec], [15.0])
+        return 1
+
+
+class TestCatalogPrefetchService:
+    def test_overlapping_footprints_are_deduplicated(self, tmp_path):
+        """Тест объединения перекрывающихся полей кадров в один набор плиток"""
+        cache = CatalogTileCache(str(tmp_path), nside=64)
+        catalog = FakeCatalog(cache)
+        service = CatalogPrefetchService(catalog)
+        footprints = [(150.0, 30.0, 0.4), (150.1, 30.05, 0.4), (150.0, 30.0, 0.2)]
+
+        assert service.wait(service.submit(footprints))
+        service.close()
+
+        tiles = set()
+        for ra, dec, radius in footprints:
+            tiles.update(int(tile) for tile in cache.tiles_for_cone(ra, dec, radius))
+        assert len(catalog.fetched) == len(set(catalog.fetched)) == 2 * len(tiles)
+        assert service.stats["fetched"] == 2 * len(tiles)
+        assert service.plan(footprints) == []
+
+    def test_second_submit_fetches_nothing(self, tmp_path):
+        """Тест отсутствия повторной загрузки уже сохраненных плиток"""
+        cache = CatalogTileCache(str(tmp_path), nside=64)
+        catalog = FakeCatalog(cache)
+        service = CatalogPrefetchService(catalog)
+
+        service.wait(service.submit([(150.0, 30.0, 0.1)]))
+        fetched = len(catalog.fetched)
+        second = service.submit([(150.0, 30.0, 0.1)])
+        assert service.wait(second)
+        service.close()
+
+        assert fetched > 0
+        assert second.result() == []
+        assert len(catalog.fetched) == fetched
+
+    def test_fetches_run_concurrently(self, tmp_path):
+        """Тест параллельной загрузки плиток"""
+        cache = CatalogTileCache(str(tmp_path), nside=64)
+        catalog = FakeCatalog(cache, delay=0.05)
+        service = CatalogPrefetchService(catalog, max_workers=4)
+
+        service.wait(service.submit([(150.0, 30.0, 0.5)]))
+        service.close()
+
+        assert catalog.peak == 4
+
+    def test_in_flight_tiles_are_not_refetched(self, tmp_path):
+        """Тест повторного использования загрузок, которые еще выполняются"""
+        cache = CatalogTileCache(str(tmp_path), nside=64)
+        catalog = FakeCatalog(cache, delay=0.1)
+        service = CatalogPrefetchService(catalog, max_workers=2)
+
+        first = service.submit([(150.0, 30.0, 0.1)])
+        second = service.submit([(150.0, 30.0, 0.1)])
+        service.wait()
+        service.close()
+
+        assert len(catalog.fetched) == len(first.result())
+        assert service.stats["in_flight"] == len(second.result())
+
+    def test_failures_are_counted(self, tmp_path):
+        """Тест учета неудачных загрузок без прерывания остальных"""
+        cache = CatalogTileCache(str(tmp_path), nside=64)
+        catalog = FakeCatalog(cache, failing={"usno"})
+        service = CatalogPrefetchService(catalog)
+
+        planning = service.submit([(150.0, 30.0, 0.1)])
+        service.wait(planning)
+        service.close()
+
+        assert service.stats["failed"] == service.stats["fetched"] == len(planning.result()) // 2
+        assert np.all([name == "usno" for name, _ in service.plan([(150.0, 30.0, 0.1)])])
+
+    def test_without_tile_cache(self):
+        """Тест отсутствия предзагрузки без локального кэша"""
+        catalog = FakeCatalog(None)
+        service = CatalogPrefetchService(catalog)
+
+        assert service.submit([(150.0, 30.0, 0.1)]) is None
+        service.close()
+
+    def test_planning_leaves_caller_thread(self, tmp_path):
+        """Тест планирования предзагрузки вне вызывающего потока"""
+        cache = CatalogTileCache(str(tmp_path), nside=64)
+        catalog = FakeCatalog(cache)
+        service = CatalogPrefetchService(catalog)
+        threads = []
+        plan = service.plan
+
+        def recording_plan(footprints):
+            threads.append(threading.current_thread())
+            return plan(footprints)
+
+        service.plan = recording_plan
+        assert service.wait(service.submit([(150.0, 30.0, 0.1)]))
+        service.close()
+
+        assert len(threads) == 1
+        assert threads[0] is not threading.current_thread()
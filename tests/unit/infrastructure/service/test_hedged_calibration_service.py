@@ -0,0 +1,131 @@
+import time
+import pytest
+import threading
+from unittest.mock import Mock
+from src.infrastructure.service.hedged_calibration_service import HedgedCalibrationService
+
+
+def make_backend(delay, result):
+    backend = Mock()
+
+    def calibrate(image_path, timeout, cancelled=None):
+        time.sleep(delay)
+        return result
+
+    backend.calibrate_image.side_effect = calibrate
+    return backend
+
+
+class TestHedgedCalibrationService:
+    def test_fast_backend_wins_without_hedging(self):
+        """Тест: быстрый решатель успевает до запуска резервного"""
+        fast = make_backend(0.01, {"wcs": "fast_wcs"})
+        slow = make_backend(0.01, {"wcs": "slow_wcs"})
+        service = HedgedCalibrationService([("hinted", fast), ("blind", slow)], stagger_delays=[0.5])
+
+        result = service.calibrate_image("image.png")
+
+        assert result["wcs"] == "fast_wcs"
+        assert result["backend"] == "hinted"
+        slow.calibrate_image.assert_not_called()
+
+    def test_backup_started_after_stagger_delay(self):
+        """Тест запуска резервного решателя после задержки"""
+        stalled = make_backend(1.0, {"wcs": "stalled_wcs"})
+        backup = make_backend(0.01, {"wcs": "backup_wcs"})
+        service = HedgedCalibrationService([("hinted", stalled), ("blind", backup)], stagger_delays=[0.05])
+
+        start = time.monotonic()
+        result = service.calibrate_image("image.png")
+
+        assert result["backend"] == "blind"
+        assert time.monotonic() - start < 0.5
+        stats = service.get_statistics()
+        assert stats["blind"]["wins"] == 1
+        assert stats["hinted"]["abandoned"] == 1
+
+    def test_losing_backend_is_cancelled(self):
+        """Тест остановки проигравшего решателя после победы другого"""
+        stopped = threading.Event()
+        polls = []
+
+        def poll_until_cancelled(image_path, timeout, cancelled=None):
+            while not cancelled.wait(0.01):
+                polls.append(image_path)
+            stopped.set()
+            return None
+
+        stalled = Mock()
+        stalled.calibrate_image.side_effect = poll_until_cancelled
+        backup = make_backend(0.01, {"wcs": "backup_wcs"})
+        service = HedgedCalibrationService([("hinted", stalled), ("blind", backup)], stagger_delays=[0.05])
+
+        result = service.calibrate_image("image.png")
+
+        assert result["backend"] == "blind"
+        assert stopped.wait(1.0)
+        count = len(polls)
+        time.sleep(0.05)
+        assert len(polls) == count
+        stats = service.get_statistics()
+        assert stats["hinted"]["abandoned"] == 1
+        assert stats["hinted"]["failures"] == 0
+
+    def test_outer_cancel_stops_race(self):
+        """Тест остановки всех решателей при отмене вызывающим кодом"""
+        cancelled = threading.Event()
+        stopped = threading.Event()
+
+        def poll_until_cancelled(image_path, timeout, cancelled=None):
+            while not cancelled.wait(0.01):
+                pass
+            stopped.set()
+            return None
+
+        stalled = Mock()
+        stalled.calibrate_image.side_effect = poll_until_cancelled
+        backup = make_backend(0.0, {"wcs": "backup_wcs"})
+        service = HedgedCalibrationService([("hinted", stalled), ("blind", backup)], stagger_delays=[5.0])
+        threading.Timer(0.05, cancelled.set).start()
+
+        start = time.monotonic()
+        result = service.calibrate_image("image.png", cancelled=cancelled)
+
+        assert result is None
+        assert time.monotonic() - start < 1.0
+        assert stopped.wait(1.0)
+        backup.calibrate_image.assert_not_called()
+        assert service.get_statistics()["hinted"]["failures"] == 0
+
+    def test_failure_launches_next_backend_immediately(self):
+        """Тест немедленного запуска следующего решателя при ошибке"""
+        failing = make_backend(0.0, None)
+        backup = make_backend(0.0, {"wcs": "backup_wcs"})
+        service = HedgedCalibrationService([("hinted", failing), ("blind", backup)], stagger_delays=[5.0])
+
+        start = time.monotonic()
+        result = service.calibrate_image("image.png")
+
+        assert result["backend"] == "blind"
+        assert time.monotonic() - start < 1.0
+        assert service.get_statistics()["hinted"]["failures"] == 1
+
+    def test_all_backends_fail(self):
+        """Тест результата, если ни один решатель не справился"""
+        service = HedgedCalibrationService([("a", make_backend(0.0, None)), ("b", make_backend(0.0, None))],
+                                           stagger_delays=[0.01])
+
+        assert service.calibrate_image("image.png") is None
+
+    def test_adaptive_delay_uses_observed_median(self):
+        """Тест адаптивной задержки по медиане наблюдаемых задержек"""
+        fast = make_backend(0.02, {"wcs": "fast_wcs"})
+        slow = make_backend(0.0, {"wcs": "slow_wcs"})
+        service = HedgedCalibrationService([("hinted", fast), ("blind", slow)], initial_delay=1.0)
+
+        for _ in range(3):
+            service.calibrate_image("image.png")
+
+        delays = service._start_delays()
+        assert delays[1] == pytest.approx(service.get_statistics()["hinted"]["latency_p50"])
+        assert service.get_statistics()["hinted"]["wins"] == 3
@@ -102,4 +102,67 @@ class TestObjectComparisonService:
         assert len(unique_objects) == 2
         # Проверка должна учитывать, что результат может быть NumPy-массивом или списком кортежей
         for obj in [(200, 200), (300, 300)]:
-            assert obj in unique_objects or np.any(np.all(np.array(obj) == unique_objects, axis=1))
\ No newline at end of file
+            assert obj in unique_objects or np.any(np.all(np.array(obj) == unique_objects, axis=1))
+
+
+class TestObjectComparisonServiceIndices:
+    def setup_method(self):
+        self.service = ObjectComparisonService()
+
+    def test_unique_indices_in_pixels(self):
+        """Тест получения индексов уникальных объектов в пиксельных координатах"""
+        detected = [{"x": 100, "y": 100}, {"x": 200, "y": 200}, {"x": 300, "y": 300}]
+        reference = [(105, 102), (310, 300)]
+
+        indices = self.service.unique_indices(self.service.object_coords(detected), reference, match_threshold=10)
+
+        assert list(indices) == [1]
+        assert self.service.find_unique_objects(detected, reference, match_threshold=10) == [detected[1]]
+
+    def test_unique_sky_mask(self):
+        """Тест сопоставления на сфере с порогом в угловых секундах"""
+        ra = np.array([10.0, 10.0, 359.9999])
+        dec = np.array([20.0, 20.01, -30.0])
+        ref_ra = np.array([10.0 + 1.0 / 3600 / np.cos(np.radians(20.0)), 0.0001])
+        ref_dec = np.array([20.0, -30.0])
+
+        mask = self.service.unique_sky_mask(ra, dec, ref_ra, ref_dec, threshold_arcsec=2.0)
+        indices, separations = self.service.match_sky(ra, dec, ref_ra, ref_dec, threshold_arcsec=2.0)
+
+        assert list(mask) == [False, True, False]
+        assert list(indices) == [0, -1, 1]
+        assert separations[0] == pytest.approx(1.0, abs=1e-3)
+        assert list(self.service.unique_sky_indices(ra, dec, ref_ra, ref_dec, 0.5)) == [0, 1, 2]
+
+    def test_large_sky_match(self):
+        """Тест производительности сопоставления больших наборов на сфере"""
+        rng = np.random.default_rng(0)
+        ra = rng.uniform(0, 10, 200000)
+        dec = rng.uniform(-5, 5, 200000)
+
+        mask = self.service.unique_sky_mask(ra, dec, ra + 1e-5, dec, threshold_arcsec=1.0)
+
+        assert not mask.any()
+
+    def test_one_to_one_assignment(self):
+        """Тест взаимно однозначного сопоставления в плотном поле"""
+        detected = [(0.0, 0.0), (1.0, 0.0)]
+        reference = [(0.4, 0.0)]
+
+        nearest = self.service.unique_mask(detected, reference, match_threshold=2.0)
+        assigned = ObjectComparisonService(assignment="greedy").unique_mask(detected, reference, match_threshold=2.0)
+
+        assert list(nearest) == [False, False]
+        assert list(assigned) == [False, True]
+
+    def test_pre_alignment_before_threshold(self):
+        """Тест предварительного совмещения списков со сдвигом"""
+        rng = np.random.default_rng(4)
+        reference = rng.uniform(0, 1000, (200, 2))
+        detected = reference + [7.0, 8.0]
+
+        plain = self.service.unique_mask(detected, reference, match_threshold=3)
+        aligned = ObjectComparisonService(pre_align=True).unique_mask(detected, reference, match_threshold=3)
+
+        assert plain.sum() > 150
+        assert aligned.sum() == 0
@@ -0,0 +1,124 @@
+import pytest
+import threading
+import numpy as np
+from unittest.mock import Mock
+from concurrent.futures import Future
+from astropy.wcs import WCS
+from src.infrastructure.service.sequence_calibration_service import SequenceCalibrationService
+
+
+def make_wcs(crpix=(500.0, 500.0), rotation_deg=0.0):
+    wcs = WCS(naxis=2)
+    wcs.wcs.ctype = ["RA---TAN", "DEC--TAN"]
+    wcs.wcs.crval = [150.0, 30.0]
+    wcs.wcs.crpix = list(crpix)
+    scale = 1.0 / 3600
+    angle = np.deg2rad(rotation_deg)
+    wcs.wcs.cd = scale * np.array([[-np.cos(angle), np.sin(angle)],
+                                   [np.sin(angle), np.cos(angle)]])
+    wcs.pixel_shape = (1000, 1000)
+    return wcs
+
+
+class TestSequenceCalibrationService:
+    def setup_method(self):
+        rng = np.random.default_rng(1)
+        self.first_wcs = make_wcs()
+        self.star_xy = rng.uniform(50, 950, size=(40, 2))
+        ra, dec = self.first_wcs.all_pix2world(self.star_xy[:, 0], self.star_xy[:, 1], 0)
+        self.world = list(zip(ra, dec))
+
+        self.mock_astrometry = Mock()
+        self.mock_astrometry.calibrate_image.return_value = {
+            "pixel_coords": [tuple(p) for p in self.star_xy],
+            "world_coords": self.world,
+            "wcs": self.first_wcs
+        }
+        self.service = SequenceCalibrationService(self.mock_astrometry)
+
+    def detections_for(self, wcs):
+        ra, dec = np.asarray(self.world).T
+        x, y = wcs.all_world2pix(ra, dec, 0)
+        return self.finished({"pixel_coords": [{"x": float(a), "y": float(b)} for a, b in zip(x, y)]})
+
+    @staticmethod
+    def finished(detection):
+        future = Future()
+        future.set_result(detection)
+        return future
+
+    def test_first_frame_is_solved(self):
+        """Тест полного решения для первого кадра последовательности"""
+        detections = Future()
+        result = self.service.calibrate_with_detections("frame1.png", detections)
+
+        self.mock_astrometry.calibrate_image.assert_called_once()
+        assert result["propagated"] is False
+        assert not detections.done()
+
+    def test_next_frame_is_propagated(self):
+        """Тест переноса WCS на следующий кадр без повторного решения"""
+        drifted = make_wcs(crpix=(507.0, 496.0), rotation_deg=0.2)
+
+        self.service.calibrate_image("frame1.png")
+        result = self.service.calibrate_with_detections("frame2.png", self.detections_for(drifted))
+
+        assert self.mock_astrometry.calibrate_image.call_count == 1
+        assert result["propagated"] is True
+        assert result["fit_residual_pix"] < 0.01
+        ra, dec = result["wcs"].all_pix2world([[300.0, 700.0]], 0)[0]
+        expected_ra, expected_dec = drifted.all_pix2world([[300.0, 700.0]], 0)[0]
+        assert ra == pytest.approx(expected_ra, abs=1e-6)
+        assert dec == pytest.approx(expected_dec, abs=1e-6)
+
+    def test_resolve_when_residuals_too_large(self):
+        """Тест полного решения при большой невязке подгонки"""
+        rng = np.random.default_rng(2)
+        detections = self.detections_for(self.first_wcs)
+        for obj in detections.result()["pixel_coords"]:
+            obj["x"] += rng.normal(0, 1.5)
+            obj["y"] += rng.normal(0, 1.5)
+
+        self.service.calibrate_image("frame1.png")
+        result = self.service.calibrate_with_detections("frame2.png", detections)
+
+        assert self.mock_astrometry.calibrate_image.call_count == 2
+        assert result["propagated"] is False
+
+    def test_resolve_when_too_few_matches(self):
+        """Тест полного решения, если звезды не найдены на новом кадре"""
+        detections = self.finished({"pixel_coords": [{"x": 10.0, "y": 10.0}]})
+
+        self.service.calibrate_image("frame1.png")
+        self.service.calibrate_with_detections("frame2.png", detections)
+
+        assert self.mock_astrometry.calibrate_image.call_count == 2
+
+    def test_blended_stars_do_not_share_detection(self):
+        """Тест однозначного сопоставления близких звезд с обнаружениями"""
+        blended_xy = np.vstack([self.star_xy, self.star_xy[0] + [1.5, 0.0]])
+        ra, dec = self.first_wcs.all_pix2world(blended_xy[:, 0], blended_xy[:, 1], 0)
+        self.mock_astrometry.calibrate_image.return_value = {
+            "pixel_coords": [tuple(p) for p in blended_xy],
+            "world_coords": list(zip(ra, dec)),
+            "wcs": self.first_wcs
+        }
+        drifted = make_wcs(crpix=(503.0, 498.0))
+
+        self.service.calibrate_image("frame1.png")
+        result = self.service.calibrate_with_detections("frame2.png", self.detections_for(drifted))
+
+        assert result["propagated"] is True
+        assert result["matched_count"] == len(self.star_xy)
+        assert len(set(result["corr_coords"])) == len(self.star_xy)
+
+    def test_cancel_while_waiting_for_detections(self):
+        """Тест прекращения калибровки при отмене во время ожидания обнаружения"""
+        cancelled = threading.Event()
+        self.service.calibrate_image("frame1.png")
+        threading.Timer(0.05, cancelled.set).start()
+
+        result = self.service.calibrate_with_detections("frame2.png", Future(), cancelled=cancelled)
+
+        assert result is None
+        assert self.mock_astrometry.calibrate_image.call_count == 1
@@ -0,0 +1,41 @@
+import pytest
+from src.infrastructure.service.zone_comparison_service import ZoneComparisonService
+from src.infrastructure.service.object_comparison_service import ObjectComparisonService
+
+
+class TestZoneComparisonService:
+    def setup_method(self):
+        self.service = ZoneComparisonService()
+        self.detected_objects = [{"x": 100, "y": 100}, {"x": 200, "y": 200}, {"x": 300, "y": 300}]
+        self.reference_objects = [(105, 102), (400, 400)]
+
+    def test_find_unique_objects(self):
+        """Тест поиска уникальных объектов зонным сопоставлением"""
+        unique_objects = self.service.find_unique_objects(
+            self.detected_objects, self.reference_objects, match_threshold=10
+        )
+
+        assert unique_objects == self.detected_objects[1:]
+
+    def test_empty_inputs(self):
+        """Тест обработки пустых списков"""
+        assert self.service.find_unique_objects([], self.reference_objects) == []
+        assert self.service.find_unique_objects(self.detected_objects, []) == self.detected_objects
+
+    def test_matches_reference_service(self):
+        """Тест совпадения результата с сервисом на KD-дереве"""
+        detected = [{"x": float(x), "y": float(y)} for x in range(0, 500, 7) for y in range(0, 500, 11)]
+        reference = [(x + 2.5, y - 1.5) for x in range(0, 500, 13) for y in range(0, 500, 17)]
+
+        expected = ObjectComparisonService().find_unique_objects(detected, reference, match_threshold=4)
+
+        assert self.service.find_unique_objects(detected, reference, match_threshold=4) == expected
+
+    def test_per_object_threshold(self):
+        """Тест индивидуального порога сопоставления для каждого объекта"""
+        reference = [(105, 102), (206, 200)]
+
+        unique_objects = self.service.find_unique_objects(self.detected_objects, reference,
+                                                          match_threshold=[4.0, 8.0, 8.0])
+
+        assert unique_objects == [self.detected_objects[0], self.detected_objects[2]]
@@ -0,0 +1,57 @@
+import pytest
+import numpy as np
+from src.infrastructure.utils.assignment_matching import assign_one_to_one, assign_sky, candidate_pairs
+
+
+class TestAssignmentMatching:
+    def test_candidate_pairs_within_radius(self):
+        """Тест построения разреженного графа кандидатов"""
+        rows, cols, distances = candidate_pairs([(0.0, 0.0), (10.0, 0.0)], [(1.0, 0.0), (0.0, 2.0), (30.0, 0.0)], 2.0)
+
+        assert sorted(zip(rows.tolist(), cols.tolist())) == [(0, 0), (0, 1)]
+        assert sorted(distances.tolist()) == [1.0, 2.0]
+
+    def test_optimal_beats_greedy(self):
+        """Тест оптимального назначения при конфликте ближайших соседей"""
+        points = [(0.0, 0.0), (1.0, 0.0)]
+        reference = [(0.9, 0.0), (2.5, 0.0)]
+
+        greedy, _ = assign_one_to_one(points, reference, 2.0, method="greedy")
+        optimal, distances = assign_one_to_one(points, reference, 2.0, method="optimal")
+
+        assert list(greedy) == [-1, 0]
+        assert list(optimal) == [0, 1]
+        assert distances == pytest.approx([0.9, 1.5])
+
+    def test_each_reference_used_once(self):
+        """Тест однократного использования опорных звезд"""
+        rng = np.random.default_rng(1)
+        reference = rng.uniform(0, 1000, (20000, 2))
+        points = np.concatenate([reference + rng.normal(0, 1.0, reference.shape), reference[:500] + 0.5])
+
+        for method in ("optimal", "greedy"):
+            indices, distances = assign_one_to_one(points, reference, 3.0, method=method)
+            matched = indices[indices >= 0]
+            assert len(np.unique(matched)) == len(matched)
+            assert np.all(distances[indices >= 0] <= 3.0)
+            assert (indices < 0).sum() >= 500
+
+    def test_large_component_falls_back_to_greedy(self):
+        """Тест жадного решения для больших компонент"""
+        points = np.column_stack([np.arange(50) * 0.5, np.zeros(50)])
+
+        indices, _ = assign_one_to_one(points, points + 0.1, 1.0, max_component_size=10)
+
+        assert list(indices) == list(range(50))
+
+    def test_sky_assignment(self):
+        """Тест назначения на сфере через разрыв по прямому восхождению"""
+        indices, separations = assign_sky([359.9999, 0.0001], [0.0, 0.0], [0.0], [0.0], 1.0)
+
+        assert sorted(indices.tolist()) == [-1, 0]
+        assert separations[indices >= 0][0] == pytest.approx(0.36, abs=0.01)
+
+    def test_unknown_method(self):
+        """Тест ошибки при неизвестном методе"""
+        with pytest.raises(ValueError):
+            assign_one_to_one([(0.0, 0.0)], [(0.0, 0.0)], 1.0, method="hungarian")
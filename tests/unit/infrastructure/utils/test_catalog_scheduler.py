@@ -0,0 +1,43 @@
+import pytest
+from src.infrastructure.utils.catalog_scheduler import AdaptiveCatalogScheduler
+
+
+class TestAdaptiveCatalogScheduler:
+    def setup_method(self):
+        """Настройка среды для каждого теста"""
+        self.scheduler = AdaptiveCatalogScheduler()
+        self.names = ["gaia", "usno", "ps1"]
+
+    def test_default_order_is_preserved(self):
+        """Тест сохранения исходного порядка без накопленной статистики"""
+        assert self.scheduler.order(self.names, 150.0, 30.0) == self.names
+
+    def test_orders_by_latency_and_hit_rate(self):
+        """Тест упорядочивания каталогов по задержке и вероятности совпадения"""
+        for _ in range(20):
+            self.scheduler.record("gaia", 150.0, 30.0, hit=False, latency=2.0)
+            self.scheduler.record("usno", 150.0, 30.0, hit=True, latency=1.0)
+            self.scheduler.record("ps1", 150.0, 30.0, hit=True, latency=0.2)
+
+        order = self.scheduler.order(self.names, 150.0, 30.0)
+
+        assert order == ["ps1", "usno", "gaia"]
+        assert self.scheduler.expected_time_to_hit(order, 150.0, 30.0) < \
+            self.scheduler.expected_time_to_hit(self.names, 150.0, 30.0)
+
+    def test_statistics_are_regional(self):
+        """Тест раздельной статистики по областям неба и звездным величинам"""
+        for _ in range(20):
+            self.scheduler.record("ps1", 150.0, 30.0, hit=True, latency=0.5, mag=18.2)
+            self.scheduler.record("ps1", 150.0, -60.0, hit=False, latency=0.5, mag=18.2)
+            self.scheduler.record("gaia", 150.0, -60.0, hit=True, latency=0.5, mag=18.2)
+            self.scheduler.record("gaia", 150.0, 30.0, hit=False, latency=0.5, mag=18.2)
+
+        assert self.scheduler.order(["gaia", "ps1"], 150.0, 30.0, mag=18.5) == ["ps1", "gaia"]
+        assert self.scheduler.order(["ps1", "gaia"], 150.0, -60.0, mag=18.5) == ["gaia", "ps1"]
+
+        stats = self.scheduler.statistics()
+        assert stats["ps1"]["queries"] == 40
+        assert stats["ps1"]["hit_rate"] == pytest.approx(0.5)
+        assert stats["ps1"]["latency"] == pytest.approx(0.5)
+        assert len(stats["ps1"]["regions"]) == 2
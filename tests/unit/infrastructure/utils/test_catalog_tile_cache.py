@@ -0,0 +1,98 @@
+import os
+import pytest
+import numpy as np
+from src.infrastructure.utils.catalog_tile_cache import CatalogTileCache
+
+
+def fill_tile(cache, catalog, tile, count=200, seed=0):
+    rng = np.random.default_rng(seed)
+    ra, dec, radius = cache.tile_cone(tile)
+    src_ra = ra + rng.uniform(-radius, radius, count * 4)
+    src_dec = dec + rng.uniform(-radius, radius, count * 4)
+    inside = cache.tile_of(src_ra, src_dec) == tile
+    src_ra, src_dec = src_ra[inside][:count], src_dec[inside][:count]
+    cache.put_tile(catalog, tile, src_ra, src_dec, np.full(len(src_ra), 15.0))
+    return src_ra, src_dec
+
+
+class TestCatalogTileCache:
+    def test_cone_requires_all_tiles(self, tmp_path):
+        """Тест ответа на конусный запрос только при полном покрытии плитками"""
+        cache = CatalogTileCache(str(tmp_path), nside=64)
+        tiles = cache.tiles_for_cone(150.0, 30.0, 0.5)
+        assert len(tiles) > 1
+
+        for tile in tiles[:-1]:
+            fill_tile(cache, "I/355/gaiadr3", tile)
+        assert cache.query_cone("I/355/gaiadr3", 150.0, 30.0, 0.5) is None
+
+        fill_tile(cache, "I/355/gaiadr3", tiles[-1])
+        result = cache.query_cone("I/355/gaiadr3", 150.0, 30.0, 0.5)
+        assert result is not None
+        assert len(result["ra"]) > 0
+        assert set(result) == {"ra", "dec", "mag"}
+
+    def test_tiles_persist_between_instances(self, tmp_path):
+        """Тест сохранения плиток на диске между экземплярами кэша"""
+        cache = CatalogTileCache(str(tmp_path), nside=64)
+        tile = int(cache.tiles_for_cone(150.0, 30.0, 0.01)[0])
+        ra, dec = fill_tile(cache, "I/284/out", tile)
+
+        reopened = CatalogTileCache(str(tmp_path), nside=64)
+        data = reopened.get_tile("I/284/out", tile)
+        order = np.argsort(dec)
+        assert np.array_equal(data["ra"], ra[order])
+        assert np.array_equal(data["dec"], dec[order])
+        assert reopened.get_tile("II/349/ps1", tile) is None
+
+    def test_empty_tile_is_cached(self, tmp_path):
+        """Тест кэширования пустых плиток"""
+        cache = CatalogTileCache(str(tmp_path), nside=64)
+        tile = int(cache.tiles_for_cone(150.0, 30.0, 0.001)[0])
+        cache.put_tile("I/355/gaiadr3", tile, [], [], [])
+
+        result = cache.query_cone("I/355/gaiadr3", 150.0, 30.0, 0.001)
+        assert result is not None
+        assert len(result["ra"]) == 0
+
+    def test_replaced_tile_keeps_size_estimate(self, tmp_path):
+        """Тест учета объема при перезаписи существующей плитки"""
+        cache = CatalogTileCache(str(tmp_path), nside=64)
+        tile = int(cache.tiles_for_cone(150.0, 30.0, 0.01)[0])
+        for _ in range(3):
+            fill_tile(cache, "I/355/gaiadr3", tile)
+
+        assert cache._bytes_estimate == cache.size_bytes()
+        assert cache.stats["stores"] == 3
+
+    def test_lru_eviction_by_bytes(self, tmp_path):
+        """Тест вытеснения давно не использованных плиток по объему"""
+        cache = CatalogTileCache(str(tmp_path), nside=64, memory_tiles=0, touch_interval=0)
+        tiles = [int(t) for t in cache.tiles_for_cone(150.0, 30.0, 1.0)[:4]]
+        fill_tile(cache, "I/355/gaiadr3", tiles[0])
+        tile_size = cache.size_bytes()
+        cache.max_bytes = int(tile_size * 3.5)
+
+        for tile in tiles[1:3]:
+            fill_tile(cache, "I/355/gaiadr3", tile)
+        for path, _, _ in cache._scan()[0]:
+            os.utime(path, (1000, 1000))
+        cache.get_tile("I/355/gaiadr3", tiles[0])
+
+        fill_tile(cache, "I/355/gaiadr3", tiles[3])
+
+        assert cache.size_bytes() <= cache.max_bytes
+        assert cache.get_tile("I/355/gaiadr3", tiles[0]) is not None
+        assert cache.get_tile("I/355/gaiadr3", tiles[3]) is not None
+        assert cache.stats["evictions"] == 1
+
+    def test_stale_lock_is_broken(self, tmp_path):
+        """Тест снятия зависшей блокировки другого процесса"""
+        cache = CatalogTileCache(str(tmp_path), nside=64, stale_lock_age=1.0)
+        with open(cache._lock_path, "w") as f:
+            f.write("12345")
+        os.utime(cache._lock_path, (1000, 1000))
+
+        with cache._file_lock():
+            assert os.path.exists(cache._lock_path)
+        assert not os.path.exists(cache._lock_path)
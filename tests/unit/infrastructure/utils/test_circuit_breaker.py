@@ -0,0 +1,47 @@
+import pytest
+from unittest.mock import patch
+from src.infrastructure.utils.circuit_breaker import CircuitBreaker
+
+
+class TestCircuitBreaker:
+    def setup_method(self):
+        """Настройка среды для каждого теста"""
+        self.breaker = CircuitBreaker(failure_threshold=2, cooldown=10.0)
+
+    def test_opens_after_threshold(self):
+        """Тест размыкания после заданного числа ошибок подряд"""
+        self.breaker.record_failure()
+        assert self.breaker.allow()
+
+        self.breaker.record_failure()
+
+        assert self.breaker.state == CircuitBreaker.OPEN
+        assert not self.breaker.allow()
+
+    def test_success_resets_failures(self):
+        """Тест сброса счетчика ошибок после успешного запроса"""
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+
+        assert self.breaker.state == CircuitBreaker.CLOSED
+
+    @patch("src.infrastructure.utils.circuit_breaker.time.monotonic")
+    def test_half_open_allows_single_probe(self, mock_monotonic):
+        """Тест пропуска одного пробного запроса после периода ожидания"""
+        mock_monotonic.return_value = 100.0
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+        mock_monotonic.return_value = 111.0
+        assert self.breaker.state == CircuitBreaker.HALF_OPEN
+        assert self.breaker.allow()
+        assert not self.breaker.allow()
+
+        self.breaker.record_failure()
+        assert self.breaker.state == CircuitBreaker.OPEN
+
+        mock_monotonic.return_value = 122.0
+        assert self.breaker.allow()
+        self.breaker.record_success()
+        assert self.breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,170 @@
+import pytest
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from src.infrastructure.utils.field_reference_index import FieldReferenceIndex
+
+
+def count_unique(index_dir, key, ra, dec):
+    return int(FieldReferenceIndex(index_dir).unique_mask(key, ra, dec, 2.0).sum())
+
+
+def insert_stars(index_dir, key, ra, dec):
+    return FieldReferenceIndex(index_dir).insert(key, ra, dec)
+
+
+class TestFieldReferenceIndex:
+    def setup_method(self):
+        """Настройка среды для каждого теста"""
+        rng = np.random.default_rng(5)
+        self.ra = 150.0 + rng.uniform(-0.2, 0.2, 500)
+        self.dec = 30.0 + rng.uniform(-0.2, 0.2, 500)
+
+    def test_field_key_groups_nearby_frames(self, tmp_path):
+        """Тест общего ключа поля для близких кадров"""
+        index = FieldReferenceIndex(str(tmp_path))
+
+        assert index.field_key(150.0, 30.0) == index.field_key(150.01, 30.01)
+        assert index.field_key(150.0, 30.0) != index.field_key(200.0, -30.0)
+
+    def test_build_and_match(self, tmp_path):
+        """Тест поиска опорных звезд в построенном индексе"""
+        index = FieldReferenceIndex(str(tmp_path))
+        key = index.field_key(150.0, 30.0)
+        index.build(key, self.ra, self.dec)
+
+        indices, separations = index.match(key, self.ra[:10] + 0.5 / 3600, self.dec[:10], 2.0)
+        unique = index.unique_mask(key, [150.5, 150.0], [30.5, 30.0], 2.0)
+
+        assert np.all(indices >= 0)
+        assert np.all(separations < 1.0)
+        assert unique.tolist() == [True, True]
+        assert index.size(key) == 500
+
+    def test_one_to_one_assignment(self, tmp_path):
+        """Тест сопоставления одной опорной звезды только одному объекту"""
+        index = FieldReferenceIndex(str(tmp_path))
+        key = index.field_key(150.0, 30.0)
+        index.build(key, [150.0], [30.0])
+        index.insert(key, [150.1], [30.1])
+        ra = [150.0, 150.0, 150.1, 150.1]
+        dec = [30.0 + 0.5 / 3600, 30.0 + 1.5 / 3600, 30.1 + 1.5 / 3600, 30.1 + 0.5 / 3600]
+
+        nearest = index.unique_mask(key, ra, dec, 2.0)
+        indices, _ = index.assign(key, ra, dec, 2.0)
+        greedy = index.unique_mask(key, ra, dec, 2.0, assignment="greedy")
+
+        assert nearest.tolist() == [False, False, False, False]
+        assert indices.tolist() == [0, -1, -1, 1]
+        assert greedy.tolist() == [False, True, True, False]
+
+    def test_per_object_radius(self, tmp_path):
+        """Тест индивидуального радиуса сопоставления для каждого объекта"""
+        index = FieldReferenceIndex(str(tmp_path))
+        key = index.field_key(150.0, 30.0)
+        index.build(key, self.ra, self.dec)
+
+        unique = index.unique_mask(key, self.ra[:2], self.dec[:2] + 3.0 / 3600, [2.0, 4.0])
+
+        assert unique.tolist() == [True, False]
+
+    def test_index_persists_between_instances(self, tmp_path):
+        """Тест повторного использования индекса без перестроения"""
+        index = FieldReferenceIndex(str(tmp_path))
+        key = index.field_key(150.0, 30.0)
+        index.build(key, self.ra, self.dec)
+
+        reopened = FieldReferenceIndex(str(tmp_path))
+
+        assert reopened.has_field(key)
+        assert not reopened.unique_mask(key, self.ra[:5], self.dec[:5], 2.0).any()
+        assert reopened.stats["builds"] == 0
+
+    def test_incremental_insert_skips_duplicates(self, tmp_path):
+        """Тест добавления новых звезд без дубликатов"""
+        index = FieldReferenceIndex(str(tmp_path))
+        key = index.field_key(150.0, 30.0)
+        index.build(key, self.ra[:400], self.dec[:400])
+
+        inserted = index.insert(key, self.ra[300:], self.dec[300:])
+
+        assert inserted == 100
+        assert index.size(key) == 500
+        assert not index.unique_mask(key, self.ra, self.dec, 2.0).any()
+        assert FieldReferenceIndex(str(tmp_path)).size(key) == 500
+
+    def test_compaction_merges_delta(self, tmp_path):
+        """Тест слияния дельта-сегмента с основным индексом"""
+        index = FieldReferenceIndex(str(tmp_path), compact_threshold=50)
+        key = index.field_key(150.0, 30.0)
+        index.build(key, self.ra[:400], self.dec[:400])
+
+        index.insert(key, self.ra[400:], self.dec[400:])
+
+        assert index.stats["compactions"] == 1
+        assert len(index._open(key)["delta"]) == 0
+        assert index.size(key) == 500
+        assert not index.unique_mask(key, self.ra, self.dec, 2.0).any()
+        assert sorted(path.name for path in (tmp_path / key).iterdir() if path.name.startswith("v")) == ["v2"]
+
+    def test_duplicate_chain_keeps_one_star(self, tmp_path):
+        """Тест сохранения одной звезды из цепочки дубликатов"""
+        index = FieldReferenceIndex(str(tmp_path))
+        key = index.field_key(150.0, 30.0)
+        step = 0.8 / 3600
+        index.build(key, [150.0, 150.0, 150.0, 150.1], [30.0, 30.0 + step, 30.0 + 2 * step, 30.0])
+
+        assert index.size(key) == 2
+
+    def test_first_insert_counts_unique_stars(self, tmp_path):
+        """Тест подсчета только уникальных звезд при создании поля"""
+        index = FieldReferenceIndex(str(tmp_path))
+        key = index.field_key(150.0, 30.0)
+
+        inserted = index.insert(key, [150.0, 150.0, 150.1], [30.0, 30.0 + 0.5 / 3600, 30.0])
+
+        assert inserted == 2
+        assert index.size(key) == 2
+
+    def test_busy_lock_skips_insert(self, tmp_path):
+        """Тест пропуска добавления, пока поле заблокировано другим процессом"""
+        index = FieldReferenceIndex(str(tmp_path), lock_timeout=0.05)
+        key = index.field_key(150.0, 30.0)
+        (tmp_path / key).mkdir()
+        (tmp_path / key / ".lock").write_text("0")
+
+        assert index.insert(key, self.ra[:10], self.dec[:10]) == 0
+        assert not index.has_field(key)
+
+    def test_missing_field_keeps_everything(self, tmp_path):
+        """Тест отсутствия поля в индексе"""
+        index = FieldReferenceIndex(str(tmp_path))
+
+        assert index.unique_mask("n16_0", self.ra[:3], self.dec[:3], 2.0).tolist() == [True, True, True]
+        assert index.insert("n16_0", [], []) == 0
+        assert not index.has_field("n16_0")
+
+    def test_shared_between_processes(self, tmp_path):
+        """Тест чтения индекса из рабочих процессов"""
+        index = FieldReferenceIndex(str(tmp_path))
+        key = index.field_key(150.0, 30.0)
+        index.build(key, self.ra[:250], self.dec[:250])
+        index.insert(key, self.ra[250:], self.dec[250:])
+
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            counts = list(pool.map(count_unique, [str(tmp_path)] * 2, [key] * 2,
+                                   [self.ra, self.ra + 0.1], [self.dec, self.dec]))
+
+        assert counts[0] == 0
+        assert counts[1] > 0
+
+    def test_concurrent_inserts_from_processes(self, tmp_path):
+        """Тест одновременного добавления звезд из нескольких процессов"""
+        key = FieldReferenceIndex(str(tmp_path)).field_key(150.0, 30.0)
+        parts = np.array_split(np.arange(len(self.ra)), 4)
+
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            inserted = list(pool.map(insert_stars, [str(tmp_path)] * 4, [key] * 4,
+                                     [self.ra[part] for part in parts], [self.dec[part] for part in parts]))
+
+        assert sum(inserted) == len(self.ra)
+        assert FieldReferenceIndex(str(tmp_path)).size(key) == len(self.ra)
@@ -0,0 +1,81 @@
+import pytest
+import numpy as np
+from astropy.table import Table
+from src.infrastructure.utils.local_catalog_store import LocalCatalogStore
+from src.infrastructure.utils.local_catalog_importer import LocalCatalogImporter
+from src.infrastructure.utils.sky_geometry import angular_separation_deg
+
+
+class TestLocalCatalogStore:
+    def setup_method(self):
+        """Настройка среды для каждого теста"""
+        rng = np.random.default_rng(4)
+        self.ra = np.concatenate([rng.uniform(0, 360, 20000), rng.uniform(359, 360, 500), rng.uniform(0, 1, 500)])
+        self.dec = np.concatenate([np.degrees(np.arcsin(rng.uniform(-1, 1, 20000))), rng.uniform(-1, 1, 1000)])
+        self.mag = rng.uniform(10, 20, len(self.ra))
+
+    def test_cone_matches_brute_force(self, tmp_path):
+        """Тест совпадения конусного поиска с полным перебором"""
+        store = LocalCatalogStore.build(str(tmp_path), "gaia", self.ra, self.dec, self.mag, zone_height_deg=0.5)
+
+        for ra, dec, radius in [(0.05, 0.0, 0.5), (359.9, 0.5, 0.3), (120.0, 89.7, 1.0), (45.0, -30.0, 2.0)]:
+            found = set(store.cone(ra, dec, radius))
+            expected = angular_separation_deg(ra, dec, store.columns["ra"], store.columns["dec"]) <= radius
+            assert found == set(np.flatnonzero(expected))
+
+    def test_match_nearest_batch(self, tmp_path):
+        """Тест пакетного сопоставления с ближайшими источниками"""
+        store = LocalCatalogStore.build(str(tmp_path), "gaia", self.ra, self.dec, self.mag)
+        ra = np.asarray(store.columns["ra"][:100])
+        dec = np.asarray(store.columns["dec"][:100]) + 1.0 / 3600
+
+        indices, separations = store.match_nearest(np.append(ra, 10.0), np.append(dec, -89.99), radius_arcsec=3)
+
+        assert np.array_equal(indices[:100], np.arange(100))
+        assert np.allclose(separations[:100], 1.0, atol=1e-3)
+        assert indices[100] == -1
+
+    def test_proper_motion_propagation(self, tmp_path):
+        """Тест учета собственного движения при смене эпохи"""
+        store = LocalCatalogStore.build(str(tmp_path), "gaia", [150.0], [30.0], [12.0],
+                                        pmra=[1000.0], pmdec=[-2000.0], epoch=2016.0)
+
+        assert len(store.cone(150.0, 30.0, 1.0 / 3600, epoch=2026.0)) == 0
+        ra = 150.0 + 10.0 / 3600 / np.cos(np.deg2rad(30.0))
+        dec = 30.0 - 20.0 / 3600
+        assert len(store.cone(ra, dec, 1.0 / 3600, epoch=2026.0)) == 1
+
+    def test_store_is_memory_mapped(self, tmp_path):
+        """Тест открытия хранилища через отображение в память"""
+        LocalCatalogStore.build(str(tmp_path), "gaia", self.ra, self.dec, self.mag)
+        store = LocalCatalogStore(str(tmp_path))
+
+        assert isinstance(store.key, np.memmap)
+        assert len(store) == len(self.ra)
+
+
+class TestLocalCatalogImporter:
+    def test_import_csv_and_fits(self, tmp_path):
+        """Тест импорта каталогов из CSV и FITS"""
+        part1 = Table({"ra": [10.0, 20.0], "dec": [5.0, -5.0], "phot_g_mean_mag": [12.0, 13.0],
+                       "pmra": [1.0, 2.0], "pmdec": [0.0, 0.0]})
+        part2 = Table({"ra": [30.0], "dec": [np.nan], "phot_g_mean_mag": [14.0],
+                       "pmra": [0.0], "pmdec": [0.0]})
+        part1.write(str(tmp_path / "part1.csv"), format="ascii.csv")
+        part2.write(str(tmp_path / "part2.fits"), format="fits")
+
+        store = LocalCatalogImporter().import_files(
+            [str(tmp_path / "part1.csv"), str(tmp_path / "part2.fits")], str(tmp_path / "store"), "gaia"
+        )
+
+        assert len(store) == 2
+        assert store.epoch == 2016.0
+        assert store.mag_name == "Gmag"
+        assert sorted(store.columns["mag"]) == [12.0, 13.0]
+
+    def test_missing_column(self, tmp_path):
+        """Тест ошибки при отсутствии обязательной колонки"""
+        Table({"RA": [10.0], "DEC": [5.0]}).write(str(tmp_path / "cat.csv"), format="ascii.csv")
+
+        with pytest.raises(ValueError):
+            LocalCatalogImporter().import_files(str(tmp_path / "cat.csv"), str(tmp_path / "store"), "gaia")
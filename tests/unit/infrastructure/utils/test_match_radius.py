@@ -0,0 +1,49 @@
+import pytest
+import numpy as np
+from astropy.wcs import WCS
+from src.infrastructure.utils.match_radius import (adaptive_match_radius, nearest_residuals, pixel_scale_arcsec,
+                                                    residual_sigma)
+
+
+class TestMatchRadius:
+    def test_residual_sigma_of_rayleigh(self):
+        """Тест оценки сигмы по радиальным невязкам"""
+        rng = np.random.default_rng(0)
+        residuals = np.hypot(*rng.normal(0, 0.7, (2, 20000)))
+
+        assert residual_sigma(residuals) == pytest.approx(0.7, rel=0.03)
+        assert residual_sigma([]) is None
+
+    def test_radius_follows_residuals(self):
+        """Тест масштабирования радиуса по качеству решения"""
+        rng = np.random.default_rng(1)
+        tight = adaptive_match_radius(np.hypot(*rng.normal(0, 0.5, (2, 500))))
+        loose = adaptive_match_radius(np.hypot(*rng.normal(0, 2.0, (2, 500))))
+
+        assert tight == pytest.approx(1.5, rel=0.15)
+        assert loose == pytest.approx(6.0, rel=0.15)
+        assert adaptive_match_radius(np.full(100, 50.0)) == 10.0
+        assert adaptive_match_radius([1.0, 2.0]) is None
+
+    def test_extended_sources_get_wider_radius(self):
+        """Тест расширения радиуса для протяженных источников"""
+        residuals = np.full(50, 1.0 * np.sqrt(2 * np.log(2)))
+
+        radius = adaptive_match_radius(residuals, a=[1.0, 1.0, 1.0, 3.0], b=[1.0, 1.0, 1.0, 3.0])
+
+        assert radius[:3] == pytest.approx([3.0, 3.0, 3.0])
+        assert radius[3] == pytest.approx(3.0 * np.sqrt(5.0))
+
+    def test_nearest_residuals(self):
+        """Тест невязок по ближайшим обнаружениям"""
+        residuals = nearest_residuals([(0.0, 0.0), (10.0, 0.0)], [(0.5, 0.0), (10.0, 1.0), (50.0, 50.0)], 5.0)
+
+        assert sorted(residuals.tolist()) == [0.5, 1.0]
+
+    def test_pixel_scale(self):
+        """Тест определения масштаба по WCS"""
+        wcs = WCS(naxis=2)
+        wcs.wcs.ctype = ["RA---TAN", "DEC--TAN"]
+        wcs.wcs.cdelt = [-2.0 / 3600, 2.0 / 3600]
+
+        assert pixel_scale_arcsec(wcs) == pytest.approx(2.0)
@@ -0,0 +1,108 @@
+import os
+import pytest
+import numpy as np
+import astropy.units as u
+from astropy.time import Time
+from astropy.coordinates import get_sun, get_body_barycentric
+from src.infrastructure.utils.sky_geometry import angular_separation_deg
+from src.infrastructure.utils.minor_planet_ephemeris import MinorPlanetEphemeris, unpack_epoch, solve_kepler
+
+EPOCH = Time("2024-10-17", scale="tt")
+
+
+def orbit_line(designation, h, g, epoch, mean_anomaly, peri, node, incl, e, a, name=""):
+    n = 0.9856076686 / a ** 1.5
+    line = (f"{designation:<7s} {h:5.2f} {g:5.2f} {epoch:5s} {mean_anomaly:9.5f}  {peri:9.5f}  {node:9.5f}  "
+            f"{incl:9.5f}  {e:9.7f} {n:11.8f} {a:11.7f}")
+    return line.ljust(166) + name
+
+
+def write_orbits(path, count=2000, seed=0):
+    earth = (get_body_barycentric("earth", EPOCH) - get_body_barycentric("sun", EPOCH)).xyz.to_value(u.au)
+    obliquity = np.radians(84381.448 / 3600)
+    longitude = np.degrees(np.arctan2(earth[1] * np.cos(obliquity) + earth[2] * np.sin(obliquity), earth[0]))
+
+    rng = np.random.default_rng(seed)
+    lines = ["MINOR PLANET ORBITS", "-" * 160,
+             orbit_line("00001", 10.0, 0.15, "K24AH", longitude % 360, 0.0, 0.0, 0.0, 0.0, 2.5, "(1) Opposition")]
+    for i in range(count):
+        lines.append(orbit_line(f"K{i:05d}", rng.uniform(12, 19), 0.15, "K24AH", rng.uniform(0, 360),
+                                rng.uniform(0, 360), rng.uniform(0, 360), rng.uniform(0, 30), rng.uniform(0, 0.3),
+                                rng.uniform(1.8, 4.0)))
+    lines.append("")
+    with open(path, "w") as f:
+        f.write("\n".join(lines))
+    return path
+
+
+class TestMinorPlanetEphemeris:
+    def setup_method(self):
+        """Настройка среды для каждого теста"""
+        self.epoch = EPOCH.utc.jyear
+
+    def test_unpack_epoch(self):
+        """Тест распаковки упакованной даты эпохи элементов"""
+        assert unpack_epoch("K24AH") == (2024, 10, 17)
+        assert unpack_epoch("J9611") == (1996, 1, 1)
+
+    def test_solve_kepler(self):
+        """Тест решения уравнения Кеплера"""
+        mean_anomaly = np.linspace(0, 2 * np.pi, 50, endpoint=False)
+        eccentricity = np.linspace(0, 0.95, 50)
+
+        anomaly = solve_kepler(mean_anomaly, eccentricity)
+
+        assert np.allclose(anomaly - eccentricity * np.sin(anomaly), mean_anomaly, atol=1e-10)
+
+    def test_opposition_position(self, tmp_path):
+        """Тест положения астероида в противостоянии напротив Солнца"""
+        ephemeris = MinorPlanetEphemeris(write_orbits(str(tmp_path / "MPCORB.DAT"), count=0))
+
+        ra, dec, mag = ephemeris.positions(self.epoch, [0])
+        sun = get_sun(EPOCH)
+
+        assert angular_separation_deg((sun.ra.deg + 180) % 360, -sun.dec.deg, ra[0], dec[0]) * 3600 < 60
+        assert 12 < mag[0] < 14
+
+    def test_cone_matches_direct_propagation(self, tmp_path):
+        """Тест совпадения индексированного поиска с прямым расчетом всех орбит"""
+        ephemeris = MinorPlanetEphemeris(write_orbits(str(tmp_path / "MPCORB.DAT")))
+        epoch = self.epoch + 0.37 / 8766
+
+        ra, dec, _ = ephemeris.positions(epoch)
+        center = (ra[5], dec[5])
+        expected = np.flatnonzero(angular_separation_deg(center[0], center[1], ra, dec) <= 10.0)
+
+        found = ephemeris.query_cone(center[0], center[1], 10.0, epoch)
+
+        assert set(found["index"]) == set(expected)
+        assert np.max(angular_separation_deg(found["ra"], found["dec"], ra[found["index"]],
+                                             dec[found["index"]])) * 3600 < 0.5
+
+    def test_epoch_bucket_is_shared(self, tmp_path):
+        """Тест повторного использования эфемерид в пределах одного интервала"""
+        ephemeris = MinorPlanetEphemeris(write_orbits(str(tmp_path / "MPCORB.DAT")), bucket_hours=1.0)
+        start = ephemeris.bucket_of(self.epoch)
+        first = (start + 0.2) / 24
+        second = (start + 0.7) / 24
+        epochs = [Time(jd, format="jd", scale="tt").utc.jyear for jd in (first, second)]
+
+        for epoch in epochs:
+            ephemeris.query_cone(30.0, 10.0, 2.0, epoch)
+
+        assert ephemeris.stats["edges_computed"] == 2
+        assert ephemeris.stats["bucket_hits"] == 1
+
+    def test_cross_match_and_array_cache(self, tmp_path):
+        """Тест пакетного сопоставления и кэширования разобранных элементов"""
+        path = write_orbits(str(tmp_path / "MPCORB.DAT"))
+        ephemeris = MinorPlanetEphemeris(path)
+        ra, dec, _ = ephemeris.positions(self.epoch, [0, 1])
+
+        match = ephemeris.cross_match([ra[0], ra[1], ra[1] + 0.5], [dec[0], dec[1], dec[1]], 5.0, self.epoch)
+
+        assert list(match["matched"]) == [True, True, False]
+        assert os.path.exists(path + ".npz")
+        cached = MinorPlanetEphemeris(path)
+        assert list(cached.designations) == list(ephemeris.designations)
+        assert cached.designations[0] == "(1) Opposition"
@@ -0,0 +1,36 @@
+import pytest
+import numpy as np
+from src.infrastructure.utils.photometry import estimate_zeropoint, estimate_limiting_magnitude
+
+
+class TestPhotometry:
+    def setup_method(self):
+        """Настройка среды для каждого теста"""
+        rng = np.random.default_rng(2)
+        self.mags = rng.uniform(10, 15, 40)
+        self.fluxes = 10 ** (-0.4 * (self.mags - 24.0)) * (1 + rng.normal(0, 0.02, 40))
+
+    def test_zeropoint_with_outliers(self):
+        """Тест оценки нуль-пункта с отбрасыванием выбросов"""
+        mags = self.mags.copy()
+        mags[:4] += 3.0
+
+        zeropoint, scatter, used = estimate_zeropoint(self.fluxes, mags)
+
+        assert zeropoint == pytest.approx(24.0, abs=0.02)
+        assert scatter < 0.05
+        assert used == 36
+
+    def test_limiting_magnitude(self):
+        """Тест оценки предельной звездной величины кадра"""
+        detections = np.append(self.fluxes, 10 ** (-0.4 * (18.0 - 24.0)))
+
+        depth = estimate_limiting_magnitude(self.fluxes, self.mags, detections, margin=1.0)
+
+        assert depth["faintest_detection_mag"] == pytest.approx(18.0, abs=0.05)
+        assert depth["limiting_mag"] == pytest.approx(19.0, abs=0.1)
+
+    def test_not_enough_stars(self):
+        """Тест отказа от оценки при малом числе опорных звезд"""
+        assert estimate_limiting_magnitude(self.fluxes[:3], self.mags[:3], self.fluxes) is None
+        assert estimate_limiting_magnitude(self.fluxes, [np.nan] * 40, self.fluxes) is None
@@ -0,0 +1,51 @@
+import pytest
+import numpy as np
+from src.infrastructure.utils.pre_alignment import (apply_alignment, estimate_alignment, fit_rigid,
+                                                     offset_histogram_peak)
+
+
+def rotate(points, angle_deg, center):
+    angle = np.radians(angle_deg)
+    rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    return (points - center) @ rotation.T + center
+
+
+class TestPreAlignment:
+    def setup_method(self):
+        """Настройка среды для каждого теста"""
+        rng = np.random.default_rng(2)
+        self.reference = rng.uniform(0, 2000, (300, 2))
+        self.detected = np.concatenate([self.reference + rng.normal(0, 0.3, self.reference.shape),
+                                        rng.uniform(0, 2000, (100, 2))])
+
+    def test_offset_histogram_peak(self):
+        """Тест поиска сдвига по гистограмме разностей"""
+        offset, votes = offset_histogram_peak(self.detected + [4.0, -3.0], self.reference)
+
+        assert offset == pytest.approx([-4.0, 3.0], abs=0.2)
+        assert votes > 50
+
+    def test_fit_rigid(self):
+        """Тест оценки поворота и сдвига по парам"""
+        target = rotate(self.reference, 0.5, np.array([1000.0, 1000.0])) + [2.0, 1.0]
+
+        transform = fit_rigid(self.reference, target)
+
+        assert np.degrees(transform["angle"]) == pytest.approx(0.5, abs=1e-6)
+        assert apply_alignment(self.reference, transform) == pytest.approx(target)
+
+    def test_estimate_offset_and_rotation(self):
+        """Тест восстановления систематического сдвига и поворота"""
+        shifted = rotate(self.detected, 0.3, np.array([1000.0, 1000.0])) + [6.0, -5.0]
+
+        transform = estimate_alignment(shifted, self.reference)
+        aligned = apply_alignment(shifted, transform)
+
+        assert np.degrees(transform["angle"]) == pytest.approx(-0.3, abs=0.02)
+        assert transform["pairs"] >= 290
+        assert np.hypot(*(aligned[:300] - self.reference).T).max() < 2.0
+
+    def test_no_alignment_when_already_aligned(self):
+        """Тест отказа от преобразования при совпадающих списках"""
+        assert estimate_alignment(self.detected, self.reference) is None
+        assert estimate_alignment(self.detected[:3], self.reference[:3]) is None
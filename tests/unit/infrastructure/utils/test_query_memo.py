@@ -0,0 +1,77 @@
+import time
+import pytest
+import numpy as np
+from astropy.table import Table
+from src.infrastructure.utils.query_memo import QueryMemo
+
+
+class TestQueryMemo:
+    def test_quantized_key(self):
+        """Тест совпадения ключа для близких позиций"""
+        memo = QueryMemo(nside=2 ** 16)
+        key = memo.key(150.0, 30.0, 5, ("gaia", "usno"), True)
+
+        assert memo.key(150.0 + 0.1 / 3600, 30.0, 5, ("gaia", "usno"), True) == key
+        assert memo.key(150.0 + 60 / 3600, 30.0, 5, ("gaia", "usno"), True) != key
+        assert memo.key(150.0, 30.0, 10, ("gaia", "usno"), True) != key
+        assert memo.key(150.0, 30.0, 5, ("gaia",), True) != key
+        assert memo.key(150.0, 30.0, 5, ("gaia", "usno"), False) != key
+
+    def test_hits_and_misses_have_separate_ttl(self):
+        """Тест раздельного времени жизни положительных и отрицательных результатов"""
+        memo = QueryMemo(hit_ttl=60, miss_ttl=0.05)
+        hit_key = memo.key(150.0, 30.0, 5, ("gaia",), True)
+        miss_key = memo.key(151.0, 30.0, 5, ("gaia",), True)
+        memo.put(hit_key, [("gaia", {"Gmag": 12.0})])
+        memo.put(miss_key, [])
+
+        assert memo.get(miss_key) == []
+        time.sleep(0.1)
+        assert memo.get(miss_key) is None
+        assert memo.get(hit_key) == [("gaia", {"Gmag": 12.0})]
+        assert memo.stats["expired"] == 1
+
+    def test_partial_results_use_miss_ttl(self):
+        """Тест короткого времени жизни неполных результатов"""
+        memo = QueryMemo(hit_ttl=60, miss_ttl=0.05)
+        key = memo.key(150.0, 30.0, 5, ("gaia", "usno"), False)
+        memo.put(key, [("usno", {"R1mag": 12.0})], partial=True)
+
+        assert memo.get(key) == [("usno", {"R1mag": 12.0})]
+        time.sleep(0.1)
+        assert memo.get(key) is None
+
+    def test_minor_planet_hits_use_miss_ttl(self):
+        """Тест короткого времени жизни совпадений с малыми планетами"""
+        memo = QueryMemo(hit_ttl=60, miss_ttl=0.05)
+        key = memo.key(150.0, 30.0, 5, ("gaia", "mpc"), True)
+        memo.put(key, [("mpc", {"designation": "433"})])
+
+        assert memo.get(key) == [("mpc", {"designation": "433"})]
+        time.sleep(0.1)
+        assert memo.get(key) is None
+
+    def test_size_bound(self):
+        """Тест ограничения числа записей"""
+        memo = QueryMemo(max_entries=3)
+        keys = [memo.key(150.0 + i, 30.0, 5, ("gaia",), True) for i in range(4)]
+        for key in keys[:3]:
+            memo.put(key, [])
+        memo.get(keys[0])
+        memo.put(keys[3], [])
+
+        assert len(memo) == 3
+        assert memo.get(keys[1]) is None
+        assert memo.get(keys[0]) == []
+
+    def test_persistence(self, tmp_path):
+        """Тест сохранения результатов на диск"""
+        path = str(tmp_path / "memo.pkl")
+        table = Table({"_RAJ2000": [150.0], "Gmag": np.ma.masked_array([1.0], mask=[True])})
+        memo = QueryMemo(persist_path=path)
+        key = memo.key(150.0, 30.0, 5, ("gaia",), True)
+        memo.put(key, [("gaia", table[0])])
+        memo.save()
+
+        restored = QueryMemo(persist_path=path)
+        assert restored.get(key) == [("gaia", {"_RAJ2000": 150.0, "Gmag": None})]
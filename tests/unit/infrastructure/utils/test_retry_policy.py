@@ -0,0 +1,57 @@
+import time
+import pytest
+from unittest.mock import Mock, patch
+from src.infrastructure.utils.retry_policy import RetryPolicy, QueryAbandoned
+
+
+class TestRetryPolicy:
+    @patch("src.infrastructure.utils.retry_policy.time.sleep")
+    def test_retries_until_success(self, mock_sleep):
+        """Тест повторения запроса после временной ошибки"""
+        func = Mock(side_effect=[ConnectionError("reset"), 42])
+
+        result = RetryPolicy(attempts=3, base_delay=0.5).call(func, "arg")
+
+        assert result == 42
+        assert func.call_count == 2
+        func.assert_called_with("arg")
+        assert 0.0 <= mock_sleep.call_args[0][0] <= 0.5
+
+    @patch("src.infrastructure.utils.retry_policy.time.sleep")
+    def test_attempts_are_bounded(self, mock_sleep):
+        """Тест ограничения числа попыток"""
+        func = Mock(side_effect=TimeoutError("timeout"))
+
+        with pytest.raises(TimeoutError):
+            RetryPolicy(attempts=3).call(func)
+
+        assert func.call_count == 3
+        assert mock_sleep.call_count == 2
+
+    @patch("src.infrastructure.utils.retry_policy.time.sleep")
+    def test_no_retry_past_deadline(self, mock_sleep):
+        """Тест отказа от повторов, выходящих за крайний срок"""
+        func = Mock(side_effect=TimeoutError("timeout"))
+
+        with pytest.raises(TimeoutError):
+            RetryPolicy(attempts=5, base_delay=10.0).call(func, deadline=time.monotonic())
+
+        assert func.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @patch("src.infrastructure.utils.retry_policy.time.sleep")
+    def test_abandoned_query_is_not_retried(self, mock_sleep):
+        """Тест отказа от повторов брошенного запроса"""
+        func = Mock(side_effect=QueryAbandoned("abandoned"))
+
+        with pytest.raises(QueryAbandoned):
+            RetryPolicy(attempts=3).call(func)
+
+        assert func.call_count == 1
+        mock_sleep.assert_not_called()
+
+    def test_backoff_is_capped(self):
+        """Тест ограничения задержки между попытками"""
+        policy = RetryPolicy(base_delay=1.0, max_delay=2.0)
+
+        assert all(0.0 <= policy.backoff(attempt) <= 2.0 for attempt in range(10))
@@ -0,0 +1,35 @@
+import pytest
+import numpy as np
+from src.infrastructure.utils.sky_clustering import friends_of_friends, cluster_representatives
+
+
+class TestSkyClustering:
+    def test_chained_friends_form_one_group(self):
+        """Тест объединения цепочки близких обнаружений"""
+        step = 2.0 / 3600
+        ra = [10.0, 10.0 + step, 10.0 + 2 * step, 20.0]
+        dec = [0.0, 0.0, 0.0, 0.0]
+
+        labels = friends_of_friends(ra, dec, 2.5)
+
+        assert labels[0] == labels[1] == labels[2]
+        assert labels[3] != labels[0]
+
+    def test_groups_across_ra_wrap(self):
+        """Тест группировки через разрыв по прямому восхождению"""
+        labels = friends_of_friends([359.9997, 0.0003], [0.0, 0.0], 3.0)
+
+        assert labels[0] == labels[1]
+
+    def test_representative_is_brightest(self):
+        """Тест выбора самого яркого члена группы"""
+        labels = np.array([0, 0, 1, 0, 1])
+
+        representatives = cluster_representatives(labels, [1.0, 5.0, 2.0, 3.0, np.nan])
+
+        assert list(representatives) == [1, 2]
+
+    def test_single_and_empty(self):
+        """Тест вырожденных входных данных"""
+        assert list(friends_of_friends([1.0], [1.0], 3.0)) == [0]
+        assert list(cluster_representatives([], None)) == []
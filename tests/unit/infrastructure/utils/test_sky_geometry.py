@@ -0,0 +1,70 @@
+import pytest
+import numpy as np
+from astropy.wcs import WCS
+from astropy.coordinates import SkyCoord
+import astropy.units as u
+from src.infrastructure.utils.sky_geometry import (
+    angular_separation_deg, match_nearest, gnomonic_project, gnomonic_deproject, compute_footprint
+)
+
+
+class TestSkyGeometry:
+    def setup_method(self):
+        """Настройка среды для каждого теста"""
+        rng = np.random.default_rng(1)
+        self.ra = rng.uniform(149.0, 151.0, 500)
+        self.dec = rng.uniform(29.0, 31.0, 500)
+
+    def test_angular_separation_matches_astropy(self):
+        """Тест совпадения углового расстояния с astropy"""
+        expected = SkyCoord(150 * u.deg, 30 * u.deg).separation(SkyCoord(self.ra * u.deg, self.dec * u.deg)).deg
+        assert np.allclose(angular_separation_deg(150.0, 30.0, self.ra, self.dec), expected, atol=1e-10)
+
+    def test_match_nearest(self):
+        """Тест сопоставления с ближайшим источником в пределах радиуса"""
+        ra = self.ra[:10] + np.array([1.0] * 5 + [30.0] * 5) / 3600 / np.cos(np.deg2rad(self.dec[:10]))
+        indices, separations = match_nearest(ra, self.dec[:10], self.ra, self.dec, radius_arcsec=5)
+
+        assert np.array_equal(indices[:5], np.arange(5))
+        assert np.allclose(separations[:5], 1.0, atol=1e-3)
+        assert np.all(indices[5:] == -1)
+        assert np.all(np.isinf(separations[5:]))
+
+    def test_match_nearest_empty_reference(self):
+        """Тест сопоставления с пустым каталогом"""
+        indices, _ = match_nearest(self.ra[:3], self.dec[:3], [], [], radius_arcsec=5)
+        assert np.all(indices == -1)
+
+    def test_gnomonic_round_trip(self):
+        """Тест прямой и обратной гномонической проекции"""
+        xi, eta = gnomonic_project(self.ra, self.dec, 150.0, 30.0)
+        ra, dec = gnomonic_deproject(xi, eta, 150.0, 30.0)
+
+        assert np.allclose(ra, self.ra, atol=1e-10)
+        assert np.allclose(dec, self.dec, atol=1e-10)
+
+    def test_compute_footprint(self):
+        """Тест вычисления описывающего конуса кадра"""
+        wcs = WCS(naxis=2)
+        wcs.wcs.ctype = ["RA---TAN", "DEC--TAN"]
+        wcs.wcs.crval = [150.0, 30.0]
+        wcs.wcs.crpix = [500.5, 400.5]
+        wcs.wcs.cdelt = [-1.0 / 3600, 1.0 / 3600]
+        wcs.pixel_shape = (1000, 800)
+
+        ra, dec, radius = compute_footprint(wcs, margin_arcsec=5)
+
+        assert ra == pytest.approx(150.0)
+        assert dec == pytest.approx(30.0)
+        assert radius == pytest.approx(np.hypot(500, 400) / 3600 + 5 / 3600, rel=1e-3)
+
+    def test_compute_footprint_without_shape(self):
+        """Тест вычисления конуса по координатам объектов"""
+        wcs = WCS(naxis=2)
+        wcs.wcs.ctype = ["RA---TAN", "DEC--TAN"]
+        wcs.wcs.crval = [150.0, 30.0]
+        wcs.wcs.crpix = [1.0, 1.0]
+        wcs.wcs.cdelt = [-1.0 / 3600, 1.0 / 3600]
+
+        assert compute_footprint(wcs) is None
+        assert compute_footprint(wcs, [0, 100], [0, 100]) is not None
@@ -0,0 +1,91 @@
+import pytest
+import numpy as np
+from astropy.wcs import WCS, Sip
+from src.infrastructure.utils.wcs_transform import WcsTransformEngine
+
+
+def make_sip_wcs(crval=(150.0, 30.0)):
+    wcs = WCS(naxis=2)
+    wcs.wcs.ctype = ["RA---TAN-SIP", "DEC--TAN-SIP"]
+    wcs.wcs.crval = list(crval)
+    wcs.wcs.crpix = [1000.0, 800.0]
+    wcs.wcs.cd = np.array([[-1.5, 0.0], [0.0, 1.5]]) / 3600
+    a = np.zeros((4, 4))
+    b = np.zeros((4, 4))
+    a[2, 0] = 2e-6
+    a[0, 2] = -1e-6
+    a[3, 0] = 1e-9
+    b[1, 1] = 3e-6
+    b[0, 3] = 2e-9
+    wcs.sip = Sip(a, b, None, None, wcs.wcs.crpix)
+    wcs.pixel_shape = (2000, 1600)
+    return wcs
+
+
+class TestWcsTransformEngine:
+    def setup_method(self):
+        """Настройка среды для каждого теста"""
+        self.wcs = make_sip_wcs()
+        self.engine = WcsTransformEngine(self.wcs)
+        rng = np.random.default_rng(0)
+        self.x = rng.uniform(0, 2000, 20000)
+        self.y = rng.uniform(0, 1600, 20000)
+
+    def test_error_bound_is_validated(self):
+        """Тест проверки гарантированной точности аппроксимации"""
+        assert self.engine.is_approximated
+        assert self.engine.max_error_pix <= self.engine.tolerance_pix
+
+    def test_pix2world_matches_astropy(self):
+        """Тест прямого преобразования относительно astropy"""
+        ra, dec = self.engine.pix2world(self.x, self.y)
+        expected_ra, expected_dec = self.wcs.all_pix2world(self.x, self.y, 0)
+
+        error_arcsec = np.hypot((ra - expected_ra) * np.cos(np.deg2rad(dec)), dec - expected_dec) * 3600
+        assert error_arcsec.max() < 1.5 * self.engine.tolerance_pix
+
+    def test_world2pix_matches_astropy(self):
+        """Тест обратного преобразования относительно astropy"""
+        ra, dec = self.wcs.all_pix2world(self.x, self.y, 0)
+        x, y = self.engine.world2pix(ra, dec)
+
+        assert np.hypot(x - self.x, y - self.y).max() < self.engine.tolerance_pix
+
+    def test_points_outside_domain_use_exact_transform(self):
+        """Тест точного преобразования для точек вне области аппроксимации"""
+        x = np.concatenate([self.x, [-5000.0, 9000.0]])
+        y = np.concatenate([self.y, [-5000.0, 9000.0]])
+
+        ra, dec = self.engine.pix2world(x, y)
+        expected_ra, expected_dec = self.wcs.all_pix2world(x[-2:], y[-2:], 0)
+
+        assert ra[-2:] == pytest.approx(expected_ra)
+        assert dec[-2:] == pytest.approx(expected_dec)
+
+    def test_ra_wraparound(self):
+        """Тест поля, пересекающего RA = 0"""
+        wcs = make_sip_wcs(crval=(0.05, 10.0))
+        engine = WcsTransformEngine(wcs)
+
+        ra, dec = wcs.all_pix2world(self.x, self.y, 0)
+        x, y = engine.world2pix(ra, dec)
+
+        assert np.hypot(x - self.x, y - self.y).max() < engine.tolerance_pix
+
+    def test_small_inputs_use_astropy(self):
+        """Тест прямого вызова astropy для небольшого числа точек"""
+        ra, dec = self.engine.pix2world([100.0], [200.0])
+        expected = self.wcs.all_pix2world([[100.0, 200.0]], 0)[0]
+
+        assert ra[0] == expected[0]
+        assert dec[0] == expected[1]
+
+    def test_for_wcs_reuses_engine(self):
+        """Тест повторного использования движка для одного объекта WCS"""
+        first = WcsTransformEngine.for_wcs(self.wcs)
+        second = WcsTransformEngine.for_wcs(self.wcs)
+        other = WcsTransformEngine.for_wcs(self.wcs.deepcopy())
+
+        assert first is second
+        assert other is not first
+        assert other.wcs is not self.wcs
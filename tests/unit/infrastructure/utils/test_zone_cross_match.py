@@ -0,0 +1,70 @@
+import pytest
+import numpy as np
+from scipy.spatial import cKDTree
+from src.infrastructure.utils.local_catalog_store import LocalCatalogStore
+from src.infrastructure.utils.zone_cross_match import ZoneCrossMatcher, sweep_nearest
+
+
+class TestZoneCrossMatch:
+    def setup_method(self):
+        """Настройка среды для каждого теста"""
+        rng = np.random.default_rng(3)
+        self.ra = rng.uniform(0, 360, 20000)
+        self.dec = np.degrees(np.arcsin(rng.uniform(-1, 1, 20000)))
+        self.mag = rng.uniform(10, 20, 20000)
+        picked = rng.integers(0, 20000, 5000)
+        self.picked = picked
+        self.query_ra = np.mod(self.ra[picked] + rng.normal(0, 0.5 / 3600, 5000), 360)
+        self.query_dec = np.clip(self.dec[picked] + rng.normal(0, 0.5 / 3600, 5000), -90, 90)
+        self.query_ra[:100] = rng.uniform(0, 360, 100)
+
+    def make_store(self, tmp_path):
+        return LocalCatalogStore.build(str(tmp_path / "store"), "gaia", self.ra, self.dec, self.mag,
+                                       zone_height_deg=0.5)
+
+    def test_matches_store_search(self, tmp_path):
+        """Тест совпадения зонного сопоставления с поиском по хранилищу"""
+        store = self.make_store(tmp_path)
+        expected, expected_sep = store.match_nearest(self.query_ra, self.query_dec, 5.0)
+
+        nearest, separations = ZoneCrossMatcher(band_height_deg=5.0, workers=1).match(
+            self.query_ra, self.query_dec, store, 5.0
+        )
+
+        assert np.array_equal(nearest, expected)
+        assert np.allclose(separations[nearest >= 0], expected_sep[expected >= 0])
+
+    def test_process_pool_matches_serial(self, tmp_path):
+        """Тест совпадения результатов параллельной и последовательной обработки"""
+        store = self.make_store(tmp_path)
+        serial = ZoneCrossMatcher(workers=1).match(self.query_ra, self.query_dec, store, 5.0, mag_limit=15.0)
+
+        parallel = ZoneCrossMatcher(band_height_deg=20.0, workers=2, min_parallel_rows=1,
+                                    temp_dir=str(tmp_path)).match(self.query_ra, self.query_dec, store, 5.0,
+                                                                  mag_limit=15.0)
+
+        assert np.array_equal(serial[0], parallel[0])
+        assert np.all(store.columns["mag"][parallel[0][parallel[0] >= 0]] < 15.0)
+        assert list(tmp_path.iterdir()) == [tmp_path / "store"]
+
+    def test_ra_wraparound(self):
+        """Тест сопоставления через границу прямого восхождения 0/360"""
+        nearest, separations = sweep_nearest([359.9999, 0.0001], [10.0, -10.0], [0.0001, 359.9999], [10.0, -10.0],
+                                             radius=1.0 / 3600)
+
+        assert list(nearest) == [0, 1]
+        assert np.all(separations * 3600 < 1.0)
+
+    def test_planar_matches_kdtree(self):
+        """Тест совпадения плоского сопоставления с KD-деревом"""
+        rng = np.random.default_rng(4)
+        x, y = rng.uniform(0, 2000, (2, 5000))
+        ref_x = x[:3000] + rng.normal(0, 1, 3000)
+        ref_y = y[:3000] + rng.normal(0, 1, 3000)
+        distance, index = cKDTree(np.column_stack([ref_x, ref_y])).query(np.column_stack([x, y]),
+                                                                          distance_upper_bound=3.0)
+
+        nearest, distances = ZoneCrossMatcher(band_height_pix=100.0, workers=1).match_planar(x, y, ref_x, ref_y, 3.0)
+
+        assert np.array_equal(nearest, np.where(np.isfinite(distance), index, -1))
+        assert np.allclose(distances[nearest >= 0], distance[np.isfinite(distance)])